@@ -0,0 +1,832 @@
+"""Micro-Benchmarks für den AudiVizi-Datenpfad.
+
+Aufruf:
+    python bench_vizi.py ringbuffer
+    python bench_vizi.py decimation --width 650
+    python bench_vizi.py pipeline --buffer-seconds 5 60 --output bench.json
+    python bench_vizi.py spectrum --fft-sizes 1024 4096
+    python bench_vizi.py loudness --seconds 600
+    python bench_vizi.py history --minutes 60
+    python bench_vizi.py peakfile --minutes 240
+    python bench_vizi.py formats --seconds 300
+    python bench_vizi.py jitter --duration 20
+    python bench_vizi.py trigger --seconds 60
+    python bench_vizi.py vectorscope --frames 100
+    python bench_vizi.py events --minutes 60
+    python bench_vizi.py handoff --seconds 120
+    python bench_vizi.py batch --seconds 600
+"""
+import argparse
+import importlib.util
+import io
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+from vizi_batch import analyze_file, default_config
+from vizi_decimate import MinMaxPyramid
+from vizi_events import OverloadIndex
+from vizi_handoff import POLICIES, ChunkQueue
+from vizi_history import HistoryTiers
+from vizi_loudness import LoudnessMeter
+from vizi_meters import to_db
+from vizi_peakfile import AudioFile, FileView, PeakFile
+from vizi_resample import Decimator
+from vizi_sources import SAMPLE_FORMATS, StdinSource, SyntheticSource
+from vizi_spectrum import SpectrumAnalyzer
+from vizi_stats import PerfProbes
+from vizi_trigger import TriggeredScope
+from vizi_vectorscope import Goniometer, PhaseCorrelation
+
+
+def _time_per_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+# ---------------------------------------------------------------------------
+# Ringpuffer vs. np.roll
+# ---------------------------------------------------------------------------
+def bench_ringbuffer(args):
+    sample_rate = 44100
+    chunk = np.random.uniform(-1, 1, args.block_size).astype(np.float32)
+    results = []
+    for seconds in (5, 30, 60, 300, 600):
+        num_samples = sample_rate * seconds
+        audio_data = np.zeros(num_samples, dtype=np.float32)
+
+        def roll_write():
+            nonlocal audio_data
+            audio_data = np.roll(audio_data, -len(chunk))
+            audio_data[-len(chunk):] = chunk
+
+        ring = RingBuffer(num_samples)
+        repeats = max(10, args.repeats // seconds)
+        results.append({
+            "buffer_seconds": seconds,
+            "np_roll_us": _time_per_call(roll_write, repeats) * 1e6,
+            "ringbuffer_us": _time_per_call(lambda: ring.write(chunk), args.repeats) * 1e6,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Min/Max-Dezimierung für update_plot
+# ---------------------------------------------------------------------------
+def bench_decimation(args):
+    sample_rate = 44100
+    num_samples = sample_rate * 5
+    ring = RingBuffer(num_samples)
+    pyramid = MinMaxPyramid(ring)
+    rng = np.random.default_rng(0)
+    for _ in range(num_samples // args.block_size + 1):
+        ring.write(rng.uniform(-1, 1, args.block_size).astype(np.float32))
+        pyramid.update()
+
+    chunk = np.zeros(args.block_size, dtype=np.float32)
+
+    def ingest():
+        ring.write(chunk)
+        pyramid.update()
+
+    results = {"ingest_us": _time_per_call(ingest, args.repeats) * 1e6, "zoom": []}
+    for zoom in (1.0, 2.0, 5.0, 10.0):
+        visible = int(num_samples / zoom)
+        x, _ = pyramid.envelope(visible, args.width)
+        results["zoom"].append({
+            "time_zoom_factor": zoom,
+            "raw_points": visible,
+            "envelope_points": len(x),
+            "envelope_us": _time_per_call(
+                lambda: pyramid.envelope(visible, args.width), args.repeats // 4
+            ) * 1e6,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Gesamte Pipeline: Synthetische Quelle -> update_audio_buffer -> update_plot
+# ---------------------------------------------------------------------------
+def load_visualizer():
+    """script-vizi-1.py headless laden (Qt offscreen)."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "script-vizi-1.py")
+    spec = importlib.util.spec_from_file_location("script_vizi_1", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return app, module
+
+
+def _percentiles(values):
+    values = np.asarray(values) * 1e3
+    return {
+        f"p{p}": float(np.percentile(values, p)) for p in (50, 90, 99)
+    } | {"max": float(values.max())}
+
+
+def _run_frames(app, window, source, frames, samples_per_frame, block_size, timings):
+    raw = bytearray(block_size * source.bytes_per_frame)
+    view = memoryview(raw)
+    chunk = np.frombuffer(raw, dtype=np.float32)
+    for _ in range(frames):
+        for _ in range(max(1, samples_per_frame // block_size)):
+            source.readinto(view)
+            start = time.perf_counter()
+            window.update_audio_buffer(chunk)
+            timings["ingest"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        window.update_plot()
+        # synchron zeichnen, damit pyqtgraph-Painting mitgemessen wird
+        window.plot_widget.viewport().repaint()
+        app.processEvents()
+        timings["render"].append(time.perf_counter() - start)
+
+
+def bench_pipeline(args):
+    app, module = load_visualizer()
+    frame_interval = 0.03
+    results = []
+    configs = itertools.product(
+        args.buffer_seconds, args.sample_rates, args.zooms, (True, False), args.widths,
+        args.channels, args.renderers
+    )
+    for buffer_seconds, sample_rate, zoom, levelmeter, width, channels, renderer in configs:
+        window = module.PCMVisualizerApp(
+            sample_rate=sample_rate, buffer_seconds=buffer_seconds, channels=channels
+        )
+        window.resize(width, 350)
+        window.show()
+        window.timer.stop()
+        window.time_zoom_factor = zoom
+        window.levelmeter_checkbox.setChecked(levelmeter)
+        window.raster_checkbox.setChecked(renderer == "raster")
+        samples_per_frame = int(sample_rate * frame_interval)
+        source = SyntheticSource("bursts", sample_rate, realtime=False, channels=channels)
+        source.open()
+
+        # Puffer einmal füllen, danach messen
+        warmup = {"ingest": [], "render": []}
+        fill_frames = window.num_samples // samples_per_frame + 1
+        _run_frames(app, window, source, fill_frames, samples_per_frame, args.block_size, warmup)
+
+        timings = {"ingest": [], "render": []}
+        _run_frames(app, window, source, args.frames, samples_per_frame, args.block_size, timings)
+
+        tracemalloc.start()
+        _run_frames(app, window, source, 10, samples_per_frame, args.block_size,
+                    {"ingest": [], "render": []})
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        render = np.asarray(timings["render"])
+        results.append({
+            "buffer_seconds": buffer_seconds,
+            "sample_rate": sample_rate,
+            "time_zoom_factor": zoom,
+            "levelmeter": levelmeter,
+            "width": width,
+            "channels": channels,
+            "renderer": renderer,
+            "render_ms": _percentiles(render),
+            "ingest_us_per_chunk": float(np.mean(timings["ingest"]) * 1e6),
+            "dropped_frames": int(np.sum(np.floor(render / frame_interval))),
+            "frames": len(render),
+            "peak_alloc_mb": peak / 2**20,
+            "memory_per_channel_mb": window.memory_per_channel() / 2**20,
+        })
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    return {
+        "configs": results,
+        "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Spektrum/Spektrogramm: nur neue Hops je Frame vs. Neuberechnung des Verlaufs
+# ---------------------------------------------------------------------------
+def bench_spectrum(args):
+    from vizi_image import make_lut
+
+    sample_rate = 44100
+    samples_per_frame = int(sample_rate * 0.03)
+    lut = make_lut()
+    source = SyntheticSource("noise", sample_rate, realtime=False)
+    source.open()
+    chunk = np.empty(samples_per_frame, dtype=np.float32)
+    results = []
+    for fft_size, log_freq in itertools.product(args.fft_sizes, (False, True)):
+        ring = RingBuffer(sample_rate * 5)
+        analyzer = SpectrumAnalyzer(ring, sample_rate, fft_size, fft_size // 4, log_freq)
+        while ring.total_written < ring.capacity:
+            source.readinto(memoryview(chunk).cast("B"))
+            ring.write(chunk)
+        analyzer.update()
+
+        def frame():
+            source.readinto(memoryview(chunk).cast("B"))
+            ring.write(chunk)
+            rows = analyzer.update()
+            if rows is not None:
+                lut[analyzer.to_index(rows)]
+
+        def full_history():
+            analyzer.next_end = 0
+            lut[analyzer.to_index(analyzer.update())]
+
+        repeats = max(10, args.repeats // 10)
+        before = analyzer.frames_computed
+        incremental = _time_per_call(frame, repeats)
+        computed = analyzer.frames_computed - before
+        results.append({
+            "fft_size": fft_size,
+            "hop": analyzer.hop,
+            "log_freq": log_freq,
+            "rows": analyzer.rows,
+            "frame_ms": incremental * 1e3,
+            "ffts_per_frame": computed / repeats,
+            "full_history_ms": _time_per_call(full_history, max(3, repeats // 50)) * 1e3,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Lautheit (EBU R128): Rechenzeit je Sekunde Audio
+# ---------------------------------------------------------------------------
+def bench_loudness(args):
+    results = []
+    for sample_rate, channels in itertools.product(args.sample_rates, args.channels):
+        source = SyntheticSource("noise", sample_rate, realtime=False, channels=channels)
+        source.open()
+        samples_per_chunk = int(sample_rate * 0.03)
+        chunk = np.empty((samples_per_chunk, channels), dtype=np.float32)
+        chunks = int(args.seconds / 0.03)
+        # Testsignal vorab erzeugen, gemessen wird nur die Lautheit
+        signal = [chunk.copy() for _ in range(min(chunks, 100))]
+        for block in signal:
+            source.readinto(memoryview(block).cast("B"))
+
+        meter = LoudnessMeter(sample_rate, channels)
+        start = time.perf_counter()
+        for i in range(chunks):
+            meter.update(signal[i % len(signal)])
+        elapsed = time.perf_counter() - start
+        audio_seconds = chunks * samples_per_chunk / sample_rate
+        results.append({
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "audio_seconds": audio_seconds,
+            "cpu_percent_of_core": 100 * elapsed / audio_seconds,
+            "realtime_factor": audio_seconds / elapsed,
+            "integrated_lufs": meter.integrated,
+            "state_bytes": meter.nbytes,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Langzeit-Verlauf: Speicher je Stunde und Kosten je Zoomstufe
+# ---------------------------------------------------------------------------
+def bench_history(args):
+    sample_rate = 44100
+    ring = RingBuffer(sample_rate * 5)
+    history = HistoryTiers(ring, args.minutes * 60, sample_rate)
+    rng = np.random.default_rng(0)
+    second = rng.standard_normal(sample_rate).astype(np.float32) * 0.2
+    start = time.perf_counter()
+    for _ in range(int(args.minutes * 60)):
+        for block in np.split(second, 30):
+            ring.write(block)
+            history.update()
+    fill_seconds = time.perf_counter() - start
+
+    spans = []
+    seconds = 10.0
+    while seconds < args.minutes * 60:
+        spans.append(seconds)
+        seconds *= 4
+    spans.append(args.minutes * 60)
+    results = {
+        "minutes": args.minutes,
+        "block_sizes": history.block_sizes,
+        "memory_mb_per_hour_per_channel": history.nbytes / 2**20 * 60 / args.minutes,
+        "update_us_per_chunk": fill_seconds / (args.minutes * 60 * 30) * 1e6,
+        "zoom": [],
+    }
+    for span in spans:
+        n = int(span * sample_rate)
+        results["zoom"].append({
+            "span_seconds": span,
+            "column_stats_ms": _time_per_call(
+                lambda: history.column_stats(n, args.width), 50
+            ) * 1e3,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Datei-Ansicht: Peak-Datei kalt erzeugen vs. warm laden, Zoom/Pan-Kosten
+# ---------------------------------------------------------------------------
+def _write_test_wav(path, minutes, sample_rate, channels):
+    """16-Bit-WAV mit Rauschen in Abschnitten schreiben (ohne alles im RAM)."""
+    import wave
+
+    rng = np.random.default_rng(0)
+    second = (rng.standard_normal((sample_rate, channels)) * 3000).astype("<i2").tobytes()
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        for _ in range(int(minutes * 60)):
+            w.writeframesraw(second)
+
+
+def bench_peakfile(args):
+    sample_rate, channels = 44100, 2
+    directory = tempfile.mkdtemp(prefix="vizi-bench-")
+    path = os.path.join(directory, "take.wav")
+    _write_test_wav(path, args.minutes, sample_rate, channels)
+    try:
+        audio = AudioFile(path)
+        start = time.perf_counter()
+        peaks = PeakFile.build(audio)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        peaks = PeakFile.load(AudioFile(path))
+        warm = time.perf_counter() - start
+
+        view = FileView(audio, peaks)
+        rng = np.random.default_rng(1)
+        zoom = []
+        for span_seconds in (args.minutes * 60, 600, 60, 5, 0.5):
+            n = int(min(span_seconds, args.minutes * 60) * sample_rate)
+            starts = rng.integers(0, max(1, audio.frames - n), 50)
+            timings = []
+            for first in starts:
+                t = time.perf_counter()
+                view.column_minmax(first, n, args.width)
+                timings.append(time.perf_counter() - t)
+            zoom.append({"span_seconds": span_seconds, "pan_ms": _percentiles(timings)})
+        return {
+            "minutes": args.minutes,
+            "file_mb": os.path.getsize(path) / 2**20,
+            "peak_file_mb": os.path.getsize(peaks.path) / 2**20,
+            "cold_open_s": cold,
+            "warm_open_ms": warm * 1e3,
+            "zoom": zoom,
+        }
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+# ---------------------------------------------------------------------------
+# Pipe-Formate: f32le vs. s16le, mit und ohne Dezimierung vor dem Puffer
+# ---------------------------------------------------------------------------
+_PIPE_WRITER = """
+import sys
+import numpy as np
+seconds, rate, channels, fmt = float(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3]), sys.argv[4]
+x = np.random.default_rng(0).uniform(-0.5, 0.5, (rate, channels))
+second = (x * 32767).astype("<i2") if fmt == "s16le" else x.astype("<f4")
+out = sys.stdout.buffer
+for _ in range(int(seconds)):
+    out.write(second.tobytes())
+"""
+
+
+def bench_formats(args):
+    sample_rate, channels, block = 44100, 2, args.block_size
+    results = []
+    for fmt, factor in itertools.product(sorted(SAMPLE_FORMATS), (1, 4)):
+        dtype = SAMPLE_FORMATS[fmt]
+        ring = RingBuffer(int(5 * sample_rate / factor), channels=channels)
+        decimator = Decimator(factor, channels) if factor > 1 else None
+        raw = np.empty((block, channels), dtype=dtype)
+        raw_bytes = memoryview(raw).cast("B")
+        stage = np.empty((block, channels), dtype=np.float32)
+        scale = np.float32(1 / 32768)
+
+        before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        process = subprocess.Popen(
+            [sys.executable, "-c", _PIPE_WRITER, str(args.seconds), str(sample_rate),
+             str(channels), fmt],
+            stdout=subprocess.PIPE,
+        )
+        cpu = time.process_time()
+        start = time.perf_counter()
+        total = 0
+        while True:
+            got = 0
+            while got < len(raw_bytes):
+                n = process.stdout.readinto(raw_bytes[got:])
+                if not n:
+                    break
+                got += n
+            if got < len(raw_bytes):
+                break
+            total += got
+            if dtype == np.float32:
+                chunk = raw
+            else:
+                np.multiply(raw, scale, out=stage)
+                chunk = stage
+            ring.write(decimator.process(chunk) if decimator is not None else chunk)
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        process.wait()
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        audio_seconds = total / (dtype.itemsize * channels * sample_rate)
+        results.append({
+            "format": fmt,
+            "decimation": factor,
+            "pipe_mb": total / 2**20,
+            "pipe_mb_per_audio_s": total / 2**20 / audio_seconds,
+            "realtime_factor": audio_seconds / wall,
+            # Leser: Lesen, Umrechnen, Dezimieren, Puffer je Sekunde Audio
+            "reader_cpu_ms_per_audio_s": 1e3 * cpu / audio_seconds,
+            "writer_cpu_ms_per_audio_s": 1e3 * (
+                after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime
+            ) / audio_seconds,
+            "buffer_mb_per_channel_5s": ring.nbytes / channels / 2**20,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Bildtakt-Streuung: DSP im GUI-Prozess (Thread) vs. eigener Prozess
+# ---------------------------------------------------------------------------
+def bench_jitter(args):
+    app, module = load_visualizer()
+    results = []
+    for dsp_process in (False, True):
+        window = module.PCMVisualizerApp(
+            "synth:noise", channels=2, history_seconds=120, dsp_process=dsp_process
+        )
+        window.show()
+        for checkbox in (window.spectrum_checkbox, window.meters_checkbox,
+                         window.loudness_checkbox, window.levelmeter_checkbox):
+            checkbox.setChecked(True)
+        window.probes = window.plot_widget.probes = PerfProbes(window=1 << 16)
+        window.toggle_visualizer()
+        # Anlauf (Prozessstart, erste Hops) nicht mitmessen
+        until = time.monotonic() + 1.0
+        while time.monotonic() < until:
+            app.processEvents()
+            time.sleep(0.001)
+        warmup = {
+            stage: len(window.probes.recent(stage)) for stage in ("frame_interval", "latency")
+        }
+        cpu = time.process_time()
+        until = time.monotonic() + args.duration
+        while time.monotonic() < until:
+            app.processEvents()
+            time.sleep(0.001)
+        cpu = time.process_time() - cpu
+        window.toggle_visualizer()
+        intervals = window.probes.recent("frame_interval")[warmup["frame_interval"]:]
+        latency = window.probes.recent("latency")[warmup["latency"]:]
+        results.append({
+            "mode": "process" if dsp_process else "thread",
+            "frames": len(intervals),
+            "frame_interval_ms": _percentiles(intervals),
+            "frame_interval_std_ms": float(1e3 * intervals.std()),
+            "latency_ms": _percentiles(latency) if len(latency) else None,
+            # CPU des GUI-Prozesses (beim Thread-Modus inkl. Capture und DSP)
+            "gui_cpu_percent": 100 * cpu / args.duration,
+        })
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    return {"cpus": os.cpu_count(), "modes": results}
+
+
+# ---------------------------------------------------------------------------
+# Oszilloskop-Trigger: Suchkosten je Block bei voller Abtastrate
+# ---------------------------------------------------------------------------
+def bench_trigger(args):
+    sample_rate = 44100
+    block = int(sample_rate * 0.03)
+    blocks = int(args.seconds * sample_rate / block)
+    signals = {
+        "sine_1k": lambda idx: 0.5 * np.sin(2 * np.pi * 1000 / sample_rate * idx),
+        "sine_10k": lambda idx: 0.5 * np.sin(2 * np.pi * 10000 / sample_rate * idx),
+        # Rauschen: sehr viele Pegeldurchgänge, Hysterese filtert
+        "noise": lambda idx: np.random.default_rng(int(idx[0])).normal(0, 0.3, len(idx)),
+    }
+    results = []
+    for (name, signal), window_ms, averages in itertools.product(
+        signals.items(), (1, 10, 100), (1, 16)
+    ):
+        data = np.stack([signal(np.arange(sample_rate * 4))] * 2, axis=1).astype(np.float32)
+        ring = RingBuffer(sample_rate * 5, channels=2)
+        scope = TriggeredScope(ring, level=0.05, hysteresis=0.02, averages=averages)
+        scope.set_window(sample_rate * window_ms // 1000)
+        timings = np.empty(blocks)
+        for i in range(blocks):
+            start = (i * block) % (len(data) - block)
+            ring.write(data[start:start + block])
+            t = time.perf_counter()
+            scope.update()
+            timings[i] = time.perf_counter() - t
+        results.append({
+            "signal": name,
+            "window_ms": window_ms,
+            "averages": averages,
+            "block": block,
+            "search_us_per_block": {
+                key: value * 1e3 for key, value in _percentiles(timings).items()
+            },
+            "triggers": scope.triggers,
+            "sweeps": scope.sweeps,
+            # Sekunden Audio je Sekunde CPU für Suche + Mittelung
+            "realtime_factor": blocks * block / sample_rate / timings.sum(),
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Vektorskop: Dichtebild (Goniometer) vs. Scatter-Plot aller Punkte
+# ---------------------------------------------------------------------------
+def bench_vectorscope(args):
+    app, _ = load_visualizer()
+    import pyqtgraph as pg
+    from vizi_panels import VectorscopePanel
+
+    class Settings:
+        bg_color, wave_color, color_red = "#000000", "#ffffff", "#ff0000"
+
+    sample_rate = 44100
+    block = 1323
+    rng = np.random.default_rng(0)
+    results = []
+    for points in (block, 10 * block, 40 * block):
+        frames = [
+            rng.normal(0, 0.3, (points, 2)).astype(np.float32) for _ in range(8)
+        ]
+        goniometer = Goniometer(sample_rate)
+        panel = VectorscopePanel(goniometer, PhaseCorrelation(sample_rate), Settings())
+        panel.resize(300, 300)
+        panel.show()
+        scatter_widget = pg.PlotWidget()
+        scatter_widget.resize(300, 300)
+        scatter_widget.show()
+        scatter = pg.ScatterPlotItem(size=1, pen=None, brush="w")
+        scatter_widget.addItem(scatter)
+        timings = {"density": [], "scatter": []}
+        for i in range(args.frames):
+            data = frames[i % len(frames)]
+            start = time.perf_counter()
+            for first in range(0, points, block):
+                chunk = data[first:first + block]
+                goniometer.update(chunk)
+                panel.correlation.update(chunk)
+            panel.refresh()
+            panel.graphics.viewport().repaint()
+            app.processEvents()
+            timings["density"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            scatter.setData(data[:, 1] - data[:, 0], data[:, 1] + data[:, 0])
+            scatter_widget.viewport().repaint()
+            app.processEvents()
+            timings["scatter"].append(time.perf_counter() - start)
+        results.append({
+            "points_per_frame": points,
+            "density_ms": _percentiles(timings["density"]),
+            "scatter_ms": _percentiles(timings["scatter"]),
+        })
+        panel.close()
+        scatter_widget.close()
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Übersteuerungs-Index: Erfassung je Block, Speicher, Abfragen nach Zeitbereich
+# ---------------------------------------------------------------------------
+def bench_events(args):
+    sample_rate = 44100
+    block = int(sample_rate * 0.03)
+    blocks = int(args.minutes * 60 * sample_rate / block)
+    rng = np.random.default_rng(0)
+    # Vorrat an Stereo-Blöcken mit je ca. 20 kurzen Übersteuerungen
+    pool = []
+    for _ in range(32):
+        data = rng.normal(0, 0.05, (2, block)).astype(np.float32)
+        for start in rng.integers(0, block - 40, 20):
+            data[rng.integers(0, 2), start:start + rng.integers(1, 40)] = rng.uniform(0.6, 1.0)
+        pool.append(data)
+    results = []
+    for capacity in (1 << 16, 1 << 20):
+        index = OverloadIndex(2, sample_rate, 0.5, 0.9, merge_gap=0.0, capacity=capacity)
+        timings = np.empty(blocks)
+        for i in range(blocks):
+            t = time.perf_counter()
+            index.update(pool[i % len(pool)])
+            timings[i] = time.perf_counter() - t
+        index.flush()
+        end = index.position
+        # Nur im noch gespeicherten Bereich abfragen
+        oldest = int(index.recent(index.count)["start"][0])
+        queries = {}
+        for span in (1.0, 60.0, 600.0):
+            n = int(span * sample_rate)
+            if end - n <= oldest:
+                continue
+            starts = rng.integers(oldest, end - n, 50)
+            found = [len(index.query(s, s + n)) for s in starts]
+            queries[f"{span:.0f}s"] = {
+                "ms": _time_per_call(lambda: index.query(int(starts[0]), int(starts[0]) + n), 50)
+                * 1e3,
+                "events": int(np.median(found)),
+            }
+        results.append({
+            "capacity": capacity,
+            "audio_minutes": blocks * block / sample_rate / 60,
+            "events_total": index.total,
+            "events_stored": index.count,
+            "memory_mb": index.nbytes / 2**20,
+            "update_us_per_block": {
+                key: value * 1e3 for key, value in _percentiles(timings).items()
+            },
+            "realtime_factor": blocks * block / sample_rate / timings.sum(),
+            "query": queries,
+        })
+    return results
+
+# ---------------------------------------------------------------------------
+# Übergabe Capture -> GUI: Reihenfolge und Vollständigkeit bei hängendem GUI
+# ---------------------------------------------------------------------------
+def bench_handoff(args):
+    """Rampe (Frame-Nummer als Sample) durch Capture-Thread und ChunkQueue.
+
+    Die Quelle liefert ohne Echtzeitbremse, der Empfänger hält die Blöcke
+    wie das GUI eine Weile fest, bevor er sie prüft und freigibt. Jeder
+    Block muss lückenlos aufsteigen; empfangene und von der Queue
+    verworfene Frames ergeben zusammen die ganze Rampe.
+    """
+    _, module = load_visualizer()
+    sample_rate = 44100
+    # float32 stellt Ganzzahlen bis 2**24 exakt dar; ein angefangener
+    # Leseblock am Ende der Quelle wird nicht ausgeliefert
+    frames = min(int(args.seconds * sample_rate), 1 << 24) // args.block_size * args.block_size
+    ramp = np.arange(frames, dtype=np.float32).tobytes()
+    rng = np.random.default_rng(0)
+    results = []
+    for policy in POLICIES:
+        queue = ChunkQueue(4, policy, max_frames=sample_rate // 2)
+        source = StdinSource(sample_rate, io.BytesIO(ramp))
+        capture = module.AudioCaptureThread(source, args.block_size, pool_size=4, queue=queue)
+        capture.start()
+        expected = received = jumps = errors = 0
+        start = time.perf_counter()
+        while True:
+            finished = capture.isFinished()
+            chunks, tokens, _ = queue.take_all()
+            # Verarbeitung im GUI: die Pool-Puffer bleiben so lange belegt
+            time.sleep(rng.uniform(0, 0.004))
+            for chunk in chunks:
+                values = chunk[:, 0].astype(np.int64)
+                jump = int(values[0]) - expected
+                if jump < 0 or np.any(np.diff(values) != 1):
+                    errors += 1
+                jumps += max(jump, 0)
+                expected = int(values[-1]) + 1
+                received += len(values)
+            queue.release(tokens)
+            if finished and not chunks:
+                break
+        results.append({
+            "policy": policy,
+            "frames": frames,
+            "received": received,
+            "dropped_frames": queue.stats["dropped_frames"],
+            "coalesced": queue.stats["coalesced"],
+            "allocations": capture.stats["allocations"],
+            "wall_s": time.perf_counter() - start,
+            "disordered_chunks": errors,
+            "ok": errors == 0 and jumps <= queue.stats["dropped_frames"]
+            and received + queue.stats["dropped_frames"] == frames,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Stapelanalyse: Geschwindigkeit je Prozess, kurzer Burst mitten im Leseblock
+# ---------------------------------------------------------------------------
+def bench_batch(args):
+    """Rohdatei aus leisem Rauschen, auf Kanal 2 ein 0.1-s-Sinus (0.8) mitten
+    in einem Leseblock; rms_max_db muss ihn zeigen (ca. -9.7 dB im 0.3-s-Fenster).
+    """
+    config = default_config()
+    rate, channels, block = config["sample_rate"], config["channels"], config["block_size"]
+    frames = int(args.seconds * rate)
+    rng = np.random.default_rng(0)
+    data = rng.normal(0, 0.01, (frames, channels)).astype(np.float32)
+    burst = int(0.1 * rate)
+    start = block * (frames // block // 2) + block // 3
+    t = np.arange(burst) / rate
+    data[start:start + burst, 1] = 0.8 * np.sin(2 * np.pi * 1000 * t)
+    expected = to_db(0.8 / np.sqrt(2) * np.sqrt(burst / (0.3 * rate)))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "burst.f32")
+        data.tofile(path)
+        result = analyze_file(path, config)
+    if result["error"]:
+        return {"error": result["error"]}
+    per_channel = result["per_channel"]
+    return {
+        "audio_seconds": result["duration_s"],
+        "realtime_factor": result["speed"],
+        "rms_max_db": [channel["rms_max_db"] for channel in per_channel],
+        "burst_expected_db": round(float(expected), 2),
+        "burst_found": bool(abs(per_channel[1]["rms_max_db"] - expected) < 0.5),
+    }
+
+
+BENCHMARKS = {
+    "ringbuffer": bench_ringbuffer,
+    "decimation": bench_decimation,
+    "pipeline": bench_pipeline,
+    "spectrum": bench_spectrum,
+    "loudness": bench_loudness,
+    "history": bench_history,
+    "peakfile": bench_peakfile,
+    "formats": bench_formats,
+    "jitter": bench_jitter,
+    "trigger": bench_trigger,
+    "vectorscope": bench_vectorscope,
+    "events": bench_events,
+    "handoff": bench_handoff,
+    "batch": bench_batch,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AudiVizi Benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--block-size", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=650, help="Plotbreite in Pixel")
+    parser.add_argument("--output", help="JSON zusätzlich in diese Datei schreiben")
+
+    pipeline = parser.add_argument_group("pipeline")
+    pipeline.add_argument("--frames", type=int, default=100)
+    pipeline.add_argument("--buffer-seconds", type=float, nargs="+", default=[5, 30])
+    pipeline.add_argument("--sample-rates", type=int, nargs="+", default=[44100])
+    pipeline.add_argument("--zooms", type=float, nargs="+", default=[1.0, 10.0])
+    pipeline.add_argument("--widths", type=int, nargs="+", default=[650, 1920])
+    pipeline.add_argument("--channels", type=int, nargs="+", default=[1])
+    pipeline.add_argument(
+        "--renderers", nargs="+", choices=("curves", "raster"), default=["curves", "raster"]
+    )
+
+    loudness = parser.add_argument_group("loudness")
+    loudness.add_argument(
+        "--seconds", type=float, default=300,
+        help="Audiodauer (loudness, formats, trigger, handoff, batch)"
+    )
+
+    jitter = parser.add_argument_group("jitter")
+    jitter.add_argument(
+        "--duration", type=float, default=20, help="Messdauer je Modus in Sekunden"
+    )
+
+    history = parser.add_argument_group("history")
+    history.add_argument(
+        "--minutes", type=float, default=60,
+        help="Verlaufs- bzw. Dateilänge (history, peakfile, events)"
+    )
+
+    spectrum = parser.add_argument_group("spectrum")
+    spectrum.add_argument(
+        "--fft-sizes", type=int, nargs="+", default=[1024, 2048, 4096, 8192]
+    )
+    args = parser.parse_args(argv)
+
+    result = {args.name: BENCHMARKS[args.name](args)}
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
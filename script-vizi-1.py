@@ -1,26 +1,56 @@
+import os
 import sys
 import subprocess
+import threading
+import multiprocessing
 import numpy as np
-import re
+import time
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QComboBox, QLabel, QSlider, QCheckBox
+    QPushButton, QComboBox, QLabel, QSlider, QCheckBox, QFileDialog, QProgressBar,
+    QScrollBar, QDoubleSpinBox
 )
 from PyQt5.QtCore import QTimer, Qt, QThread, pyqtSignal
 import pyqtgraph as pg
-import shutil
-ffmpeg_path = shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+import argparse
+
+from vizi_ringbuffer import RingBuffer
+from vizi_decimate import MinMaxPyramid, concat_lanes, interleave_minmax, stack_lanes
+from vizi_events import OverloadIndex
+from vizi_handoff import POLICIES as QUEUE_POLICIES, ChunkQueue, GapDetector
+from vizi_history import HistoryTiers
+from vizi_levels import (
+    THRESHOLD_ORANGE, THRESHOLD_RED, ZONE_ORANGE, ZONE_RED, ZoneTracker, run_columns,
+    run_points, threshold_strokes
+)
+from vizi_loudness import LoudnessMeter
+from vizi_meters import LevelMeter
+from vizi_panels import (
+    EventPanel, LoudnessPanel, MeterPanel, SpectrumPanel, VectorscopePanel
+)
+from vizi_peakfile import AudioFile, FileView, PeakFile
+from vizi_raster import WaveformRaster
+from vizi_recorder import FORMATS as RECORD_FORMATS, Recorder
+from vizi_resample import Decimator
+from vizi_sources import (
+    SAMPLE_FORMATS, Backoff, ffmpeg_path, list_devices, make_source, synthetic_devices
+)
+from vizi_stats import PerfProbes, RateMeter
+from vizi_trigger import TriggeredScope
+from vizi_vectorscope import Goniometer, PhaseCorrelation
+from vizi_worker import DspWorker
 
 class VisualSettings:
     def __init__(self):
-        self.threshold_orange = 0.7
-        self.threshold_red = 0.9
+        self.threshold_orange = THRESHOLD_ORANGE
+        self.threshold_red = THRESHOLD_RED
 
         self.wave_color = "#ffffff"       # Basisfarbe
         self.bg_color = "#000000"
         self.color_orange = "#ffa500"
         self.color_red = "#ff0000"
+        self.color_rms = "#808080"        # RMS im Langzeit-Verlauf
 
         self.wave_color_map = {
             "Grün": "#009e00",
@@ -52,59 +82,365 @@ class ResettableSlider(QSlider):
         self.setValue(self.default_value)
 
 
-class AudioCaptureThread(QThread):
-    """Thread, der kontinuierlich Audiodaten von ffmpeg liest."""
+class ProbedPlotWidget(pg.PlotWidget):
+    """PlotWidget, das die Dauer jedes Paint-Events an PerfProbes meldet.
+
+    Ist `latency_from` gesetzt (Lesezeitpunkt des jüngsten gezeichneten
+    Samples), wird nach dem Zeichnen dessen Alter als "latency" gemeldet.
+    """
 
-    data_ready = pyqtSignal(object)
+    def __init__(self, probes, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.probes = probes
+        self.latency_from = None
 
-    def __init__(self, source, sample_rate, block_size):
+    def paintEvent(self, event):
+        t = self.probes.start()
+        super().paintEvent(event)
+        self.probes.stop("paint", t)
+        if self.latency_from is not None:
+            self.probes.add("latency", time.monotonic() - self.latency_from)
+            self.latency_from = None
+
+
+class AudioCaptureThread(QThread):
+    """Thread, der kontinuierlich Audiodaten aus einer CaptureSource liest.
+
+    Die Quelle schreibt per readinto() direkt in vorallokierte Sammelpuffer;
+    ausgeliefert wird höchstens einmal je `emit_interval` Sekunden, unabhängig
+    von `block_size`. Die Blöcke gehen in eine begrenzte ChunkQueue;
+    data_ready wird nur gesendet, wenn die Queue vorher leer war, der
+    Empfänger holt dann alles mit queue.take_all() ab.
+
+    Mit `min_block` passt sich die Leseblockgröße an: wartet ein Lesevorgang
+    fast eine ganze Blockdauer (Daten kommen in Echtzeit), wird der Block
+    halbiert, bis hinunter zu `min_block`; liegen die Daten schon bereit
+    (Rückstau), wird er bis `block_size` verdoppelt.
+
+    Bricht eine Live-Quelle ab (ffmpeg beendet, Gerät weg), wird sie nach
+    einer Wartezeit mit Backoff neu geöffnet; andere Quellen enden mit
+    source_ended. stop() unterbricht auch ein blockierendes Lesen.
+    """
+
+    data_ready = pyqtSignal()
+    gap_detected = pyqtSignal(int)
+    source_restarting = pyqtSignal(str, float)
+    source_ended = pyqtSignal(str)
+
+    def __init__(self, source, block_size, emit_interval=0.03, pool_size=8, probes=None,
+                 queue=None, min_block=None):
         super().__init__()
         self.source = source
-        self.sample_rate = sample_rate
+        self.probes = probes or PerfProbes(enabled=False)
+        self.sample_rate = source.sample_rate
         self.block_size = block_size
+        self.min_block = min_block or block_size
+        self.read_block = block_size
+        self.emit_interval = emit_interval
+        self.pool_size = pool_size
+        self.queue = queue or ChunkQueue()
+        self.gaps = None
+        self.backoff = Backoff()
+        self.restarts = 0
+        self.opened_at = None
+        self._wake = threading.Event()
         self.running = True
+        # Optionale Aufnahme; wird vom GUI-Thread gesetzt/entfernt
+        self.recorder = None
+
+        # Zähler (nur vom Capture-Thread geschrieben) zur Kontrolle im GUI
+        self.stats = {
+            "reads": 0, "bytes": 0, "blocks": 0, "emits": 0, "allocations": 0,
+        }
+        self.started_at = None
+
+    def in_flight(self):
+        """Pool-Puffer, die noch in der Queue liegen oder im GUI verarbeitet werden."""
+        return self.queue.pinned
+
+    def rates(self):
+        """Zähler pro Sekunde seit dem Start."""
+        if self.started_at is None:
+            return {}
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        rates = {key: value / elapsed for key, value in self.stats.items()}
+        rates["sample_rate"] = self.source.achieved_rate()
+        return rates
+
+    def uptime(self):
+        """Sekunden seit dem letzten (Neu-)Start der Quelle."""
+        return time.monotonic() - self.opened_at if self.opened_at is not None else 0.0
+
+    def _read_exact(self, stream, view):
+        got = 0
+        while got < len(view):
+            n = stream.readinto(view[got:])
+            self.stats["reads"] += 1
+            if not n:
+                return False
+            got += n
+        self.stats["bytes"] += got
+        return True
+
+    def _open_source(self):
+        try:
+            self.source.open()
+        except OSError as e:
+            self.source_ended.emit(f"{self.source.label}: {e}")
+            return False
+        self.opened_at = time.monotonic()
+        if self.source.live:
+            self.gaps = GapDetector(self.sample_rate)
+        return True
+
+    def _restart(self):
+        """Quelle nach Abbruch neu öffnen; False, wenn die Aufnahme endet."""
+        log = getattr(self.source, "log", None)
+        reason = log.last_error if log is not None and log.last_error else "Datenstrom beendet"
+        uptime = self.uptime()
+        self.source.close()
+        if not self.running:
+            return False
+        if not self.source.live:
+            self.source_ended.emit(reason)
+            return False
+        down_since = time.monotonic()
+        while self.running:
+            delay = self.backoff.next_delay(uptime)
+            self.source_restarting.emit(reason, delay)
+            self._wake.wait(delay)
+            if not self.running or not self._open_source():
+                return False
+            self.restarts += 1
+            # Die Ausfallzeit fehlt im Datenstrom
+            self.gap_detected.emit(int((time.monotonic() - down_since) * self.sample_rate))
+            return True
+        return False
+
+    def _adapt_block(self, waited):
+        duration = self.read_block / self.sample_rate
+        if waited > 0.75 * duration:
+            self.read_block = max(self.read_block // 2, self.min_block)
+        elif waited < 0.25 * duration:
+            self.read_block = min(self.read_block * 2, self.block_size)
+
+    def _deliver(self, chunk, arrival, token):
+        recorder = self.recorder
+        if recorder is not None:
+            t = self.probes.start()
+            recorder.submit(chunk)
+            self.probes.stop("record", t)
+        t = self.probes.start()
+        if self.queue.put(chunk, arrival, token):
+            self.data_ready.emit()
+        self.probes.stop("emit", t)
+        self.stats["emits"] += 1
 
     def run(self):
-        ffmpeg_cmd = [
-            ffmpeg_path,
-            "-f", "avfoundation",
-            "-i", self.source,
-            "-ac", "1",
-            "-ar", str(self.sample_rate),
-            "-f", "f32le",
-            "pipe:"
-        ]
-        process = subprocess.Popen(
-            ffmpeg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        bytes_per_sample = 4
+        if not self._open_source():
+            return
+        # Frames: ein float32 je Kanal, interleaved wie von ffmpeg geliefert
+        bytes_per_frame = self.source.bytes_per_frame
+        # Sammelpuffer: Platz für mindestens zwei Lieferintervalle
+        blocks_per_emit = max(1, int(np.ceil(self.sample_rate * self.emit_interval / self.block_size)))
+        stage_len = 2 * blocks_per_emit * self.block_size
+        stage_shape = (stage_len, self.source.channels)
+        # Ausliefern, sobald das Intervall bis auf einen halben Block erreicht
+        # ist; sonst rutscht der Takt auf das nächste Vielfache der Blockdauer
+        emit_after = self.emit_interval - 0.5 * self.min_block / self.sample_rate
+        pool = [np.empty(stage_shape, dtype=np.float32) for _ in range(self.pool_size)]
+        self.stats["allocations"] += self.pool_size
+        # Marke je Pool-Puffer; ein neu angelegter Puffer bekommt eine neue
+        tokens = list(range(self.pool_size))
+        next_token = self.pool_size
+        # s16le: in einen festen int16-Puffer lesen und je Block vektorisiert
+        # nach float32 in den Sammelpuffer umrechnen
+        convert = self.source.dtype != np.float32
+        if convert:
+            scratch = np.empty(stage_shape, dtype=self.source.dtype)
+            scratch_bytes = memoryview(scratch).cast("B")
+            scale = np.float32(1 / 32768)
+
+        slot = 0
+        stage = pool[slot]
+        stage_bytes = memoryview(stage).cast("B")
+        fill = 0
+        self.started_at = last_emit = time.monotonic()
         while self.running:
-            raw_data = process.stdout.read(self.block_size * bytes_per_sample)
-            if not raw_data or len(raw_data) < self.block_size * bytes_per_sample:
+            offset = fill * bytes_per_frame
+            block = self.read_block
+            target = scratch_bytes if convert else stage_bytes
+            t = self.probes.start()
+            ok = self._read_exact(self.source, target[offset:offset + block * bytes_per_frame])
+            now = time.monotonic()
+            if ok:
+                self.probes.stop("read", t)
+                if convert:
+                    c = self.probes.start()
+                    np.multiply(scratch[fill:fill + block], scale, out=stage[fill:fill + block])
+                    self.probes.stop("convert", c)
+                if self.min_block < self.block_size:
+                    self._adapt_block(time.perf_counter() - t)
+                fill += block
+                self.stats["blocks"] += 1
+                if self.gaps is not None:
+                    lost = self.gaps.update(self.source.samples_read, now)
+                    if lost:
+                        self.gap_detected.emit(lost)
+                if now - last_emit < emit_after and fill + self.read_block <= stage_len:
+                    continue
+            elif not self.running:
                 break
-            chunk = np.frombuffer(raw_data, dtype=np.float32)
-            self.data_ready.emit(chunk)
-        process.terminate()
+
+            # Bei Abbruch der Quelle auch den angefangenen Sammelpuffer ausliefern
+            if fill:
+                self._deliver(stage[:fill], now, tokens[slot])
+                last_emit = now
+                slot = (slot + 1) % self.pool_size
+                if self.queue.is_pinned(tokens[slot]):
+                    # Empfänger hängt hinterher: Puffer ist noch in Benutzung
+                    pool[slot] = np.empty(stage_shape, dtype=np.float32)
+                    tokens[slot] = next_token
+                    next_token += 1
+                    self.stats["allocations"] += 1
+                stage = pool[slot]
+                stage_bytes = memoryview(stage).cast("B")
+                fill = 0
+            if not ok and not self._restart():
+                return
+        self.source.close()
+
+    def stop(self):
+        self.running = False
+        self.queue.close()
+        self._wake.set()
+        self.source.interrupt()
+
+
+class PeakFileThread(QThread):
+    """Erzeugt die Peak-Datei einer geöffneten Audiodatei im Hintergrund."""
+
+    progress = pyqtSignal(float)
+    done = pyqtSignal(object)
+
+    def __init__(self, audio):
+        super().__init__()
+        self.audio = audio
+        self.running = True
+
+    def run(self):
+        try:
+            peaks = PeakFile.build(
+                self.audio, progress=self.progress.emit, should_stop=lambda: not self.running
+            )
+        except Exception as e:  # done muss immer kommen, sonst bleibt der Fortschritt stehen
+            print(f"Peak-Datei konnte nicht erstellt werden: {type(e).__name__}: {e}")
+            peaks = None
+        self.done.emit(peaks)
 
     def stop(self):
         self.running = False
 
 
 class PCMVisualizerApp(QWidget):
-    def __init__(self):
+    def __init__(self, source_spec=None, realtime=True, sample_rate=44100, buffer_seconds=5,
+                 stats_file=None, channels=1, history_seconds=0, record_dir=".",
+                 rotate_seconds=None, rotate_bytes=None, queue_policy="drop-oldest",
+                 queue_size=4, low_latency=False, sample_format="f32le", decimation=1,
+                 dsp_process=False, trigger_hysteresis=0.01, trigger_holdoff=0.0,
+                 max_events=1 << 20):
         super().__init__()
         self.setWindowTitle("PCM Audio Visualizer - Time Zoom + Vertical Padding + Cursor")
         self.setGeometry(100, 100, 650, 350)
 
         self.capture_thread = None
         self.running = False
+        # Übergabe Capture -> GUI: Strategie bei Überlauf und Größe in Blöcken
+        self.queue_policy = queue_policy
+        self.queue_size = queue_size
+        self.capture_queue = None
+        self.gap_count = 0
+        self.gap_frames = 0
+        self.restart_attempts = 0
+        # Offline-Ansicht einer Datei (statt Live-Puffer), Peak-Erzeugung im Hintergrund
+        self.file_view = None
+        self.peak_thread = None
+        # Bildlaufleiste der Datei: ein Schritt = position_step Frames
+        self.position_step = 1
+        self.file_visible = 0
+        # Aufnahme auf Platte (Schreib-Thread im Recorder)
+        self.record_dir = record_dir
+        self.rotate_seconds = rotate_seconds
+        self.rotate_bytes = rotate_bytes
+        self.recorder = None
+        self.closing_recorders = []
+        # Vorgewählte Quelle (Kommandozeile) und Echtzeit-Wiedergabe für Dateien
+        self.source_spec = source_spec
+        self.realtime = realtime
+
+        # Messpunkte je Pipeline-Stufe (Dump beim Schließen nach stats_file)
+        self.probes = PerfProbes()
+        self.stats_file = stats_file
+        self.frame_count = 0
+        self.fps_meter = RateMeter(0.5)
+        self.ingest_meter = RateMeter(0.5)
+        self.hud_updated_at = 0.0
 
         # --- Audio-Puffer ---
-        self.sample_rate = 44100
-        self.buffer_seconds = 5
-        self.num_samples = self.sample_rate * self.buffer_seconds
-        self.audio_data = np.zeros(self.num_samples, dtype=np.float32)
-        self.block_size = 1024
+        self.sample_rate = sample_rate
+        self.sample_format = sample_format
+        # Anzeige optional mit reduzierter Rate; Meter und Aufnahme bekommen
+        # weiterhin die volle Rate
+        self.decimation = decimation
+        self.display_rate = sample_rate / decimation
+        self.decimator = Decimator(decimation, channels) if decimation > 1 else None
+        self.buffer_seconds = buffer_seconds
+        self.num_samples = int(self.display_rate * self.buffer_seconds)
+        # Planar je Kanal; ffmpeg liefert interleaved, entschachtelt wird in write()
+        self.channels = channels
+        self.audio_buffer = RingBuffer(self.num_samples, channels=self.channels)
+        # Min/Max-Stufen für die Darstellung (eine Spalte je Pixel, alle Kanäle gemeinsam)
+        self.pyramid = MinMaxPyramid(self.audio_buffer)
+        # Oszilloskop-Modus: Flankentrigger auf Kanal 1, nur über neue Samples
+        self.scope = TriggeredScope(
+            self.audio_buffer, hysteresis=trigger_hysteresis,
+            holdoff=int(trigger_holdoff * self.display_rate),
+        )
+        # Langzeit-Verlauf (Min/Max/RMS-Stufen) zum Zurückscrollen per Time Zoom
+        self.history_seconds = history_seconds
+        self.history = None
+        if history_seconds > self.buffer_seconds:
+            self.history = HistoryTiers(self.audio_buffer, history_seconds, self.display_rate)
+        # Angesprungenes Übersteuerungs-Ereignis (Start, Ende als absolute
+        # Samples); der Verlauf bleibt darum zentriert, None = live
+        self.selected_event = None
+        self.low_latency = low_latency
+        if low_latency:
+            # Kleine, adaptive Leseblöcke; jeder Block wird sofort geliefert und
+            # gezeichnet (höchstens alle min_render_interval Sekunden)
+            self.block_size = 512
+            self.min_block = 128
+            self.frame_interval = 1 / 60
+            self.emit_interval = 0.0
+            # Gleiche Pufferzeit in der Queue wie mit den großen Blöcken
+            self.queue_size *= self.block_size * 2 // self.min_block
+        else:
+            self.block_size = 1024
+            self.min_block = None
+            # Display-Takt; Lieferungen vom Capture-Thread: eine je Frame
+            self.frame_interval = 0.03
+            self.emit_interval = self.frame_interval
+        self.min_render_interval = 0.008
+        self.last_render = 0.0
+        # Lesezeitpunkt des jüngsten Samples im Puffer (Latenzmessung)
+        self.newest_arrival = None
+
+        # Render-Timer läuft nur, solange es etwas Neues zu zeichnen gibt
+        self.timer = QTimer()
+        self.timer.setInterval(int(self.frame_interval * 1000))
+        self.timer.timeout.connect(self.on_frame)
+        self.dirty = False
+        self.idle_frames = 0
 
         # --- Visual-Einstellungen ---
         self.amplitude_factor = 5.0
@@ -114,6 +450,55 @@ class PCMVisualizerApp(QWidget):
         # Einstellungen
         self.settings = VisualSettings()
 
+        # Levelmeter-Zonen als Segmentliste je Kanal (Schwellen in Rohwerten)
+        self.zones = [
+            ZoneTracker(
+                self.audio_buffer.lane(channel),
+                self.settings.threshold_orange / self.amplitude_factor,
+                self.settings.threshold_red / self.amplitude_factor,
+            )
+            for channel in range(self.channels)
+        ]
+        # Alle Übersteuerungen der Sitzung (Anzeigedaten); wächst bis max_events
+        self.events = OverloadIndex(
+            self.channels, self.display_rate,
+            self.settings.threshold_orange / self.amplitude_factor,
+            self.settings.threshold_red / self.amplitude_factor,
+            capacity=max_events,
+        )
+        self.events_seen = 0
+        # Peak/RMS/True-Peak je Kanal, laufend je eingehendem Block
+        self.meters = LevelMeter(
+            self.sample_rate, self.channels,
+            self.settings.threshold_orange / self.amplitude_factor,
+            self.settings.threshold_red / self.amplitude_factor,
+        )
+        # Lautheit nach EBU R128 (Integrated läuft über die ganze Sitzung)
+        self.loudness = LoudnessMeter(self.sample_rate, self.channels)
+        # Optional: Capture, Dezimierung, Meter und FFT in einem eigenen
+        # Prozess; das GUI übernimmt die fertigen Daten per Timer aus dem
+        # Shared Memory und zeichnet nur noch
+        self.worker = None
+        self.worker_seen = 0
+        if dsp_process:
+            self.worker = DspWorker(
+                self.sample_rate, self.channels, self.num_samples, decimation,
+                sample_format, low_latency, self.min_block or self.block_size,
+                self.emit_interval, self.meters.thresholds,
+            )
+            self.meters = self.worker.meter
+            self.loudness = self.worker.loudness
+            self.worker_timer = QTimer()
+            self.worker_timer.setInterval(4 if low_latency else int(self.frame_interval * 500))
+            self.worker_timer.timeout.connect(self.poll_worker)
+        # Goniometer und Phasenkorrelation (Kanäle 1/2); im DSP-Prozess-Modus
+        # aus den Anzeigedaten, sonst mit voller Rate
+        self.goniometer = self.correlation = None
+        if self.channels >= 2:
+            rate = self.display_rate if dsp_process else self.sample_rate
+            self.goniometer = Goniometer(rate)
+            self.correlation = PhaseCorrelation(rate)
+
         # --- GUI ---
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -127,6 +512,9 @@ class PCMVisualizerApp(QWidget):
         self.audio_dropdown.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToContents)
         self.refresh_audio_sources()
         source_layout.addWidget(self.audio_dropdown)
+        self.open_button = QPushButton("Datei öffnen…")
+        self.open_button.clicked.connect(self.on_open_clicked)
+        source_layout.addWidget(self.open_button)
         source_layout.addStretch(1)
         main_layout.addLayout(source_layout)
 
@@ -210,6 +598,25 @@ class PCMVisualizerApp(QWidget):
 
         lower_layout.addLayout(colors_layout)
 
+        # Oszilloskop-Modus: Flanke, Pegel (Rohwert Kanal 1), Mittelung
+        trigger_layout = QVBoxLayout()
+        trigger_layout.addWidget(QLabel("Trigger"))
+        self.trigger_dropdown = QComboBox()
+        self.trigger_dropdown.addItem("Aus (frei)", None)
+        self.trigger_dropdown.addItem("Steigend", "rising")
+        self.trigger_dropdown.addItem("Fallend", "falling")
+        trigger_layout.addWidget(self.trigger_dropdown)
+        self.trigger_level_box = QDoubleSpinBox()
+        self.trigger_level_box.setRange(-1.0, 1.0)
+        self.trigger_level_box.setSingleStep(0.01)
+        self.trigger_level_box.setPrefix("Pegel ")
+        trigger_layout.addWidget(self.trigger_level_box)
+        self.average_dropdown = QComboBox()
+        for count in (1, 2, 4, 8, 16, 32, 64):
+            self.average_dropdown.addItem(f"Mittel {count}" if count > 1 else "Ohne Mittel", count)
+        trigger_layout.addWidget(self.average_dropdown)
+        lower_layout.addLayout(trigger_layout)
+
         # 4) Checkboxes (Cursor oben, Levelmeter darunter)
         checkbox_layout = QVBoxLayout()
         self.cursor_checkbox = QCheckBox("Zeige Waveform Cursor")
@@ -219,9 +626,57 @@ class PCMVisualizerApp(QWidget):
         self.levelmeter_checkbox.setChecked(True)
         checkbox_layout.addWidget(self.levelmeter_checkbox)
 
+        self.raster_checkbox = QCheckBox("Raster-Renderer")
+        self.raster_checkbox.setToolTip(
+            "Waveform als scrollendes Bild; je Frame nur die neuen Spalten"
+        )
+        checkbox_layout.addWidget(self.raster_checkbox)
+
+        self.hud_checkbox = QCheckBox("Performance-HUD")
+        self.hud_checkbox.toggled.connect(self.on_hud_toggled)
+        checkbox_layout.addWidget(self.hud_checkbox)
+
         lower_layout.addLayout(checkbox_layout)
+
+        # Zusatzansichten rechts neben der Waveform
+        panels_layout = QVBoxLayout()
+        self.spectrum_checkbox = QCheckBox("Spektrum")
+        panels_layout.addWidget(self.spectrum_checkbox)
+
+        self.meters_checkbox = QCheckBox("Pegelanzeige")
+        panels_layout.addWidget(self.meters_checkbox)
+
+        self.loudness_checkbox = QCheckBox("Lautheit (R128)")
+        panels_layout.addWidget(self.loudness_checkbox)
+
+        self.vectorscope_checkbox = QCheckBox("Vektorskop")
+        self.vectorscope_checkbox.setEnabled(self.goniometer is not None)
+        if self.goniometer is None:
+            self.vectorscope_checkbox.setToolTip("Nur mit --channels 2 oder mehr")
+        panels_layout.addWidget(self.vectorscope_checkbox)
+
+        self.events_checkbox = QCheckBox("Übersteuerungen")
+        panels_layout.addWidget(self.events_checkbox)
+
+        lower_layout.addLayout(panels_layout)
         lower_layout.addStretch(1)
 
+        # Aufnahme (Format + Umschalter)
+        record_layout = QVBoxLayout()
+        self.record_format_dropdown = QComboBox()
+        for fmt in RECORD_FORMATS:
+            self.record_format_dropdown.addItem(fmt.upper(), fmt)
+        record_layout.addWidget(self.record_format_dropdown)
+        self.record_button = QPushButton("Aufnahme")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.on_record_toggled)
+        record_layout.addWidget(self.record_button)
+        if self.worker is not None:
+            # Die Rohdaten bleiben im DSP-Prozess
+            self.record_button.setEnabled(False)
+            self.record_button.setToolTip("Nicht verfügbar mit --dsp-process")
+        lower_layout.addLayout(record_layout)
+
         # Start/Stop-Button
         self.toggle_button = QPushButton("Start Visualizer")
         self.toggle_button.setFixedWidth(150)
@@ -234,7 +689,7 @@ class PCMVisualizerApp(QWidget):
         main_layout.addLayout(lower_layout)
 
         # 5) Plot
-        self.plot_widget = pg.PlotWidget()
+        self.plot_widget = ProbedPlotWidget(self.probes)
         self.plot_widget.setStyleSheet("border: none;")
         self.plot_widget.hideAxis("bottom")
         self.plot_widget.hideAxis("left")
@@ -252,6 +707,11 @@ class PCMVisualizerApp(QWidget):
         self.curve_red = self.plot_widget.plot(
             pen=self.settings.color_red, name="Red"
         )
+        # RMS-Band (nur im Langzeit-Verlauf)
+        self.curve_rms = self.plot_widget.plot(
+            pen=self.settings.color_rms, name="RMS"
+        )
+        self.curve_rms.hide()
         # Einzelkurve (wenn Levelmeter deaktiviert)
         self.single_curve = self.plot_widget.plot(
             pen=self.settings.wave_color, name="SingleCurve"
@@ -259,60 +719,127 @@ class PCMVisualizerApp(QWidget):
 
         # Die Z-Reihenfolge anpassen, damit Rot über Orange über Weiß liegt
         self.curve_base.setZValue(0)
+        self.curve_rms.setZValue(0.5)
         self.curve_orange.setZValue(1)
         self.curve_red.setZValue(2)
 
+        # Alternative zu den Kurven: inkrementell gerastertes Bild
+        self.waveform_raster = WaveformRaster()
+        self.waveform_raster.hide()
+        self.plot_widget.addItem(self.waveform_raster)
+
         # Cursor
         self.cursor_line = pg.InfiniteLine(
             angle=90, pen=pg.mkPen(self.settings.wave_color, width=2)
         )
         self.cursor_line.setVisible(False)
         self.plot_widget.addItem(self.cursor_line)
-
-        main_layout.addWidget(self.plot_widget)
-
-        # 6) Timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_plot)
-        # Update-Intervall leicht erhöht für geringere CPU-Last
-        self.timer.start(30)
+        # Angesprungenes Ereignis (nur beim Zurückblättern im Verlauf)
+        self.event_region = pg.LinearRegionItem(
+            movable=False, brush=pg.mkBrush(255, 0, 0, 50), pen=pg.mkPen(None)
+        )
+        self.event_region.setVisible(False)
+        self.plot_widget.addItem(self.event_region)
+        # Triggerpegel (nur im Oszilloskop-Modus)
+        self.trigger_line = pg.InfiniteLine(
+            angle=0, pen=pg.mkPen(self.settings.color_orange, style=Qt.PenStyle.DashLine)
+        )
+        self.trigger_line.setVisible(False)
+        self.plot_widget.addItem(self.trigger_line)
+
+        # Performance-HUD (Overlay oben links im Plot)
+        self.hud_label = QLabel(self.plot_widget)
+        self.hud_label.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #0f0;"
+            "font-family: monospace; padding: 4px;"
+        )
+        self.hud_label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.hud_label.move(8, 8)
+        self.hud_label.hide()
+
+        # Spektrum + Spektrogramm (Kanal 1) rechts neben der Waveform
+        self.spectrum_panel = SpectrumPanel(
+            self.audio_buffer.lane(0), self.display_rate,
+            analyzer=self.worker.spectrum(self.display_rate) if self.worker else None,
+        )
+        self.spectrum_panel.changed.connect(self.request_update)
+        self.spectrum_panel.hide()
+
+        # Pegelanzeige ganz rechts
+        self.meter_panel = MeterPanel(self.meters, self.settings)
+        self.meter_panel.hide()
+        self.loudness_panel = LoudnessPanel(self.loudness)
+        self.loudness_panel.hide()
+        self.vectorscope_panel = None
+        if self.goniometer is not None:
+            self.vectorscope_panel = VectorscopePanel(
+                self.goniometer, self.correlation, self.settings
+            )
+            self.vectorscope_panel.hide()
+        self.event_panel = EventPanel(self.events, self.display_rate)
+        self.event_panel.event_selected.connect(self.on_event_selected)
+        self.event_panel.live_requested.connect(self.on_live_requested)
+        self.event_panel.hide()
+
+        plots_layout = QHBoxLayout()
+        plots_layout.addWidget(self.plot_widget, 2)
+        plots_layout.addWidget(self.spectrum_panel, 1)
+        plots_layout.addWidget(self.meter_panel)
+        plots_layout.addWidget(self.loudness_panel)
+        if self.vectorscope_panel is not None:
+            plots_layout.addWidget(self.vectorscope_panel)
+        plots_layout.addWidget(self.event_panel)
+        main_layout.addLayout(plots_layout)
+
+        # Scroll-Position und Fortschritt der Peak-Datei (nur Datei-Ansicht)
+        self.position_bar = QScrollBar(Qt.Orientation.Horizontal)
+        self.position_bar.valueChanged.connect(self.request_update)
+        self.position_bar.hide()
+        main_layout.addWidget(self.position_bar)
+        self.peak_progress = QProgressBar()
+        self.peak_progress.setRange(0, 1000)
+        self.peak_progress.setFormat("Peak-Datei %p %")
+        self.peak_progress.hide()
+        main_layout.addWidget(self.peak_progress)
+
+        # 6) Checkboxen lösen ebenfalls ein neues Bild aus
+        self.cursor_checkbox.toggled.connect(self.request_update)
+        self.levelmeter_checkbox.toggled.connect(self.request_update)
+        self.raster_checkbox.toggled.connect(self.request_update)
+        self.trigger_dropdown.currentIndexChanged.connect(self.on_trigger_changed)
+        self.trigger_level_box.valueChanged.connect(self.on_trigger_changed)
+        self.average_dropdown.currentIndexChanged.connect(self.on_trigger_changed)
+        self.spectrum_checkbox.toggled.connect(self.on_spectrum_toggled)
+        self.meters_checkbox.toggled.connect(self.on_meters_toggled)
+        self.loudness_checkbox.toggled.connect(self.on_loudness_toggled)
+        self.vectorscope_checkbox.toggled.connect(self.on_vectorscope_toggled)
+        self.events_checkbox.toggled.connect(self.on_events_toggled)
 
         self.setLayout(main_layout)
+        self.request_update()
 
     # -----------------------------------------------------------------------
     # Audio-Device-Scan
     # -----------------------------------------------------------------------
     def refresh_audio_sources(self):
-        ffmpeg_path = "/opt/homebrew/bin/ffmpeg"
+        self.audio_dropdown.clear()
         try:
-            result = subprocess.run(
-                [ffmpeg_path, "-f", "avfoundation", "-list_devices", "true", "-i", ""],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-            )
-            output = result.stderr
-            audio_section = re.split(r'AVFoundation audio devices:', output)
-            self.audio_dropdown.clear()
-            if len(audio_section) < 2:
-                self.audio_dropdown.addItem("No Audio Devices Found")
-                return
-            audio_lines = audio_section[1]
-            matches = re.findall(r'\[(\d+)\]\s+(.*)', audio_lines)
-            if not matches:
-                self.audio_dropdown.addItem("No Audio Devices Found")
-            else:
-                for idx, name in matches:
-                    source_string = f":{idx}"
-                    display_name = f"{idx} - {name}"
-                    self.audio_dropdown.addItem(display_name, source_string)
-
-                for i in range(self.audio_dropdown.count()):
-                    if "soundcraft" in self.audio_dropdown.itemText(i).lower():
-                        self.audio_dropdown.setCurrentIndex(i)
-                        break
-
+            devices = list_devices()
         except Exception:
-            self.audio_dropdown.clear()
             self.audio_dropdown.addItem("Error: Cannot Fetch Devices")
+            devices = []
+        if self.source_spec:
+            self.audio_dropdown.addItem(self.source_spec, self.source_spec)
+        if not devices and self.audio_dropdown.count() == 0:
+            self.audio_dropdown.addItem("No Audio Devices Found")
+        for display_name, spec in devices + synthetic_devices():
+            self.audio_dropdown.addItem(display_name, spec)
+
+        if not self.source_spec:
+            for i in range(self.audio_dropdown.count()):
+                if "soundcraft" in self.audio_dropdown.itemText(i).lower():
+                    self.audio_dropdown.setCurrentIndex(i)
+                    break
 
     # -----------------------------------------------------------------------
     # Start/Stop
@@ -326,6 +853,7 @@ class PCMVisualizerApp(QWidget):
                 "border-radius: 10px; background-color: #aaa; color: black;"
             )
         else:
+            self.close_file()
             self.start_visualizer()
             self.toggle_button.setText("Stop Visualizer")
             self.toggle_button.setStyleSheet(
@@ -340,35 +868,406 @@ class PCMVisualizerApp(QWidget):
             and "Error:" not in self.audio_dropdown.currentText()
         ):
             self.running = True
-            source = self.audio_dropdown.currentData()
+            if self.worker is not None:
+                self.worker.start(self.audio_dropdown.currentData(), self.realtime)
+                self.worker_timer.start()
+                return
+            source = make_source(
+                self.audio_dropdown.currentData(), self.sample_rate, self.realtime,
+                self.channels, low_latency=self.low_latency, sample_format=self.sample_format
+            )
+            self.capture_queue = ChunkQueue(
+                self.queue_size, self.queue_policy, max_frames=self.sample_rate // 2
+            )
             self.capture_thread = AudioCaptureThread(
-                source, self.sample_rate, self.block_size
+                source, self.block_size, self.emit_interval, probes=self.probes,
+                queue=self.capture_queue, min_block=self.min_block
             )
-            self.capture_thread.data_ready.connect(self.update_audio_buffer)
+            self.capture_thread.data_ready.connect(self.drain_capture)
+            self.capture_thread.gap_detected.connect(self.on_gap_detected)
+            self.capture_thread.source_restarting.connect(self.on_source_restarting)
+            self.capture_thread.source_ended.connect(self.on_source_ended)
+            self.capture_thread.recorder = self.recorder
             self.capture_thread.start()
         else:
             print("Kein gültiges Audio-Device ausgewählt.")
 
-    def update_audio_buffer(self, chunk):
-        self.audio_data = np.roll(self.audio_data, -len(chunk))
-        self.audio_data[-len(chunk):] = chunk
+    # -----------------------------------------------------------------------
+    # Aufnahme
+    # -----------------------------------------------------------------------
+    def on_record_toggled(self, checked):
+        if checked:
+            fmt = self.record_format_dropdown.currentData()
+            path = os.path.join(
+                self.record_dir, time.strftime("vizi-%Y%m%d-%H%M%S") + "." + fmt
+            )
+            self.recorder = Recorder(
+                path, self.sample_rate, self.channels, fmt,
+                rotate_seconds=self.rotate_seconds, rotate_bytes=self.rotate_bytes
+            )
+            print(f"Aufnahme: {path}")
+            self.record_button.setText("Aufnahme stoppen")
+            self.record_format_dropdown.setEnabled(False)
+        else:
+            self.stop_recording()
+        if self.capture_thread:
+            self.capture_thread.recorder = self.recorder
+
+    def stop_recording(self):
+        """Recorder abkoppeln; die Queue wird im Hintergrund fertig geschrieben."""
+        if self.recorder is None:
+            return
+        if self.capture_thread:
+            self.capture_thread.recorder = None
+        self.recorder.stop()
+        self.closing_recorders.append(self.recorder)
+        self.recorder = None
+        self.record_button.setText("Aufnahme")
+        self.record_format_dropdown.setEnabled(True)
+
+    # -----------------------------------------------------------------------
+    # Datei-Ansicht
+    # -----------------------------------------------------------------------
+    def on_open_clicked(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Audiodatei öffnen", "", "Audio (*.wav *.raw *.f32 *.pcm)"
+        )
+        if path:
+            self.open_file(path)
+
+    def open_file(self, path):
+        """Datei per Memory-Map anzeigen; Peak-Datei laden oder erzeugen."""
+        if self.running:
+            self.toggle_visualizer()
+        self.close_file()
+        try:
+            audio = AudioFile(path, self.sample_rate, self.channels)
+        except (OSError, ValueError) as e:
+            print(f"Datei kann nicht geöffnet werden: {e}")
+            return
+        self.file_view = FileView(audio, PeakFile.load(audio))
+        if self.file_view.peaks is None:
+            self.peak_thread = PeakFileThread(audio)
+            self.peak_thread.progress.connect(self.on_peak_progress)
+            self.peak_thread.done.connect(self.on_peaks_done)
+            self.peak_progress.setValue(0)
+            self.peak_progress.show()
+            self.peak_thread.start()
+        self.setWindowTitle(f"PCM Audio Visualizer - {path}")
+        self.position_bar.setValue(0)
+        self.file_visible = 0
+        self.position_bar.show()
+        self.zoom_slider.setValue(1)
+        self.on_zoom_changed(1)
+
+    def close_file(self):
+        if self.peak_thread:
+            self.peak_thread.stop()
+            self.peak_thread.wait()
+            self.peak_thread = None
+        if self.file_view is None:
+            return
+        self.file_view = None
+        self.position_bar.hide()
+        self.peak_progress.hide()
+        self.zoom_slider.setValue(self.zoom_slider.default_value)
+        self.request_update()
+
+    def on_peak_progress(self, fraction):
+        self.peak_progress.setValue(int(fraction * 1000))
+
+    def on_peaks_done(self, peaks):
+        if self.sender() is not self.peak_thread:
+            return
+        self.peak_thread.wait()
+        self.peak_thread = None
+        self.peak_progress.hide()
+        if self.file_view is not None:
+            self.file_view.peaks = peaks
+        self.request_update()
+
+    def file_span(self):
+        """Sichtbare Frames der Datei: Zoom 1 = ganze Datei, 100 = 10 ms."""
+        frames = self.file_view.frames
+        shortest = min(frames, max(1, int(0.01 * self.file_view.audio.sample_rate)))
+        span = frames * (shortest / frames) ** ((self.zoom_slider.value() - 1) / 99)
+        return max(1, int(span))
+
+    def file_position(self, visible_samples):
+        start = self.position_bar.value() * self.position_step
+        return min(start, max(0, self.file_view.frames - visible_samples))
+
+    def update_position_bar(self):
+        """Bildlaufleiste in Frames an den Zoom anpassen, die Bildmitte bleibt stehen.
+
+        QScrollBar rechnet mit int32; bei Dateien über 2**31 Frames steht ein
+        Schritt für mehrere Frames.
+        """
+        frames = self.file_view.frames
+        visible = self.file_span()
+        center = self.file_position(self.file_visible) + self.file_visible // 2
+        step = self.position_step = max(1, -(-frames // (2**31 - 1)))
+        bar = self.position_bar
+        bar.blockSignals(True)
+        bar.setRange(0, max(0, frames - visible) // step)
+        bar.setPageStep(max(1, visible // step))
+        bar.setSingleStep(max(1, visible // 10 // step))
+        bar.setValue(max(0, center - visible // 2) // step)
+        bar.blockSignals(False)
+        self.file_visible = visible
+
+    def drain_capture(self):
+        """Alle wartenden Blöcke aus der Capture-Queue in einem Durchgang verarbeiten."""
+        queue = self.capture_queue
+        if queue is None:
+            return
+        chunks, tokens, arrival = queue.take_all()
+        if chunks:
+            self.newest_arrival = arrival
+            self.update_audio_buffer(*chunks)
+        queue.release(tokens)
+        if self.low_latency and time.monotonic() - self.last_render >= self.min_render_interval:
+            # Im Takt der Daten zeichnen statt auf den nächsten Timer-Tick zu warten
+            self.on_frame()
+
+    def update_audio_buffer(self, *chunks):
+        # Läuft im GUI-Thread (queued Signal) -> kein Konflikt mit update_plot
+        chunks = [chunk.reshape(-1, self.channels) for chunk in chunks]
+        display = chunks
+        if self.decimator is not None:
+            t = self.probes.start()
+            display = [self.decimator.process(chunk) for chunk in chunks]
+            self.probes.stop("decimate", t)
+        t = self.probes.start()
+        for chunk in display:
+            self.audio_buffer.write(chunk)
+        self.probes.stop("buffer_write", t)
+        self.summarize_buffer()
+        t = self.probes.start()
+        for chunk in chunks:
+            self.meters.update(chunk)
+        self.probes.stop("meters", t)
+        t = self.probes.start()
+        for chunk in chunks:
+            self.loudness.update(chunk)
+        self.probes.stop("loudness", t)
+        self.update_vectorscope(chunks)
+        self.request_update()
+
+    def update_vectorscope(self, chunks):
+        """Goniometer und Korrelation je Block (nur bei sichtbarem Vektorskop)."""
+        if not self.vectorscope_checkbox.isChecked():
+            return
+        t = self.probes.start()
+        for chunk in chunks:
+            self.goniometer.update(chunk)
+            self.correlation.update(chunk)
+        self.probes.stop("vectorscope", t)
+
+    def summarize_buffer(self):
+        """Min/Max-Stufen, Verlauf und Zonen auf den Stand des Puffers bringen."""
+        t = self.probes.start()
+        self.pyramid.update()
+        if self.history is not None:
+            self.history.update()
+        for zones in self.zones:
+            zones.update()
+        self.probes.stop("summarize", t)
+        t = self.probes.start()
+        self.update_events()
+        self.probes.stop("events", t)
+        if self.trigger_dropdown.currentData() is not None:
+            t = self.probes.start()
+            self.scope.update()
+            self.probes.stop("trigger", t)
+
+    def update_events(self):
+        """Neue Samples des Puffers in den Übersteuerungs-Index einarbeiten."""
+        total = self.audio_buffer.total_written
+        new = total - self.events_seen
+        if new > self.num_samples:
+            # Schon überschrieben: als Lücke behandeln
+            self.events.skip(new - self.num_samples)
+            new = self.num_samples
+        self.events.update(self.audio_buffer.view(new))
+        self.events_seen = total
+
+    def poll_worker(self):
+        """Neue Anzeigedaten aus dem DSP-Prozess in den lokalen Puffer übernehmen."""
+        worker = self.worker
+        seen = self.worker_seen
+        t = self.probes.start()
+        data, self.worker_seen = worker.display.read_since(seen)
+        # Was der Worker schon überschrieben hat, als Lücke eintragen
+        self.audio_buffer.skip(self.worker_seen - seen - data.shape[-1])
+        self.audio_buffer.write(data.T)
+        self.probes.stop("buffer_write", t)
+        if data.shape[-1]:
+            self.newest_arrival = float(worker.state.read()["arrival"][0])
+            self.summarize_buffer()
+            self.update_vectorscope([data.T])
+            self.request_update()
+        if self.running and not worker.running:
+            ended = worker.status()["ended"]
+            self.on_source_ended(
+                "Quelle nicht verfügbar" if ended == 2 else "DSP-Prozess beendet"
+            )
+
+    def on_gap_detected(self, frames):
+        self.gap_count += 1
+        self.gap_frames += frames
+        print(f"Lücke im Eingangsstrom: {1000 * frames / self.sample_rate:.0f} ms verloren")
+
+    def on_source_restarting(self, reason, delay):
+        self.restart_attempts += 1
+        print(f"Quelle abgebrochen ({reason}), Neustart in {delay:.1f} s")
+
+    def on_source_ended(self, reason):
+        print(f"Quelle beendet: {reason}")
+        if self.running:
+            self.toggle_visualizer()
 
     def stop_visualizer(self):
         self.running = False
+        if self.worker is not None:
+            self.worker_timer.stop()
+            self.worker.stop()
+            self.poll_worker()
         if self.capture_thread:
             self.capture_thread.stop()
-            self.capture_thread.wait()
+            # stop() unterbricht auch ffmpeg; länger als ein paar Sekunden
+            # darf das Beenden nicht dauern
+            if not self.capture_thread.wait(3000):
+                print("Capture-Thread reagiert nicht, wird zurückgelassen")
             self.capture_thread = None
 
     # -----------------------------------------------------------------------
     # Plot-Update
     # -----------------------------------------------------------------------
+    def request_update(self, *args):
+        """Neues Bild anfordern (neue Audiodaten, Einstellungen, Größe)."""
+        self.dirty = True
+        self.idle_frames = 0
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def on_frame(self):
+        if self.dirty:
+            self.dirty = False
+            self.idle_frames = 0
+            self.update_plot()
+            return
+        # Ein paar leere Takte abwarten, damit der Timer bei laufender
+        # Aufnahme nicht zwischen zwei Lieferungen stoppt
+        self.idle_frames += 1
+        if self.idle_frames >= 3:
+            self.timer.stop()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.request_update()
+
     def update_plot(self):
-        visible_samples = int(self.num_samples / max(self.time_zoom_factor, 1.0))
-        start_idx = self.num_samples - visible_samples
-        x_data = np.arange(visible_samples)
-        y_data = self.audio_data[start_idx:start_idx + visible_samples] * self.amplitude_factor
-        abs_vals = np.abs(y_data)
+        frame_start = self.probes.start()
+        now = time.monotonic()
+        if self.running and self.last_render:
+            # Abstand der Bilder; Streuung = Ruckeln (Thread- vs. Prozess-Modus)
+            self.probes.add("frame_interval", now - self.last_render)
+        self.last_render = now
+        if self.file_view is None and self.newest_arrival is not None:
+            self.plot_widget.latency_from = self.newest_arrival
+            self.newest_arrival = None
+        scope = self.scope_active()
+        if self.file_view is not None:
+            lanes = self.file_view.channels
+            visible_samples = self.file_span()
+        elif scope:
+            lanes = self.channels
+            visible_samples = self.scope_span()
+        else:
+            lanes = self.channels
+            visible_samples = int(self.num_samples / self.time_zoom_factor)
+        width = max(1, self.plot_widget.width())
+        # Kanäle als Spuren untereinander: Spur c liegt bei y = offsets[c]
+        lane_spacing = 2 * (1 + self.vertical_padding_factor)
+        offsets = -lane_spacing * np.arange(lanes)
+        scrubbing = self.selected_event is not None and self.file_view is None and not scope
+        use_raster = (
+            self.raster_checkbox.isChecked() and self.file_view is None and not scope
+            and not scrubbing and 2 * width <= visible_samples <= self.num_samples
+        )
+        self.waveform_raster.setVisible(use_raster)
+        self.trigger_line.setVisible(scope)
+        self.event_region.setVisible(scrubbing)
+        if scope:
+            self.draw_scope(visible_samples, width, offsets)
+        elif use_raster:
+            self.draw_raster(visible_samples, width, offsets)
+        elif self.file_view is not None:
+            self.draw_file(visible_samples, width, offsets)
+        elif scrubbing:
+            start, end = self.selected_event
+            right = min(self.audio_buffer.total_written, (start + end) // 2 + visible_samples // 2)
+            self.event_region.setRegion(
+                (start - (right - visible_samples), end - (right - visible_samples))
+            )
+            self.draw_history(visible_samples, width, offsets, right)
+        elif visible_samples > self.num_samples and self.history is not None:
+            self.draw_history(visible_samples, width, offsets)
+        else:
+            self.curve_rms.hide()
+            self.draw_recent(visible_samples, width, offsets)
+
+        self.plot_widget.setXRange(0, visible_samples, padding=0)
+        vertical_padding = self.vertical_padding_factor
+        self.plot_widget.setYRange(
+            offsets[-1] - 1 - vertical_padding, 1 + vertical_padding, padding=0
+        )
+
+        # Cursor
+        if self.cursor_checkbox.isChecked():
+            self.cursor_line.setVisible(True)
+            gap = 5
+            cursor_pos = visible_samples - gap
+            self.cursor_line.setPos(cursor_pos)
+        else:
+            self.cursor_line.setVisible(False)
+
+        if self.spectrum_checkbox.isChecked():
+            t = self.probes.start()
+            self.spectrum_panel.refresh()
+            self.probes.stop("spectrum", t)
+
+        if self.meters_checkbox.isChecked():
+            self.meter_panel.refresh()
+
+        if self.loudness_checkbox.isChecked():
+            self.loudness_panel.refresh()
+
+        if self.vectorscope_checkbox.isChecked():
+            self.vectorscope_panel.refresh()
+
+        if self.events_checkbox.isChecked():
+            self.event_panel.refresh()
+
+        self.probes.stop("frame", frame_start)
+        self.frame_count += 1
+        self.update_hud()
+
+    def draw_recent(self, visible_samples, width, offsets):
+        """Waveform aus dem RingBuffer (Rohdaten oder Min/Max-Stufen)."""
+        t = self.probes.start()
+        columns = self.pyramid.column_minmax(visible_samples, width)
+        if columns is None:
+            x_lane = np.arange(visible_samples)
+            y_lanes = self.audio_buffer.view(visible_samples) * self.amplitude_factor
+        else:
+            mins, maxs, spp = columns
+            mins = mins * self.amplitude_factor
+            maxs = maxs * self.amplitude_factor
+            x_lane, y_lanes = interleave_minmax(mins, maxs, spp)
+        x_data, y_data = stack_lanes(x_lane, y_lanes, offsets)
+        self.probes.stop("slice_scale", t)
 
         if self.levelmeter_checkbox.isChecked():
             # Levelmeter an -> wir blenden single_curve aus
@@ -378,21 +1277,40 @@ class PCMVisualizerApp(QWidget):
             self.curve_orange.show()
             self.curve_red.show()
 
-            # 1) Basiskurve: gesamte Welle (keine Lücken)
-            self.curve_base.setData(x_data, y_data, connect="all")
-
-            # 2) Orange nur dort, wo amplitude >= threshold_orange und < threshold_red
-            y_orange = np.where(
-                (abs_vals >= self.settings.threshold_orange) & 
-                (abs_vals < self.settings.threshold_red),
-                y_data, 
-                np.nan
-            )
-            self.curve_orange.setData(x_data, y_orange, connect="finite")
-
-            # 3) Rot nur dort, wo amplitude >= threshold_red
-            y_red = np.where(abs_vals >= self.settings.threshold_red, y_data, np.nan)
-            self.curve_red.setData(x_data, y_red, connect="finite")
+            # Orange/Rot nur aus den Zonen-Segmenten im sichtbaren Bereich
+            t = self.probes.start()
+            window_start = self.audio_buffer.total_written - visible_samples
+            orange_parts = []
+            red_parts = []
+            for channel, zones in enumerate(self.zones):
+                zones.update()
+                orange_runs = zones.runs(ZONE_ORANGE, window_start)
+                red_runs = zones.runs(ZONE_RED, window_start)
+                if columns is None:
+                    orange_parts.append(run_points(*orange_runs, window_start, y_lanes[channel]))
+                    red_parts.append(run_points(*red_runs, window_start, y_lanes[channel]))
+                    continue
+                orange_cols = run_columns(*orange_runs, window_start, spp, width)
+                red_cols = run_columns(*red_runs, window_start, spp, width)
+                orange_parts.append(threshold_strokes(
+                    orange_cols, mins[channel], maxs[channel], spp,
+                    self.settings.threshold_orange, self.settings.threshold_red
+                ))
+                red_parts.append(threshold_strokes(
+                    red_cols, mins[channel], maxs[channel], spp, self.settings.threshold_red
+                ))
+            zone_connect = "finite" if columns is None else "pairs"
+            orange_xy = concat_lanes(orange_parts, offsets)
+            red_xy = concat_lanes(red_parts, offsets)
+            self.probes.stop("threshold", t)
+
+            t = self.probes.start()
+            # 1) Basiskurve: gesamte Welle (Lücken nur zwischen den Spuren)
+            self.curve_base.setData(x_data, y_data, connect="finite")
+            # 2) + 3) Orange- und Rot-Layer
+            self.curve_orange.setData(*orange_xy, connect=zone_connect)
+            self.curve_red.setData(*red_xy, connect=zone_connect)
+            self.probes.stop("set_data", t)
 
         else:
             # Levelmeter aus -> nur single_curve
@@ -401,20 +1319,328 @@ class PCMVisualizerApp(QWidget):
             self.curve_orange.hide()
             self.curve_red.hide()
 
-            self.single_curve.setData(x_data, y_data, connect="all")
-
-        self.plot_widget.setXRange(0, visible_samples, padding=0)
-        vertical_padding = self.vertical_padding_factor
-        self.plot_widget.setYRange(-1 - vertical_padding, 1 + vertical_padding, padding=0)
-
-        # Cursor
-        if self.cursor_checkbox.isChecked():
-            self.cursor_line.setVisible(True)
-            gap = 5
-            cursor_pos = visible_samples - gap
-            self.cursor_line.setPos(cursor_pos)
+            t = self.probes.start()
+            self.single_curve.setData(x_data, y_data, connect="finite")
+            self.probes.stop("set_data", t)
+
+    def draw_scope(self, visible_samples, width, offsets):
+        """Letzter getriggerter Sweep bzw. Mittel, Triggerpunkt in der Bildmitte."""
+        for curve in (self.curve_base, self.curve_orange, self.curve_red, self.curve_rms):
+            curve.hide()
+        self.single_curve.show()
+        self.trigger_line.setPos(self.scope.level * self.amplitude_factor + offsets[0])
+        self.scope.set_window(visible_samples)
+        sweep = self.scope.sweep
+        if sweep is None:
+            self.single_curve.setData([], [])
+            return
+        t = self.probes.start()
+        sweep = sweep * self.amplitude_factor
+        length = sweep.shape[-1]
+        # Durchgang zwischen zwei Samples: um den Bruchteil verschieben
+        x_start = visible_samples // 2 - self.scope.pre + self.scope.offset
+        if length > 2 * width:
+            spp = length // width
+            columns = sweep[:, :width * spp].reshape(len(sweep), width, spp)
+            x_lane, y_lanes = interleave_minmax(columns.min(axis=-1), columns.max(axis=-1), spp)
         else:
-            self.cursor_line.setVisible(False)
+            x_lane, y_lanes = np.arange(length), sweep
+        x_data, y_data = stack_lanes(x_lane + x_start, y_lanes, offsets)
+        self.single_curve.setData(x_data, y_data, connect="finite")
+        self.probes.stop("set_data", t)
+
+    def draw_raster(self, visible_samples, width, offsets):
+        """Waveform als Rasterbild; Kosten je Frame nur nach neuen Spalten."""
+        for curve in (self.curve_base, self.curve_orange, self.curve_red,
+                      self.single_curve, self.curve_rms):
+            curve.hide()
+        t = self.probes.start()
+        settings = self.settings
+        padding = self.vertical_padding_factor
+        thresholds = None
+        if self.levelmeter_checkbox.isChecked():
+            thresholds = (settings.threshold_orange, settings.threshold_red)
+        spp = visible_samples // width
+        # Spalten plus das Sample davor und die laufende Spalte müssen im Puffer liegen
+        columns = min(width, (self.num_samples - 1) // spp - 1)
+        self.waveform_raster.render(
+            self.audio_buffer, spp, visible_samples, columns,
+            max(1, self.plot_widget.height()), self.amplitude_factor, offsets,
+            (offsets[-1] - 1 - padding, 1 + padding),
+            (settings.bg_color, settings.wave_color, settings.color_orange, settings.color_red),
+            thresholds,
+        )
+        self.probes.stop("raster", t)
+
+    def draw_history(self, visible_samples, width, offsets, end=None):
+        """Waveform aus dem Langzeit-Verlauf (Min/Max/RMS je Spalte).
+
+        `end` ist der rechte Rand als absolutes Sample (None = jüngstes).
+        Solange die Sitzung kürzer als der sichtbare Bereich ist, liegen
+        die Daten rechtsbündig.
+        """
+        t = self.probes.start()
+        if end is None:
+            end = self.audio_buffer.total_written
+        oldest = self.audio_buffer.total_written - self.history.available()
+        available = max(0, min(visible_samples, end - oldest))
+        x_offset = visible_samples - available
+        columns = self.history.column_stats(
+            available, max(1, int(width * available / visible_samples)), end
+        )
+        self.probes.stop("slice_scale", t)
+        if columns is None:
+            self.clear_curves()
+            return
+        mins, maxs, rms, spp = columns
+        self.draw_columns(mins, maxs, spp, x_offset, offsets, rms)
+
+    def draw_file(self, visible_samples, width, offsets):
+        """Ausschnitt der geöffneten Datei ab der Scroll-Position."""
+        t = self.probes.start()
+        start = self.file_position(visible_samples)
+        if visible_samples <= width:
+            # Weniger Samples als Pixel: Rohdaten direkt
+            data = self.file_view.audio.read(start, visible_samples)
+            columns = (data, data, 1.0)
+        else:
+            columns = self.file_view.column_minmax(start, visible_samples, width)
+        self.probes.stop("slice_scale", t)
+        if columns is None:
+            # Peak-Datei noch in Arbeit und Ausschnitt zu groß für Rohdaten
+            self.clear_curves()
+            return
+        self.draw_columns(*columns, 0, offsets)
+
+    def clear_curves(self):
+        for curve in (self.curve_base, self.curve_orange, self.curve_red,
+                      self.single_curve, self.curve_rms):
+            curve.setData([], [])
+
+    def draw_columns(self, mins, maxs, spp, x_offset, offsets, rms=None):
+        """Min/Max je Spalte zeichnen, Zonen direkt aus den Spaltenwerten."""
+        t = self.probes.start()
+        mins = mins * self.amplitude_factor
+        maxs = maxs * self.amplitude_factor
+        x_lane, y_lanes = interleave_minmax(mins, maxs, spp)
+        x_data, y_data = stack_lanes(x_lane + x_offset, y_lanes, offsets)
+        if rms is None:
+            self.curve_rms.hide()
+        else:
+            rms = rms * self.amplitude_factor
+            x_rms, y_rms = stack_lanes(
+                x_lane + x_offset, interleave_minmax(-rms, rms, spp)[1], offsets,
+                separate=False
+            )
+            self.curve_rms.show()
+            self.curve_rms.setData(x_rms, y_rms, connect="pairs")
+        if self.levelmeter_checkbox.isChecked():
+            self.single_curve.hide()
+            self.curve_base.show()
+            self.curve_orange.show()
+            self.curve_red.show()
+            every = np.ones(mins.shape[-1], dtype=bool)
+            orange_parts = []
+            red_parts = []
+            for channel in range(len(offsets)):
+                orange_parts.append(threshold_strokes(
+                    every, mins[channel], maxs[channel], spp,
+                    self.settings.threshold_orange, self.settings.threshold_red
+                ))
+                red_parts.append(threshold_strokes(
+                    every, mins[channel], maxs[channel], spp, self.settings.threshold_red
+                ))
+            orange_x, orange_y = concat_lanes(orange_parts, offsets)
+            red_x, red_y = concat_lanes(red_parts, offsets)
+            self.curve_base.setData(x_data, y_data, connect="finite")
+            self.curve_orange.setData(orange_x + x_offset, orange_y, connect="pairs")
+            self.curve_red.setData(red_x + x_offset, red_y, connect="pairs")
+        else:
+            self.single_curve.show()
+            self.curve_base.hide()
+            self.curve_orange.hide()
+            self.curve_red.hide()
+            self.single_curve.setData(x_data, y_data, connect="finite")
+        self.probes.stop("set_data", t)
+
+    # -----------------------------------------------------------------------
+    # Performance-HUD
+    # -----------------------------------------------------------------------
+    def update_hud(self):
+        if not self.hud_checkbox.isChecked():
+            return
+        now = time.monotonic()
+        fps = self.fps_meter.update(self.frame_count, now)
+        ingest = self.ingest_meter.update(self.audio_buffer.total_written, now)
+        if now - self.hud_updated_at < 0.5:
+            return
+        self.hud_updated_at = now
+
+        work = self.probes.recent("frame").mean() if self.frame_count else 0.0
+        paint = self.probes.recent("paint")
+        if len(paint):
+            work += paint.mean()
+        text = (
+            f"FPS {fps:5.1f}\n"
+            f"Frame-Budget {100 * work / self.frame_interval:5.1f} %\n"
+            f"Ingest {ingest:8.0f} / {self.display_rate:.0f} Hz\n"
+        )
+        if self.capture_queue is not None:
+            chunks, frames = self.capture_queue.backlog()
+            stats = self.capture_queue.stats
+            text += (
+                f"Queue {chunks} ({1000 * frames / self.sample_rate:.0f} ms, {self.queue_policy})\n"
+                f"Überläufe {stats['overruns']}, verworfen "
+                f"{1000 * stats['dropped_frames'] / self.sample_rate:.0f} ms\n"
+                f"Lücken {self.gap_count} ({1000 * self.gap_frames / self.sample_rate:.0f} ms)\n"
+            )
+        if self.worker is not None and self.worker.running:
+            status = self.worker.status()
+            text += (
+                f"DSP-Prozess {self.worker.process.pid}: {status['uptime']:6.0f} s, "
+                f"Neustarts {status['restarts']}\n"
+            )
+        thread = self.capture_thread
+        if thread is not None:
+            text += (
+                f"Quelle {thread.uptime():6.0f} s, Neustarts {thread.restarts}, "
+                f"{thread.source.achieved_rate():.0f} Hz, Block {thread.read_block}\n"
+            )
+            log = getattr(thread.source, "log", None)
+            if log is not None and log.speed is not None:
+                text += f"ffmpeg {log.speed:.2f}x, Fehler {log.errors}\n"
+            if log is not None and log.last_error:
+                text += f"  {log.last_error[:60]}\n"
+        intervals = self.probes.recent("frame_interval")
+        if len(intervals) > 1:
+            text += f"Bildabstand σ {1e3 * intervals.std():.1f} ms\n"
+        if self.scope_active():
+            search = self.probes.recent("trigger")
+            text += (
+                f"Trigger {self.scope.triggers}, Sweeps {self.scope.sweeps}, "
+                f"Suche {1e6 * np.median(search) if len(search) else 0:.0f} µs/Block\n"
+            )
+        latency = self.probes.recent("latency")
+        if len(latency):
+            p50, p95, p99 = np.percentile(latency * 1e3, (50, 95, 99))
+            text += f"Latenz p50 {p50:.1f} / p95 {p95:.1f} / p99 {p99:.1f} ms\n"
+        text += f"Speicher/Kanal {self.memory_per_channel() / 2**20:5.1f} MB"
+        if self.recorder is not None:
+            stats = self.recorder.stats
+            text += (
+                f"\nAufnahme-Queue {self.recorder.backlog():.1f} s"
+                f" (max {stats['high_water_s']:.1f} s)"
+                f"\nVerworfen {stats['dropped_blocks']} Blöcke"
+                f"\nGeschrieben {stats['bytes_written'] / 2**20:7.1f} MB"
+            )
+            if self.recorder.error:
+                text += f"\nAufnahme abgebrochen: {self.recorder.error}"
+        self.hud_label.setText(text)
+        self.hud_label.adjustSize()
+
+    def memory_per_channel(self):
+        """Bytes für Audio-Puffer, Min/Max-Stufen und Zonen je Kanal."""
+        total = self.audio_buffer.nbytes + self.pyramid.nbytes
+        if self.history is not None:
+            total += self.history.nbytes
+        total += sum(zones.nbytes for zones in self.zones)
+        total += self.events.nbytes
+        return total / self.channels
+
+    def scope_active(self):
+        return self.file_view is None and self.trigger_dropdown.currentData() is not None
+
+    def scope_span(self):
+        """Sweeplänge: Time Zoom 1 = 1 s, 100 = 1 ms (höchstens der halbe Puffer)."""
+        seconds = 10 ** (-3 * (self.zoom_slider.value() - 1) / 99)
+        return max(2, min(int(seconds * self.display_rate), self.num_samples // 2))
+
+    def on_trigger_changed(self, *args):
+        slope = self.trigger_dropdown.currentData()
+        if slope is not None:
+            self.scope.set_window(self.scope_span())
+            self.scope.configure(
+                level=self.trigger_level_box.value(), slope=slope,
+                averages=self.average_dropdown.currentData(),
+            )
+        self.on_zoom_changed(self.zoom_slider.value())
+
+    def on_spectrum_toggled(self, checked):
+        self.spectrum_panel.setVisible(checked)
+        self.request_update()
+
+    def on_meters_toggled(self, checked):
+        self.meter_panel.setVisible(checked)
+        self.request_update()
+
+    def on_loudness_toggled(self, checked):
+        self.loudness_panel.setVisible(checked)
+        self.request_update()
+
+    def on_vectorscope_toggled(self, checked):
+        self.vectorscope_panel.setVisible(checked)
+        self.request_update()
+
+    def on_events_toggled(self, checked):
+        self.event_panel.setVisible(checked)
+        self.request_update()
+
+    def on_event_selected(self, start, end):
+        """Verlauf so zeigen, dass das Ereignis in der Mitte liegt."""
+        if self.file_view is not None or self.history is None:
+            print("Zurückblättern nur im Live-Modus mit --history-minutes")
+            return
+        total = self.audio_buffer.total_written
+        if start < total - self.history.available():
+            print("Ereignis liegt nicht mehr im Verlauf")
+            return
+        self.selected_event = (start, end)
+        self.request_update()
+
+    def on_live_requested(self):
+        self.selected_event = None
+        self.request_update()
+
+    def on_hud_toggled(self, checked):
+        self.hud_label.setVisible(checked)
+        self.hud_updated_at = 0.0
+        self.request_update()
+
+    def closeEvent(self, event):
+        self.stop_visualizer()
+        if self.worker is not None:
+            # Kein Bild mehr nach Freigabe des Shared Memory
+            self.timer.stop()
+            self.worker.close()
+        self.close_file()
+        self.stop_recording()
+        for recorder in self.closing_recorders:
+            recorder.join(timeout=5)
+        if self.stats_file:
+            self.probes.dump(self.stats_file, {
+                "frames": self.frame_count,
+                "channels": self.channels,
+                "memory_per_channel_mb": self.memory_per_channel() / 2**20,
+                "capture_queue": dict(
+                    self.capture_queue.stats, policy=self.queue_policy
+                ) if self.capture_queue is not None else None,
+                "gaps": {"count": self.gap_count, "frames": self.gap_frames},
+                "restart_attempts": self.restart_attempts,
+                "dsp_process": self.worker is not None,
+                "events": {
+                    "total": self.events.total, "dropped": self.events.dropped,
+                    "red": int(self.events.zone_counts[1]),
+                },
+                "scope": {
+                    "triggers": self.scope.triggers, "sweeps": self.scope.sweeps,
+                    "dropped": self.scope.dropped,
+                },
+                "recordings": [
+                    dict(recorder.stats, paths=recorder.paths)
+                    for recorder in self.closing_recorders
+                ],
+            })
+        super().closeEvent(event)
 
     # -----------------------------------------------------------------------
     # Slider-/Dropdown-Callbacks
@@ -422,17 +1648,49 @@ class PCMVisualizerApp(QWidget):
     def on_amp_changed(self, value):
         self.amplitude_factor = value / 10.0
         self.amp_value_label.setText(f"{self.amplitude_factor:.2f}")
+        thresholds = (
+            self.settings.threshold_orange / self.amplitude_factor,
+            self.settings.threshold_red / self.amplitude_factor,
+        )
+        for zones in self.zones:
+            zones.set_thresholds(*thresholds)
+        self.meters.set_thresholds(*thresholds)
+        self.events.set_thresholds(*thresholds)
+        self.request_update()
 
     def on_zoom_changed(self, value):
+        if self.file_view is not None:
+            span = self.file_span() / self.file_view.audio.sample_rate
+            label = f"{span:.2f} s" if span < 120 else f"{span / 60:.1f} min"
+            self.zoom_value_label.setText(label)
+            self.update_position_bar()
+            self.request_update()
+            return
+        if self.scope_active():
+            self.scope.set_window(self.scope_span())
+            self.zoom_value_label.setText(f"{1e3 * self.scope_span() / self.display_rate:.1f} ms")
+            self.request_update()
+            return
         new_val = value / 10.0
+        if new_val < 1.0 and self.history is not None:
+            # Links vom Standardwert: exponentiell bis zum ganzen Verlauf
+            ratio = self.history_seconds / self.buffer_seconds
+            span = self.buffer_seconds * ratio ** ((10 - value) / 9)
+            self.time_zoom_factor = self.buffer_seconds / span
+            label = f"{span:.0f} s" if span < 120 else f"{span / 60:.1f} min"
+            self.zoom_value_label.setText(label)
+            self.request_update()
+            return
         if new_val < 1.0:
             new_val = 1.0
         self.time_zoom_factor = new_val
         self.zoom_value_label.setText(f"{self.time_zoom_factor:.2f}")
+        self.request_update()
 
     def on_pad_changed(self, value):
         self.vertical_padding_factor = value / 100.0
         self.pad_value_label.setText(f"{self.vertical_padding_factor:.2f}")
+        self.request_update()
 
     def on_wave_color_changed(self):
         color_code = self.wave_color_dropdown.currentData()
@@ -442,27 +1700,121 @@ class PCMVisualizerApp(QWidget):
         self.curve_base.setPen(self.settings.wave_color)
         self.single_curve.setPen(self.settings.wave_color)
         self.cursor_line.setPen(pg.mkPen(self.settings.wave_color, width=2))
+        self.request_update()
 
     def on_bg_color_changed(self):
         bg_color = self.bg_color_dropdown.currentData()
         self.settings.bg_color = bg_color
         self.plot_widget.setBackground(self.settings.bg_color)
+        self.request_update()
 
 
 if __name__ == "__main__":
+    # Im py2app-Bundle startet der DSP-Prozess (spawn) dieses Programm erneut
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="AudiVizi PCM Visualizer")
+    parser.add_argument(
+        "--source",
+        help="Quelle, z.B. pulse:default, file:take.wav, stdin, synth:sine"
+    )
+    parser.add_argument(
+        "--stats-file",
+        help="Messwerte der Pipeline-Stufen beim Beenden als JSON hierhin schreiben"
+    )
+    parser.add_argument(
+        "--channels", type=int, default=1,
+        help="Anzahl der Eingangskanäle (je Kanal eine Spur)"
+    )
+    parser.add_argument(
+        "--open", metavar="DATEI",
+        help="Aufgenommene Datei (WAV oder f32le-Rohdaten) offline anzeigen"
+    )
+    parser.add_argument(
+        "--history-minutes", type=float, default=0,
+        help="Langzeit-Verlauf dieser Länge behalten (Time Zoom < 1 scrollt zurück)"
+    )
+    parser.add_argument(
+        "--record-dir", default=".",
+        help="Verzeichnis für Aufnahmen (Knopf 'Aufnahme')"
+    )
+    parser.add_argument(
+        "--rotate-minutes", type=float,
+        help="Aufnahme nach so vielen Minuten in einer neuen Datei fortsetzen"
+    )
+    parser.add_argument(
+        "--rotate-mb", type=float,
+        help="Aufnahme ab dieser Dateigröße in einer neuen Datei fortsetzen"
+    )
+    parser.add_argument(
+        "--queue-policy", choices=QUEUE_POLICIES, default="drop-oldest",
+        help="Verhalten, wenn das GUI mit der Verarbeitung nicht nachkommt"
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=4,
+        help="Maximal wartende Blöcke zwischen Capture-Thread und GUI"
+    )
+    parser.add_argument(
+        "--low-latency", action="store_true",
+        help="Kleine Blöcke, ffmpeg ohne Puffer, Zeichnen bei Datenankunft"
+    )
+    parser.add_argument(
+        "--sample-format", choices=sorted(SAMPLE_FORMATS), default="f32le",
+        help="Sampleformat der ffmpeg-Pipe (s16le: halbe Bandbreite)"
+    )
+    parser.add_argument(
+        "--decimate", type=int, default=1, metavar="N",
+        help="Anzeige mit 1/N der Abtastrate (Tiefpass + Dezimierung vor dem Puffer)"
+    )
+    parser.add_argument(
+        "--dsp-process", action="store_true",
+        help="Capture und Analyse in einem eigenen Prozess (Shared Memory statt GIL)"
+    )
+    parser.add_argument(
+        "--trigger-hysteresis", type=float, default=0.01,
+        help="Hysterese des Oszilloskop-Triggers (Rohwert)"
+    )
+    parser.add_argument(
+        "--trigger-holdoff-ms", type=float, default=0.0,
+        help="Mindestabstand zweier Trigger (mindestens eine Sweeplänge)"
+    )
+    parser.add_argument(
+        "--max-events", type=int, default=1 << 20,
+        help="Höchstgröße des Übersteuerungs-Index (wächst bei Bedarf bis dahin);"
+             " darüber fallen die ältesten heraus"
+    )
+    parser.add_argument(
+        "--fast", action="store_true",
+        help="Dateien/Testsignale so schnell wie möglich statt in Echtzeit liefern"
+    )
+    args, qt_args = parser.parse_known_args()
+
     # Mic-Zugriffsabfrage auslösen (nur einmalig, ohne Aufnahme)
-    try:
-        subprocess.run([
-            ffmpeg_path,
-            "-f", "avfoundation",
-            "-list_devices", "true",
-            "-i", ""
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except Exception:
-        pass
-
-    app = QApplication(sys.argv)
-    window = PCMVisualizerApp()
+    if sys.platform == "darwin":
+        try:
+            subprocess.run([
+                ffmpeg_path,
+                "-f", "avfoundation",
+                "-list_devices", "true",
+                "-i", ""
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception:
+            pass
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = PCMVisualizerApp(
+        args.source, realtime=not args.fast, stats_file=args.stats_file,
+        channels=args.channels, history_seconds=args.history_minutes * 60,
+        record_dir=args.record_dir,
+        rotate_seconds=args.rotate_minutes * 60 if args.rotate_minutes else None,
+        rotate_bytes=args.rotate_mb * 2**20 if args.rotate_mb else None,
+        queue_policy=args.queue_policy, queue_size=args.queue_size,
+        low_latency=args.low_latency, sample_format=args.sample_format,
+        decimation=args.decimate, dsp_process=args.dsp_process,
+        trigger_hysteresis=args.trigger_hysteresis,
+        trigger_holdoff=args.trigger_holdoff_ms / 1000, max_events=args.max_events,
+    )
+    if args.open:
+        window.open_file(args.open)
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,167 @@
+"""AudiVizi Stapelanalyse: Pegel, Übersteuerungen und Clipping ganzer Verzeichnisse.
+
+Aufruf:
+    python script-vizi-batch.py aufnahmen/ --format csv --output pegel.csv
+    python script-vizi-batch.py a.wav b.flac --jobs 4 --amplitude 2.5
+
+Jede Datei wird in einem eigenen Prozess (ein Prozess je Kern) über eine
+ffmpeg-Pipe dekodiert und ausgewertet; die Ergebnisse erscheinen als
+JSON-Zeilen oder CSV, sobald eine Datei fertig ist. Bereits analysierte,
+unveränderte Dateien kommen aus dem Cache.
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from vizi_batch import (
+    CSV_FIELDS, ResultCache, analyze_file, csv_rows, default_config, find_audio_files
+)
+from vizi_sources import SAMPLE_FORMATS
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "audivizi", "batch")
+
+
+class ResultWriter:
+    """Schreibt jedes Ergebnis sofort (JSON-Zeilen oder CSV mit Kopfzeile)."""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(stream, CSV_FIELDS, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, result):
+        if self.fmt == "csv":
+            self.csv.writerows(csv_rows(result))
+        else:
+            self.stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def format_hours(seconds):
+    return f"{seconds / 3600:.2f} h"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AudiVizi Stapelanalyse")
+    parser.add_argument("paths", nargs="+", help="Audiodateien oder Verzeichnisse (rekursiv)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--output", help="Ergebnisdatei (Standard: stdout)")
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1,
+        help="Parallele Prozesse (Standard: Anzahl der Kerne)"
+    )
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument(
+        "--channels", type=int, default=2,
+        help="Kanäle (ffmpeg mischt auf diese Zahl um; Rohdateien: tatsächliche Zahl)"
+    )
+    parser.add_argument(
+        "--sample-format", choices=sorted(SAMPLE_FORMATS), default="f32le",
+        help="Sampleformat der ffmpeg-Pipe (s16le: halbe Bandbreite)"
+    )
+    parser.add_argument(
+        "--amplitude", type=float, default=1.0,
+        help="Wie der Amplitude-Regler im GUI: Schwellen 0.7/A (orange) und 0.9/A (rot)"
+             " relativ zur Vollaussteuerung"
+    )
+    parser.add_argument(
+        "--fullscale-run", type=int, default=3,
+        help="Clipping: mindestens so viele Samples in Folge auf Vollaussteuerung"
+    )
+    parser.add_argument(
+        "--list-events", type=int, default=100,
+        help="Die lautesten N Übersteuerungen je Datei auflisten (nur JSON)"
+    )
+    parser.add_argument(
+        "--envelope-seconds", type=float, default=0.0,
+        help="Peak-Übersicht mit dieser Auflösung in das JSON schreiben (0 = aus)"
+    )
+    parser.add_argument("--no-loudness", action="store_true", help="Ohne EBU-R128-Lautheit")
+    parser.add_argument("--cache-dir", default=default_cache_dir())
+    parser.add_argument("--no-cache", action="store_true", help="Alles neu analysieren")
+    args = parser.parse_args(argv)
+
+    config = default_config(
+        args.amplitude, sample_rate=args.sample_rate, channels=args.channels,
+        sample_format=args.sample_format, fullscale_run=args.fullscale_run,
+        list_events=args.list_events, envelope_seconds=args.envelope_seconds,
+        loudness=not args.no_loudness,
+    )
+    files = find_audio_files(args.paths)
+    if not files:
+        print("Keine Audiodateien gefunden", file=sys.stderr)
+        return 1
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    stream = open(args.output, "w", newline="") if args.output else sys.stdout
+    writer = ResultWriter(stream, args.format)
+
+    started = time.monotonic()
+    done = errors = 0
+    analyzed_seconds = cached_seconds = 0.0
+
+    def report(result):
+        nonlocal done, errors, analyzed_seconds, cached_seconds
+        done += 1
+        writer.write(result)
+        if result["error"]:
+            errors += 1
+            status = f"Fehler: {result['error']}"
+        elif result["cached"]:
+            cached_seconds += result["duration_s"]
+            status = "Cache"
+        else:
+            analyzed_seconds += result["duration_s"]
+            status = f"{result['speed']:.0f}x Echtzeit"
+        print(f"[{done}/{len(files)}] {result['path']}: {status}", file=sys.stderr)
+
+    pending = []
+    for path in files:
+        result = cache.load(path, config) if cache is not None else None
+        if result is None:
+            pending.append(path)
+        else:
+            report(dict(result, cached=True))
+
+    jobs = max(1, min(args.jobs, len(pending)))
+    # spawn wie beim DSP-Prozess: keine geerbten Threads und Dateideskriptoren
+    with concurrent.futures.ProcessPoolExecutor(
+        jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = {pool.submit(analyze_file, path, config): path for path in pending}
+        for future in concurrent.futures.as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # Absturz im Prozess: Datei als Fehler melden
+                result = {"path": path, "error": f"{type(e).__name__}: {e}", "cached": False}
+            if cache is not None and not result["error"]:
+                cache.store(path, config, result)
+            report(result)
+
+    if stream is not sys.stdout:
+        stream.close()
+    wall = time.monotonic() - started
+    print(
+        f"{done} Dateien ({errors} Fehler) in {wall:.1f} s mit {jobs} Prozessen: "
+        f"{format_hours(analyzed_seconds)} analysiert, "
+        f"{format_hours(cached_seconds)} aus dem Cache; "
+        f"{analyzed_seconds / 3600 / max(wall / 60, 1e-9):.2f} Audio-Stunden je Minute",
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    # Eingefroren (py2app/PyInstaller) starten die spawn-Prozesse dieses Programm erneut
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -11,6 +11,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QTimer, Qt
 import pyqtgraph as pg
 
+from vizi_ringbuffer import RingBuffer
+
 
 class ResettableSlider(QSlider):
     """Slider, der bei Doppelklick auf seinen Default-Wert zurückspringt."""
@@ -35,7 +37,7 @@ class PCMVisualizerApp(QWidget):
         self.sample_rate = 44100
         self.buffer_seconds = 5
         self.num_samples = self.sample_rate * self.buffer_seconds  # z.B. 220500
-        self.audio_data = np.zeros(self.num_samples, dtype=np.float32)
+        self.audio_buffer = RingBuffer(self.num_samples)
         self.block_size = 1024
 
         # --- Visual-Einstellungen ---
@@ -167,7 +169,7 @@ class PCMVisualizerApp(QWidget):
         self.plot_widget.hideAxis('bottom')
         self.plot_widget.hideAxis('left')
         self.plot_widget.setBackground("#000000")
-        self.curve = self.plot_widget.plot(self.audio_data, pen="w")
+        self.curve = self.plot_widget.plot(self.audio_buffer.view(), pen="w")
         # Füge einen Cursor als InfiniteLine hinzu; zunächst unsichtbar
         self.cursor_line = pg.InfiniteLine(angle=90, pen=pg.mkPen("w", width=2))
         self.cursor_line.setVisible(False)
@@ -245,8 +247,7 @@ class PCMVisualizerApp(QWidget):
             if not raw_data or len(raw_data) < self.block_size * bytes_per_sample:
                 break
             chunk = np.frombuffer(raw_data, dtype=np.float32)
-            self.audio_data = np.roll(self.audio_data, -len(chunk))
-            self.audio_data[-len(chunk):] = chunk
+            self.audio_buffer.write(chunk)
         if self.process:
             self.process.terminate()
 
@@ -256,9 +257,10 @@ class PCMVisualizerApp(QWidget):
     def update_plot(self):
         # Horizontaler Ausschnitt (Time Zoom)
         visible_samples = int(self.num_samples / max(self.time_zoom_factor, 1.0))
-        start_idx = self.num_samples - visible_samples
         x_data = np.arange(visible_samples)
-        y_data = self.audio_data[start_idx:start_idx + visible_samples] * self.amplitude_factor
+        # Schreiber ist der Capture-Thread -> konsistente Kopie über snapshot()
+        y_data = self.audio_buffer.snapshot(visible_samples)
+        y_data *= self.amplitude_factor
         self.curve.setData(x_data, y_data)
 
         self.plot_widget.setXRange(0, visible_samples, padding=0)
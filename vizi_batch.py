@@ -0,0 +1,377 @@
+"""Stapelanalyse ganzer Verzeichnisse: Pegel, Übersteuerungen, Clipping, Peaks.
+
+Jede Datei wird über dieselbe Quelle wie im GUI gelesen (FileSource:
+ffmpeg-Pipe, Rohdateien direkt) und blockweise durch LevelMeter,
+OverloadIndex und LoudnessMeter geschickt. Die Ergebnisse je Datei sind
+einfache Dicts (JSON-fähig) und werden im Cache-Verzeichnis abgelegt;
+ein neuer Lauf überspringt Dateien, deren Größe, mtime und Einstellungen
+unverändert sind.
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from vizi_events import OverloadIndex
+from vizi_levels import THRESHOLD_ORANGE, THRESHOLD_RED, ZONE_RED, find_runs
+from vizi_loudness import LoudnessMeter
+from vizi_meters import LevelMeter, to_db
+from vizi_sources import RAW_EXTENSIONS, FileSource
+
+# Bei Änderungen an der Auswertung erhöhen: alte Cache-Einträge verfallen
+ANALYSIS_VERSION = 3
+AUDIO_EXTENSIONS = (
+    ".wav", ".flac", ".mp3", ".ogg", ".opus", ".m4a", ".aac", ".aif", ".aiff", ".wv",
+) + RAW_EXTENSIONS
+
+CSV_FIELDS = (
+    "path", "channel", "duration_s", "peak_db", "peak_at_s", "true_peak_db", "rms_db",
+    "rms_max_db", "clips", "fullscale_samples", "fullscale_runs", "overloads",
+    "overloads_red", "overload_s", "longest_overload_ms", "integrated_lufs", "lra_lu",
+    "cached", "error",
+)
+
+
+def default_config(amplitude=1.0, **overrides):
+    """Einstellungen der Analyse; Schwellen wie im GUI (Schwelle / Amplitude)."""
+    config = {
+        "sample_rate": 44100,
+        "channels": 2,
+        "sample_format": "f32le",
+        "block_size": 1 << 16,
+        "threshold_orange": THRESHOLD_ORANGE / amplitude,
+        "threshold_red": THRESHOLD_RED / amplitude,
+        # Clipping: mindestens `fullscale_run` Samples in Folge auf Vollaussteuerung
+        "fullscale_level": 0.999,
+        "fullscale_run": 3,
+        "max_events": 1 << 16,
+        "list_events": 100,
+        "envelope_seconds": 0.0,
+        "loudness": True,
+    }
+    config.update(overrides)
+    return config
+
+
+def find_audio_files(paths):
+    """Audiodateien aus Dateien und (rekursiv) Verzeichnissen, sortiert."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                found += [
+                    os.path.join(root, name) for name in sorted(files)
+                    if name.lower().endswith(AUDIO_EXTENSIONS)
+                ]
+        else:
+            found.append(path)
+    return found
+
+
+class ResultCache:
+    """Ein JSON je analysierter Datei, gültig solange Quelle und Einstellungen passen."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def signature(path, config):
+        stat = os.stat(path)
+        return {
+            "path": os.path.abspath(path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "version": ANALYSIS_VERSION,
+            "config": config,
+        }
+
+    def _entry_path(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        return os.path.join(self.directory, key + ".json")
+
+    def load(self, path, config):
+        """Gespeichertes Ergebnis oder None (fehlt, veraltet, unlesbar)."""
+        try:
+            with open(self._entry_path(path)) as f:
+                entry = json.load(f)
+            if entry.get("signature") != self.signature(path, config):
+                return None
+        except (OSError, ValueError):
+            return None
+        return entry["result"]
+
+    def store(self, path, config, result):
+        target = self._entry_path(path)
+        tmp = target + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"signature": self.signature(path, config), "result": result}, f)
+        os.replace(tmp, target)
+
+
+class FullScaleCounter:
+    """Zählt Samples auf Vollaussteuerung und Läufe von mindestens `run` Samples."""
+
+    def __init__(self, channels, level, run):
+        self.level = level
+        self.run = run
+        self.samples = np.zeros(channels, dtype=np.int64)
+        self.runs = np.zeros(channels, dtype=np.int64)
+        # Länge eines am Blockende offenen Laufs je Kanal
+        self._open = np.zeros(channels, dtype=np.int64)
+
+    def update(self, a):
+        """Beträge (channels, n)."""
+        over = a >= self.level
+        hit = over.any(axis=1)
+        for c in np.flatnonzero(~hit & (self._open > 0)):
+            self._close(c, self._open[c])
+            self._open[c] = 0
+        for c in np.flatnonzero(hit):
+            starts, ends = find_runs(over[c])
+            lengths = ends - starts
+            self.samples[c] += lengths.sum()
+            if self._open[c] and starts[0] == 0:
+                lengths[0] += self._open[c]
+            elif self._open[c]:
+                self._close(c, self._open[c])
+            self._open[c] = 0
+            if ends[-1] == over.shape[1]:
+                # Läuft im nächsten Block weiter
+                self._open[c] = lengths[-1]
+                lengths = lengths[:-1]
+            self.runs[c] += np.count_nonzero(lengths >= self.run)
+
+    def _close(self, c, length):
+        if length >= self.run:
+            self.runs[c] += 1
+
+    def flush(self):
+        for c in np.flatnonzero(self._open):
+            self._close(c, self._open[c])
+        self._open[...] = 0
+
+
+class WindowRmsMax:
+    """Größter RMS je Kanal über ein gleitendes Fenster von `window` Samples.
+
+    Ausgewertet wird jede Fensterposition, nicht nur das Blockende: die
+    Fenstersummen kommen aus der kumulierten Quadratsumme des Blocks samt
+    den letzten window - 1 Quadraten des vorigen. Vor dem Dateianfang
+    zählt Stille; ist die Datei kürzer als ein Fenster, gilt ihr RMS.
+    """
+
+    def __init__(self, channels, window):
+        self.window = max(1, int(window))
+        self.maximum = np.zeros(channels)
+        self.samples = 0
+        self._tail = np.zeros((channels, self.window - 1))
+
+    def update(self, x):
+        """Planarer Block (channels, n)."""
+        squares = np.concatenate((self._tail, np.square(x, dtype=np.float64)), axis=1)
+        sums = np.zeros((len(squares), squares.shape[1] + 1))
+        np.cumsum(squares, axis=1, out=sums[:, 1:])
+        windowed = sums[:, self.window:] - sums[:, :-self.window]
+        np.maximum(self.maximum, windowed.max(axis=1), out=self.maximum)
+        self._tail = squares[:, squares.shape[1] - (self.window - 1):]
+        self.samples += x.shape[1]
+
+    def finish(self):
+        """RMS-Maxima (linear)."""
+        if 0 < self.samples < self.window:
+            return np.sqrt(np.maximum(self.maximum, 0) / self.samples)
+        return np.sqrt(np.maximum(self.maximum, 0) / self.window)
+
+
+class PeakEnvelope:
+    """Spitzenwert je Kanal in festen Zeitabschnitten (Peak-Übersicht einer Datei)."""
+
+    def __init__(self, channels, block):
+        self.block = max(1, int(block))
+        self.columns = []
+        self._current = np.zeros(channels, dtype=np.float32)
+        self._fill = 0
+
+    def update(self, a):
+        pos = 0
+        n = a.shape[1]
+        while pos < n:
+            if self._fill == 0 and n - pos >= self.block:
+                # Ganze Abschnitte auf einmal
+                full = (n - pos) // self.block * self.block
+                blocks = a[:, pos:pos + full].reshape(len(a), -1, self.block).max(axis=2)
+                self.columns.extend(blocks.T)
+                pos += full
+                continue
+            take = min(self.block - self._fill, n - pos)
+            np.maximum(self._current, a[:, pos:pos + take].max(axis=1), out=self._current)
+            self._fill += take
+            pos += take
+            if self._fill == self.block:
+                self.columns.append(self._current.copy())
+                self._current[...] = 0
+                self._fill = 0
+
+    def finish(self):
+        if self._fill:
+            self.columns.append(self._current.copy())
+        if not self.columns:
+            return []
+        return np.round(to_db(np.array(self.columns, dtype=np.float64).T), 2).tolist()
+
+
+def _read_block(source, view):
+    """Bis zu len(view) Bytes; weniger nur am Dateiende."""
+    got = 0
+    while got < len(view):
+        n = source.readinto(view[got:])
+        if not n:
+            break
+        got += n
+    return got
+
+
+def _finite(value, digits=2):
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def analyze_file(path, config):
+    """Eine Datei komplett auswerten; gibt ein JSON-fähiges Dict zurück."""
+    started = time.perf_counter()
+    rate = config["sample_rate"]
+    channels = config["channels"]
+    result = {"path": path, "error": None, "cached": False}
+    source = FileSource(path, rate, realtime=False, channels=channels,
+                        sample_format=config["sample_format"])
+    try:
+        source.open()
+    except OSError as e:
+        result["error"] = str(e)
+        return result
+
+    thresholds = (config["threshold_orange"], config["threshold_red"])
+    meter = LevelMeter(rate, channels, *thresholds)
+    events = OverloadIndex(channels, rate, *thresholds, capacity=config["max_events"])
+    fullscale = FullScaleCounter(channels, config["fullscale_level"], config["fullscale_run"])
+    loudness = LoudnessMeter(rate, channels) if config["loudness"] else None
+    envelope = (
+        PeakEnvelope(channels, config["envelope_seconds"] * rate)
+        if config["envelope_seconds"] > 0 else None
+    )
+    raw = np.empty((config["block_size"], channels), dtype=source.dtype)
+    raw_bytes = memoryview(raw).cast("B")
+    stage = np.empty(raw.shape, dtype=np.float32)
+    scale = np.float32(1 / 32768)
+    energy = np.zeros(channels)
+    # Zwischen zwei Blockenden liegen mehrere RMS-Fenster des Meters
+    rms_max = WindowRmsMax(channels, meter.rms_window * rate)
+    peak = np.zeros(channels, dtype=np.float32)
+    peak_at = np.zeros(channels, dtype=np.int64)
+    frames = 0
+    try:
+        while True:
+            got = _read_block(source, raw_bytes) // source.bytes_per_frame
+            if not got:
+                break
+            if raw.dtype == np.float32:
+                chunk = raw[:got]
+            else:
+                chunk = np.multiply(raw[:got], scale, out=stage[:got])
+            a = np.abs(chunk.T)
+            where = a.argmax(axis=1)
+            block_peak = a[np.arange(channels), where]
+            newer = block_peak > peak
+            peak[newer] = block_peak[newer]
+            peak_at[newer] = frames + where[newer]
+            energy += np.einsum("ij,ij->i", chunk.T, chunk.T, dtype=np.float64)
+            meter.update(chunk)
+            rms_max.update(chunk.T)
+            events.update(chunk.T)
+            fullscale.update(a)
+            if loudness is not None:
+                loudness.update(chunk)
+            if envelope is not None:
+                envelope.update(a)
+            frames += got
+            if got < config["block_size"]:
+                break
+    finally:
+        log = getattr(source, "log", None)
+        source.close()
+    events.flush()
+    fullscale.flush()
+    rms_max = rms_max.finish()
+    if frames == 0:
+        result["error"] = (log.last_error if log is not None and log.last_error
+                           else "keine Audiodaten")
+        return result
+
+    elapsed = time.perf_counter() - started
+    duration = frames / rate
+    result.update(
+        duration_s=duration,
+        frames=frames,
+        sample_rate=rate,
+        channels=channels,
+        analysis_s=round(elapsed, 3),
+        speed=round(duration / elapsed, 1) if elapsed > 0 else None,
+        loudness={
+            "integrated_lufs": _finite(loudness.integrated),
+            "lra_lu": _finite(loudness.loudness_range),
+        } if loudness is not None else None,
+        events_total=events.total,
+    )
+    result["per_channel"] = [
+        {
+            "channel": c + 1,
+            "peak_db": _finite(to_db(peak[c])),
+            "peak_at_s": round(peak_at[c] / rate, 3),
+            "true_peak_db": _finite(to_db(meter.true_peak_max[c])),
+            "rms_db": _finite(to_db(np.sqrt(energy[c] / frames))),
+            "rms_max_db": _finite(to_db(rms_max[c])),
+            "clips": int(meter.clips[c]),
+            "fullscale_samples": int(fullscale.samples[c]),
+            "fullscale_runs": int(fullscale.runs[c]),
+            "overloads": int(events.counts[c].sum()),
+            "overloads_red": int(events.counts[c, ZONE_RED]),
+            "overload_s": round(events.overload_samples[c] / rate, 3),
+            "longest_overload_ms": round(1e3 * events.longest_by_channel[c] / rate, 1),
+        }
+        for c in range(channels)
+    ]
+    # Die lautesten Übersteuerungen (aus dem noch gespeicherten Teil des Index)
+    stored = events.recent(events.count)
+    loudest = stored[np.argsort(stored["peak"], kind="stable")[::-1][:config["list_events"]]]
+    result["overloads"] = [
+        {
+            "start_s": round(event["start"] / rate, 3),
+            "duration_ms": round(1e3 * (event["end"] - event["start"]) / rate, 1),
+            "peak_db": _finite(to_db(event["peak"])),
+            "channel": int(event["channel"]) + 1,
+            "red": bool(event["zone"] == ZONE_RED),
+        }
+        for event in np.sort(loudest, order="start")
+    ]
+    if envelope is not None:
+        result["envelope"] = {
+            "seconds": config["envelope_seconds"], "peak_db": envelope.finish()
+        }
+    return result
+
+
+def csv_rows(result):
+    """Eine Zeile je Kanal (bei Fehlern eine Zeile ohne Messwerte)."""
+    base = {"path": result["path"], "cached": result["cached"], "error": result["error"]}
+    if result["error"]:
+        return [base]
+    loudness = result["loudness"] or {}
+    base.update(
+        duration_s=round(result["duration_s"], 3),
+        integrated_lufs=loudness.get("integrated_lufs"),
+        lra_lu=loudness.get("lra_lu"),
+    )
+    return [dict(base, **channel) for channel in result["per_channel"]]
@@ -0,0 +1,162 @@
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+
+
+class MinMaxPyramid:
+    """Mehrstufige Min/Max-Zusammenfassung (Mipmap) über einem RingBuffer.
+
+    Stufe 0 fasst je `base_block` Samples zusammen, jede weitere Stufe
+    `factor` Blöcke der darunterliegenden. update() verarbeitet nur die seit
+    dem letzten Aufruf neu geschriebenen Samples; envelope() liest danach
+    nie mehr Rohdaten als einen Block am rechten Rand.
+
+    Bei einem mehrkanaligen RingBuffer werden alle Kanäle gemeinsam in
+    einem Schritt verdichtet; die Ergebnisse haben dann die Form
+    (channels, ...).
+    """
+
+    def __init__(self, ring, base_block=8, factor=4, min_blocks=64):
+        self.ring = ring
+        self.factor = factor
+        self.block_sizes = []
+        self._mins = []
+        self._maxs = []
+        size = base_block
+        while ring.capacity // size >= min_blocks:
+            cap = ring.capacity // size + 2
+            self.block_sizes.append(size)
+            self._mins.append(RingBuffer(cap, ring.dtype, ring.channels))
+            self._maxs.append(RingBuffer(cap, ring.dtype, ring.channels))
+            size *= factor
+        self._x_cache = np.arange(0)
+
+    def update(self):
+        """Neue Samples aus dem RingBuffer in alle Stufen einarbeiten."""
+        src_min = src_max = self.ring
+        src_total = self.ring.total_written
+        for k, size in enumerate(self.block_sizes):
+            step = size if k == 0 else self.factor
+            mins, maxs = self._mins[k], self._maxs[k]
+            pending = src_total - mins.total_written * step
+            if pending > src_min.capacity:
+                # Quelle wurde schneller überschrieben als verarbeitet
+                lost = -(-(pending - src_min.capacity) // step)
+                mins.skip(lost)
+                maxs.skip(lost)
+                pending -= lost * step
+            count = pending // step
+            if count <= 0:
+                break
+            used = count * step
+            src = src_min.view(pending)[..., :used]
+            block_min = src.reshape(src.shape[:-1] + (count, step)).min(axis=-1)
+            src = src_max.view(pending)[..., :used]
+            block_max = src.reshape(src.shape[:-1] + (count, step)).max(axis=-1)
+            # write() erwartet Frames (count, channels)
+            mins.write(block_min.T)
+            maxs.write(block_max.T)
+            src_min, src_max = mins, maxs
+            src_total = mins.total_written
+
+    def clear(self):
+        for mins, maxs in zip(self._mins, self._maxs):
+            mins.clear()
+            maxs.clear()
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._mins + self._maxs)
+
+    def _x(self, n):
+        if len(self._x_cache) < n:
+            self._x_cache = np.arange(n, dtype=np.float64)
+        return self._x_cache[:n]
+
+    def column_minmax(self, n, width):
+        """Min/Max je Pixelspalte für die letzten n Samples.
+
+        Gibt (mins, maxs, samples_per_column) zurück, oder None, wenn
+        weniger als ein Block je Spalte anfällt und Rohdaten günstiger sind.
+        """
+        n = min(int(n), self.ring.capacity)
+        width = max(1, int(width))
+        spp = n / width
+        if not self.block_sizes or spp < self.block_sizes[0]:
+            return None
+
+        k = 0
+        while k + 1 < len(self.block_sizes) and self.block_sizes[k + 1] <= spp:
+            k += 1
+        size = self.block_sizes[k]
+        end = self.ring.total_written
+        start = end - n
+        done = self._mins[k].total_written
+        first = start // size
+        tail = self.ring.view(end - done * size)
+
+        vmin = np.concatenate((self._mins[k].view(done - first), tail), axis=-1)
+        vmax = np.concatenate((self._maxs[k].view(done - first), tail), axis=-1)
+        # Startposition (absolut) jedes Eintrags: erst Blöcke, dann Einzel-Samples
+        pos = np.concatenate((
+            np.arange(first, done) * size,
+            np.arange(done * size, end),
+        ))
+        edges = start + np.arange(width) * spp
+        idx = np.searchsorted(pos, edges, side="right") - 1
+        np.clip(idx, 0, len(pos) - 1, out=idx)
+        return (
+            np.minimum.reduceat(vmin, idx, axis=-1),
+            np.maximum.reduceat(vmax, idx, axis=-1),
+            spp,
+        )
+
+    def envelope(self, n, width):
+        """x/y-Daten für setData: je Spalte ein Min- und ein Max-Punkt.
+
+        Bei wenigen Samples je Spalte werden die Rohdaten unverändert geliefert.
+        """
+        n = min(int(n), self.ring.capacity)
+        columns = self.column_minmax(n, width)
+        if columns is None:
+            return self._x(n), self.ring.view(n)
+        return interleave_minmax(*columns)
+
+
+def interleave_minmax(mins, maxs, spp):
+    """Spalten-Min/Max zu einer Linie verschränken (min, max, min, max, ...)."""
+    width = mins.shape[-1]
+    y = np.empty(mins.shape[:-1] + (2 * width,), dtype=mins.dtype)
+    y[..., 0::2] = mins
+    y[..., 1::2] = maxs
+    x = np.repeat(np.arange(width) * spp, 2)
+    return x, y
+
+
+def stack_lanes(x, ys, offsets, separate=True):
+    """Mehrere Kanäle (ys: (channels, n)) untereinander zu einer Kurve verbinden.
+
+    Jeder Kanal wird um offsets[c] verschoben. Mit separate=True trennt ein
+    NaN-Punkt die Kanäle (für connect="finite"); für connect="pairs" muss
+    separate=False sein, damit die Paare nicht verrutschen.
+    """
+    ys = np.asarray(ys, dtype=np.float64) + np.asarray(offsets, dtype=np.float64)[:, None]
+    channels, n = ys.shape
+    if not separate:
+        return np.tile(x, channels), ys.reshape(-1)
+    x_all = np.empty((channels, n + 1))
+    y_all = np.empty((channels, n + 1))
+    x_all[:, :n] = x
+    y_all[:, :n] = ys
+    x_all[:, n] = np.nan
+    y_all[:, n] = np.nan
+    return x_all.reshape(-1)[:-1], y_all.reshape(-1)[:-1]
+
+
+def concat_lanes(parts, offsets):
+    """Liste von (x, y) je Kanal mit y-Versatz je Kanal aneinanderhängen."""
+    if not parts:
+        return np.zeros(0), np.zeros(0)
+    x = np.concatenate([part[0] for part in parts])
+    y = np.concatenate([part[1] + offset for part, offset in zip(parts, offsets)])
+    return x, y
@@ -0,0 +1,241 @@
+"""Index der Übersteuerungen einer Sitzung (Start, Dauer, Spitze, Kanal)."""
+import numpy as np
+
+from vizi_levels import ZONE_ORANGE, ZONE_RED, find_runs
+from vizi_ringbuffer import RingBuffer
+
+# Ausgabeformat von query() und recent()
+EVENT_DTYPE = np.dtype([
+    ("start", np.int64), ("end", np.int64), ("peak", np.float32),
+    ("channel", np.uint8), ("zone", np.uint8),
+])
+
+
+class OverloadIndex:
+    """Jede Überschreitung der Orange-Schwelle als Ereignis, spaltenweise gespeichert.
+
+    update() sucht in jedem neuen Block je Kanal die Läufe mit
+    |x| >= threshold_orange (find_runs) und fasst Läufe mit höchstens
+    `merge_gap` Sekunden Abstand zusammen, damit die Halbwellen eines
+    übersteuerten Tons ein Ereignis bleiben. Die Spitze je Ereignis kommt
+    aus np.maximum.reduceat, die Zone (rot, wenn die Spitze threshold_red
+    erreicht) wird beim Erkennen festgehalten. Ein Ereignis, das bis an
+    das Blockende reicht, bleibt offen und wird im nächsten Block
+    fortgesetzt.
+
+    Ereignisse werden erst nach ihrem Ende abgelegt, daher ist die Ablage
+    nach dem Ende sortiert und query() kommt mit searchsorted aus. Die
+    Spalten (Ende, Dauer, Spitze, Kanal, Zone: 18 Byte) sind RingBuffer;
+    sie beginnen mit `initial_capacity` Einträgen (gespiegelt ca. 2.3 MB für
+    65536) und verdoppeln sich bei Bedarf bis `capacity` (ca. 36 MB für
+    eine Million). Erst dann fallen die ältesten Ereignisse heraus.
+    Positionen sind absolute Sample-Indizes ab Sitzungsbeginn.
+    """
+
+    def __init__(self, channels, sample_rate, threshold_orange, threshold_red,
+                 merge_gap=0.05, capacity=1 << 20, initial_capacity=1 << 16):
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.merge_gap = int(merge_gap * sample_rate)
+        self.thresholds = (threshold_orange, threshold_red)
+        self.max_capacity = int(capacity)
+        self.initial_capacity = max(1, min(int(initial_capacity), self.max_capacity))
+        self.clear()
+
+    def clear(self):
+        # Neu anlegen statt leeren: ein gewachsener Index schrumpft wieder
+        capacity = self.initial_capacity
+        self._ends = RingBuffer(capacity, np.int64)
+        self._lengths = RingBuffer(capacity, np.uint32)
+        self._peaks = RingBuffer(capacity, np.float32)
+        self._channels = RingBuffer(capacity, np.uint8)
+        self._zones = RingBuffer(capacity, np.uint8)
+        # Offenes Ereignis je Kanal: [start, end, peak] oder None
+        self._open = [None] * self.channels
+        self.position = 0
+        self.longest = 0
+        # Sitzungssummen je Kanal, auch über verdrängte Ereignisse hinweg
+        self.counts = np.zeros((self.channels, 2), dtype=np.int64)
+        # Samples über der Schwelle; die Lücken innerhalb eines Ereignisses zählen nicht
+        self.overload_samples = np.zeros(self.channels, dtype=np.int64)
+        self.longest_by_channel = np.zeros(self.channels, dtype=np.int64)
+
+    @property
+    def _columns(self):
+        return (self._ends, self._lengths, self._peaks, self._channels, self._zones)
+
+    def set_thresholds(self, threshold_orange, threshold_red):
+        """Schwellen in Rohwert-Einheiten; gilt für neue Ereignisse."""
+        self.thresholds = (threshold_orange, threshold_red)
+
+    @property
+    def zone_counts(self):
+        """Ereignisse je Zone (orange, rot) über alle Kanäle."""
+        return self.counts.sum(axis=0)
+
+    @property
+    def capacity(self):
+        """Aktuelle Größe der Spalten (wächst bis max_capacity)."""
+        return self._ends.capacity
+
+    @property
+    def total(self):
+        """Alle bisher abgelegten Ereignisse, auch die schon verdrängten."""
+        return self._ends.total_written
+
+    @property
+    def count(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def dropped(self):
+        return self.total - self.count
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._columns)
+
+    def update(self, block):
+        """Planaren Block (channels, n) im Anschluss an den vorigen auswerten."""
+        n = block.shape[-1]
+        if n == 0:
+            return
+        base = self.position
+        self.position += n
+        found = [
+            self._scan(c, np.abs(block[c]), base) for c in range(self.channels)
+        ]
+        self._store([part for part in found if part is not None])
+
+    def skip(self, n):
+        """Lücke von n Samples: offene Ereignisse abschließen."""
+        if n <= 0:
+            return
+        self.flush()
+        self.position += n
+
+    def flush(self):
+        """Alle offenen Ereignisse ablegen (z.B. am Ende einer Datei)."""
+        closed = []
+        for c, event in enumerate(self._open):
+            if event is not None:
+                start, end, peak = event
+                closed.append(self._event_arrays([start], [end], [peak], c))
+                self._open[c] = None
+        self._store(closed)
+
+    def _scan(self, c, a, base):
+        orange, red = self.thresholds
+        starts, ends = find_runs(a >= orange)
+        self.overload_samples[c] += int((ends - starts).sum())
+        pending = self._open[c]
+        block_end = base + len(a)
+        if not len(starts):
+            if pending is not None and block_end - pending[1] > self.merge_gap:
+                self._open[c] = None
+                return self._event_arrays([pending[0]], [pending[1]], [pending[2]], c)
+            return None
+        # Zwischen zwei Läufen liegt nichts über der Schwelle: das Maximum
+        # bis zum nächsten Lauf ist die Spitze des Laufs
+        peaks = np.maximum.reduceat(a, starts)
+        starts += base
+        ends += base
+        # Läufe mit höchstens merge_gap Abstand gehören zum selben Ereignis
+        breaks = np.flatnonzero(starts[1:] - ends[:-1] > self.merge_gap) + 1
+        heads = np.concatenate(([0], breaks))
+        tails = np.append(heads[1:] - 1, len(starts) - 1)
+        ev_starts = starts[heads]
+        ev_ends = ends[tails]
+        ev_peaks = np.maximum.reduceat(peaks, heads)
+        out_starts, out_ends, out_peaks = [], [], []
+        if pending is not None:
+            if ev_starts[0] - pending[1] <= self.merge_gap:
+                ev_starts[0] = pending[0]
+                ev_peaks[0] = max(ev_peaks[0], pending[2])
+            else:
+                out_starts.append([pending[0]])
+                out_ends.append([pending[1]])
+                out_peaks.append([pending[2]])
+        if block_end - ev_ends[-1] <= self.merge_gap:
+            # Kann im nächsten Block weitergehen
+            self._open[c] = [int(ev_starts[-1]), int(ev_ends[-1]), float(ev_peaks[-1])]
+            ev_starts, ev_ends, ev_peaks = ev_starts[:-1], ev_ends[:-1], ev_peaks[:-1]
+        else:
+            self._open[c] = None
+        out_starts.append(ev_starts)
+        out_ends.append(ev_ends)
+        out_peaks.append(ev_peaks)
+        return self._event_arrays(
+            np.concatenate(out_starts), np.concatenate(out_ends), np.concatenate(out_peaks), c
+        )
+
+    def _event_arrays(self, starts, ends, peaks, channel):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        peaks = np.asarray(peaks, dtype=np.float32)
+        zones = np.where(peaks >= self.thresholds[1], ZONE_RED, ZONE_ORANGE).astype(np.uint8)
+        return starts, ends, peaks, np.full(len(starts), channel, dtype=np.uint8), zones
+
+    def _store(self, parts):
+        parts = [part for part in parts if len(part[0])]
+        if not parts:
+            return
+        starts, ends, peaks, channels, zones = (np.concatenate(col) for col in zip(*parts))
+        if len(parts) > 1:
+            # Über die Kanäle hinweg nach dem Ende sortiert ablegen
+            order = np.argsort(ends, kind="stable")
+            starts, ends, peaks, channels, zones = (
+                col[order] for col in (starts, ends, peaks, channels, zones)
+            )
+        self._reserve(len(ends))
+        lengths = np.minimum(ends - starts, np.iinfo(np.uint32).max)
+        self.longest = max(self.longest, int(lengths.max()))
+        self._ends.write(ends)
+        self._lengths.write(lengths.astype(np.uint32))
+        self._peaks.write(peaks)
+        self._channels.write(channels)
+        self._zones.write(zones)
+        np.add.at(self.counts, (channels, zones), 1)
+        np.maximum.at(self.longest_by_channel, channels, lengths)
+
+    def _reserve(self, n):
+        """Spalten verdoppeln, bis n weitere Ereignisse Platz haben (höchstens max_capacity)."""
+        capacity = self.capacity
+        needed = min(self.count + n, self.max_capacity)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        capacity = min(capacity, self.max_capacity)
+        for buf in self._columns:
+            buf.resize(capacity)
+
+    def _select(self, first, last):
+        count = self.count
+        ends = self._ends.view(count)[first:last]
+        events = np.empty(len(ends), dtype=EVENT_DTYPE)
+        events["end"] = ends
+        events["start"] = ends - self._lengths.view(count)[first:last]
+        events["peak"] = self._peaks.view(count)[first:last]
+        events["channel"] = self._channels.view(count)[first:last]
+        events["zone"] = self._zones.view(count)[first:last]
+        return events
+
+    def query(self, start, end, channel=None, zone=None):
+        """Ereignisse, die sich mit [start, end) überschneiden (EVENT_DTYPE)."""
+        ends = self._ends.view(self.count)
+        first = np.searchsorted(ends, start, side="right")
+        # Wer später als end + längste Dauer endet, beginnt erst nach end
+        last = np.searchsorted(ends, end + self.longest, side="right")
+        events = self._select(first, last)
+        keep = events["start"] < end
+        if channel is not None:
+            keep &= events["channel"] == channel
+        if zone is not None:
+            keep &= events["zone"] == zone
+        return events[keep]
+
+    def recent(self, n):
+        """Die jüngsten n abgelegten Ereignisse, ältestes zuerst."""
+        count = self.count
+        return self._select(max(0, count - n), count)
@@ -0,0 +1,192 @@
+"""Begrenzte Übergabe der Capture-Blöcke an den GUI-Thread.
+
+Der Capture-Thread legt Blöcke in eine ChunkQueue und weckt das GUI nur,
+wenn die Queue vorher leer war; das GUI holt dann alles Wartende auf
+einmal ab. Es liegt also höchstens ein Signal in der Qt-Eventqueue, und
+der Speicher ist unabhängig davon begrenzt, wie lange das GUI hängt.
+
+Strategien, wenn die Queue voll ist:
+
+    coalesce      neuen Block an den jüngsten anhängen (eine Kopie), erst
+                  bei `max_frames` im Sammelblock wird der älteste verworfen
+    drop-oldest   ältesten Block verwerfen; die Anzeige bleibt in Echtzeit
+    block         Capture-Thread wartet; der Rückstau landet bei ffmpeg
+                  bzw. im Gerätepuffer (und kann dort zu Lücken führen)
+"""
+import collections
+import threading
+import time
+
+import numpy as np
+
+POLICIES = ("coalesce", "drop-oldest", "block")
+
+
+class ChunkQueue:
+    """Thread-sichere Queue für Blöcke der Form (frames, channels).
+
+    Blöcke aus dem Puffer-Pool des Capture-Threads tragen eine Marke
+    (`token`) und gelten als belegt, bis das GUI sie mit release()
+    zurückgibt oder die Queue sie verwirft bzw. in einen Sammelblock
+    kopiert. Belegt wird je Puffer vermerkt, nicht nur gezählt: der
+    Capture-Thread fragt mit is_pinned() nach, bevor er einen Pool-Puffer
+    wieder beschreibt.
+    """
+
+    def __init__(self, max_chunks=4, policy="drop-oldest", max_frames=1 << 16):
+        if policy not in POLICIES:
+            raise ValueError(f"Unbekannte Strategie: {policy}")
+        self.max_chunks = max_chunks
+        self.max_frames = max_frames
+        self.policy = policy
+        # [Block, Marken belegter Puffer, Füllstand, Sammelblock?]
+        self._entries = collections.deque()
+        self._frames = 0
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)
+        self._closed = False
+        self._arrival = None  # Lesezeitpunkt des jüngsten Frames in der Queue
+        self._pinned = set()
+        self.stats = {
+            "chunks": 0, "overruns": 0, "dropped_chunks": 0, "dropped_frames": 0,
+            "coalesced": 0, "blocked_s": 0.0, "high_water": 0,
+        }
+
+    @property
+    def pinned(self):
+        """Zahl der belegten Pool-Puffer."""
+        return len(self._pinned)
+
+    def is_pinned(self, token):
+        with self._lock:
+            return token in self._pinned
+
+    # --- Capture-Thread -----------------------------------------------------
+    def put(self, chunk, arrival=None, token=None):
+        """Block einreihen; True, wenn die Queue vorher leer war (GUI wecken).
+
+        arrival ist der Zeitpunkt (time.monotonic), zu dem der letzte Frame
+        des Blocks gelesen wurde; er wird für die Latenzmessung durchgereicht.
+        token markiert den Pool-Puffer, auf den chunk zeigt (None: eigener
+        Speicher, nichts zu sperren).
+        """
+        with self._lock:
+            self.stats["chunks"] += 1
+            self._arrival = arrival
+            if len(self._entries) >= self.max_chunks:
+                self.stats["overruns"] += 1
+                if self.policy == "block":
+                    start = time.monotonic()
+                    while len(self._entries) >= self.max_chunks and not self._closed:
+                        self._space.wait(0.1)
+                    self.stats["blocked_s"] += time.monotonic() - start
+                elif self.policy == "coalesce" and self._coalesce(chunk):
+                    return False
+                else:
+                    self._drop_oldest()
+            was_empty = not self._entries
+            tokens = [] if token is None else [token]
+            self._entries.append([chunk, tokens, len(chunk), False])
+            self._frames += len(chunk)
+            self._pinned.update(tokens)
+            self.stats["high_water"] = max(self.stats["high_water"], len(self._entries))
+            return was_empty
+
+    def _coalesce(self, chunk):
+        """Block in den jüngsten Eintrag kopieren; False, wenn kein Platz ist."""
+        entry = self._entries[-1]
+        data, tokens, fill, merged = entry
+        if not merged:
+            # Erster Überlauf: Sammelblock anlegen, Pool-Puffer freigeben
+            if fill + len(chunk) > self.max_frames:
+                return False
+            block = np.empty((self.max_frames,) + data.shape[1:], dtype=data.dtype)
+            block[:fill] = data
+            self._pinned.difference_update(tokens)
+            entry[0], entry[1], entry[3] = block, [], True
+        elif fill + len(chunk) > len(data):
+            return False
+        entry[0][fill:fill + len(chunk)] = chunk
+        entry[2] = fill + len(chunk)
+        self._frames += len(chunk)
+        self.stats["coalesced"] += 1
+        return True
+
+    def _drop_oldest(self):
+        _, tokens, fill, _ = self._entries.popleft()
+        self._pinned.difference_update(tokens)
+        self._frames -= fill
+        self.stats["dropped_chunks"] += 1
+        self.stats["dropped_frames"] += fill
+
+    # --- GUI-Thread ---------------------------------------------------------
+    def take_all(self):
+        """(Blöcke, Marken belegter Pool-Puffer, Lesezeitpunkt des jüngsten Frames).
+
+        Die Pool-Puffer später mit release(Marken) freigeben.
+        """
+        with self._lock:
+            chunks = [entry[0][:entry[2]] for entry in self._entries]
+            tokens = [token for entry in self._entries for token in entry[1]]
+            self._entries.clear()
+            self._frames = 0
+            self._space.notify_all()
+            return chunks, tokens, self._arrival
+
+    def release(self, tokens):
+        with self._lock:
+            self._pinned.difference_update(tokens)
+
+    def close(self):
+        """Wartenden Capture-Thread freigeben (beim Stoppen)."""
+        with self._lock:
+            self._closed = True
+            self._space.notify_all()
+
+    def backlog(self):
+        """(Blöcke, Frames), die auf das GUI warten."""
+        with self._lock:
+            return len(self._entries), self._frames
+
+
+class GapDetector:
+    """Erkennt Sample-Lücken einer Live-Quelle an der Ankunftszeit.
+
+    Verglichen wird die Wanduhr seit dem Start mit der Zahl gelieferter
+    Frames. Das Defizit schwankt durch Pufferung in ffmpeg, sein Minimum
+    über ein Fenster von `window` Sekunden aber nur um die Taktdrift. Steigt
+    das Minimum von einem Fenster zum nächsten um mehr als `tolerance`
+    Sekunden, hat ffmpeg bzw. das Gerät Samples verloren (z.B. weil der
+    Capture-Thread die Pipe nicht rechtzeitig geleert hat).
+    """
+
+    def __init__(self, sample_rate, window=1.0, tolerance=0.02):
+        self.sample_rate = sample_rate
+        self.window = window
+        self.tolerance = int(tolerance * sample_rate)
+        self.started_at = None
+        self.gaps = 0
+        self.lost_frames = 0
+
+    def update(self, frames, now):
+        """Nach jedem Lesevorgang; gibt die Größe einer erkannten Lücke zurück."""
+        if self.started_at is None:
+            # Das erste Fenster enthält den Anlauf von ffmpeg und zählt nicht
+            self.started_at = now
+            self._window_end = now + self.window
+            self._previous = self._current = None
+            return 0
+        deficit = (now - self.started_at) * self.sample_rate - frames
+        if self._current is not None:
+            self._current = min(self._current, deficit)
+        if now < self._window_end:
+            return 0
+        self._window_end = now + self.window
+        previous, self._previous = self._previous, self._current
+        self._current = np.inf
+        if previous is None or self._previous - previous <= self.tolerance:
+            return 0
+        lost = int(self._previous - previous)
+        self.gaps += 1
+        self.lost_frames += lost
+        return lost
@@ -0,0 +1,143 @@
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+
+
+class HistoryTiers:
+    """Langzeit-Verlauf einer Sitzung in gestuften Min/Max/RMS-Zusammenfassungen.
+
+    Die jüngsten Sekunden liegen in voller Auflösung im RingBuffer; ältere
+    Audiodaten existieren nur noch als Blöcke von `base_block`,
+    `base_block * factor`, ... Samples mit Minimum, Maximum und mittlerer
+    Leistung. Jede Stufe ist ein RingBuffer über `seconds` Sekunden, der
+    Speicher ist also fest (alle Stufen zusammen: ca. 15 MB pro
+    Stunde und Kanal bei 44.1 kHz).
+
+    update() arbeitet wie MinMaxPyramid.update() nur die neuen Samples ein
+    und muss aufgerufen werden, bevor der RingBuffer sie überschreibt.
+    column_stats() liest je Pixelspalte höchstens `factor` Blöcke der
+    passenden Stufe (plus feinere Stufen und Rohdaten am rechten Rand),
+    die Kosten hängen also nicht von der Zoomstufe ab.
+    """
+
+    def __init__(self, ring, seconds, sample_rate, base_block=256, factor=16, min_blocks=64):
+        self.ring = ring
+        self.factor = factor
+        self.capacity = int(seconds * sample_rate)
+        self.block_sizes = []
+        self._mins = []
+        self._maxs = []
+        self._power = []
+        size = base_block
+        while self.capacity // size >= min_blocks:
+            cap = self.capacity // size + 2
+            self.block_sizes.append(size)
+            self._mins.append(RingBuffer(cap, ring.dtype, ring.channels))
+            self._maxs.append(RingBuffer(cap, ring.dtype, ring.channels))
+            self._power.append(RingBuffer(cap, np.float32, ring.channels))
+            size *= factor
+
+    def update(self):
+        """Neue Samples aus dem RingBuffer in alle Stufen einarbeiten."""
+        src = (self.ring, self.ring, None)
+        src_total = self.ring.total_written
+        for k, size in enumerate(self.block_sizes):
+            step = size if k == 0 else self.factor
+            mins, maxs, power = self._mins[k], self._maxs[k], self._power[k]
+            pending = src_total - mins.total_written * step
+            if pending > src[0].capacity:
+                lost = -(-(pending - src[0].capacity) // step)
+                for buf in (mins, maxs, power):
+                    buf.skip(lost)
+                pending -= lost * step
+            count = pending // step
+            if count <= 0:
+                break
+            used = count * step
+
+            def blocks(buf):
+                data = buf.view(pending)[..., :used]
+                return data.reshape(data.shape[:-1] + (count, step))
+
+            mins.write(blocks(src[0]).min(axis=-1).T)
+            maxs.write(blocks(src[1]).max(axis=-1).T)
+            if k == 0:
+                raw = blocks(self.ring)
+                power.write(np.einsum("...i,...i->...", raw, raw).T / step)
+            else:
+                power.write(blocks(src[2]).mean(axis=-1).T)
+            src = (mins, maxs, power)
+            src_total = mins.total_written
+
+    def clear(self):
+        for buf in self._mins + self._maxs + self._power:
+            buf.clear()
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._mins + self._maxs + self._power)
+
+    def available(self):
+        """Samples, die der Verlauf (inkl. Rohdaten) derzeit abdeckt."""
+        return min(self.ring.total_written, self.capacity)
+
+    def column_stats(self, n, width, end=None):
+        """Min, Max und RMS je Pixelspalte für die n Samples vor `end`.
+
+        `end` ist ein absoluter Sample-Index (Standard: das jüngste Sample),
+        damit lässt sich im Verlauf zurückblättern. Gibt (mins, maxs, rms,
+        samples_per_column) zurück; n wird auf den verfügbaren Verlauf
+        begrenzt.
+        """
+        total = self.ring.total_written
+        end = total if end is None else min(int(end), total)
+        n = min(int(n), end - (total - self.available()))
+        width = max(1, int(width))
+        if n <= 0 or not self.block_sizes:
+            return None
+        spp = n / width
+        k = 0
+        while k + 1 < len(self.block_sizes) and self.block_sizes[k + 1] <= spp:
+            k += 1
+        start = end - n
+
+        # Von grob nach fein: jede Stufe liefert die Blöcke nach dem Ende der
+        # gröberen, den Rest bis `end` liefert der RingBuffer
+        mins, maxs, energy, counts, pos = [], [], [], [], []
+        cursor = start // self.block_sizes[k] * self.block_sizes[k]
+        for j in range(k, -1, -1):
+            size = self.block_sizes[j]
+            written = self._mins[j].total_written
+            # Nur Blöcke, die vor `end` beginnen
+            done = min(written, -(-end // size))
+            first = cursor // size
+            if done <= first:
+                continue
+            m = done - first
+            back = written - first
+            mins.append(self._mins[j].view(back)[..., :m])
+            maxs.append(self._maxs[j].view(back)[..., :m])
+            energy.append(self._power[j].view(back)[..., :m] * size)
+            counts.append(np.full(m, size))
+            pos.append(np.arange(first, done) * size)
+            cursor = done * size
+        cursor = min(cursor, end)
+        tail = self.ring.view(total - cursor)[..., :end - cursor]
+        mins.append(tail)
+        maxs.append(tail)
+        energy.append(np.square(tail, dtype=np.float32))
+        counts.append(np.ones(end - cursor, dtype=np.int64))
+        pos.append(np.arange(cursor, end))
+
+        pos = np.concatenate(pos)
+        edges = start + np.arange(width) * spp
+        idx = np.searchsorted(pos, edges, side="right") - 1
+        np.clip(idx, 0, len(pos) - 1, out=idx)
+        col_energy = np.add.reduceat(np.concatenate(energy, axis=-1), idx, axis=-1)
+        col_counts = np.add.reduceat(np.concatenate(counts), idx)
+        return (
+            np.minimum.reduceat(np.concatenate(mins, axis=-1), idx, axis=-1),
+            np.maximum.reduceat(np.concatenate(maxs, axis=-1), idx, axis=-1),
+            np.sqrt(col_energy / col_counts),
+            spp,
+        )
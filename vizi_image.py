@@ -0,0 +1,83 @@
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage
+
+
+def make_lut(name="viridis", levels=256):
+    """Farbtabelle als uint32 (0xAARRGGBB) für direkte Schreibzugriffe ins QImage."""
+    rgba = pg.colormap.get(name).getLookupTable(nPts=levels, alpha=True).astype(np.uint32)
+    return (rgba[:, 3] << 24) | (rgba[:, 0] << 16) | (rgba[:, 1] << 8) | rgba[:, 2]
+
+
+def hex_to_argb(color):
+    """'#rrggbb' -> 0xffrrggbb."""
+    return np.uint32(0xFF000000 | int(color.lstrip("#"), 16))
+
+
+class ScrollingImageItem(pg.GraphicsObject):
+    """Bild mit ringförmigem Spaltenpuffer.
+
+    Neue Spalten werden an der Schreibposition direkt in den Speicher des
+    QImage geschrieben; paint() zeichnet das Bild in zwei Teilen ab der
+    Schreibposition, so dass die neueste Spalte rechts liegt. Beim Scrollen
+    wird nichts umkopiert. Zeile 0 liegt unten (y = 0).
+    """
+
+    def __init__(self, width, height):
+        super().__init__()
+        self.resize_image(width, height)
+
+    def resize_image(self, width, height):
+        self.prepareGeometryChange()
+        self.image_width = max(1, int(width))
+        self.image_height = max(1, int(height))
+        self._image = QImage(self.image_width, self.image_height, QImage.Format_ARGB32)
+        self._image.fill(0)
+        ptr = self._image.bits()
+        ptr.setsize(self._image.sizeInBytes())
+        stride = self._image.bytesPerLine() // 4
+        self.pixels = np.frombuffer(ptr, dtype=np.uint32).reshape(
+            self.image_height, stride
+        )[:, :self.image_width]
+        self.cursor = 0
+        self.update()
+
+    def clear(self, color=0):
+        self.pixels[...] = color
+        self.cursor = 0
+        self.update()
+
+    def write_columns(self, columns):
+        """Spalten (k, height) als uint32-Farben rechts anfügen."""
+        width = self.image_width
+        k = len(columns)
+        if k == 0:
+            return
+        if k > width:
+            columns = columns[-width:]
+            k = width
+        first = min(k, width - self.cursor)
+        self.pixels[:, self.cursor:self.cursor + first] = columns[:first].T
+        rest = k - first
+        if rest:
+            self.pixels[:, :rest] = columns[first:].T
+        self.cursor = (self.cursor + k) % width
+        self.update()
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.image_width, self.image_height)
+
+    def paint(self, painter, *args):
+        width, height = self.image_width, self.image_height
+        cursor = self.cursor
+        # Älteste Spalten (ab cursor) links, neueste (bis cursor) rechts
+        painter.drawImage(
+            QRectF(0, 0, width - cursor, height), self._image,
+            QRectF(cursor, 0, width - cursor, height)
+        )
+        if cursor:
+            painter.drawImage(
+                QRectF(width - cursor, 0, cursor, height), self._image,
+                QRectF(0, 0, cursor, height)
+            )
@@ -0,0 +1,169 @@
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+
+ZONE_ORANGE = 0
+ZONE_RED = 1
+# Standardschwellen in Anzeige-Einheiten (Rohwert = Schwelle / Amplitude)
+THRESHOLD_ORANGE = 0.7
+THRESHOLD_RED = 0.9
+
+
+def find_runs(mask):
+    """Start- und End-Indizes (exklusiv) aller True-Läufe in einer Bool-Maske."""
+    d = np.diff(mask.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    return np.flatnonzero(d == 1), np.flatnonzero(d == -1)
+
+
+class ZoneTracker:
+    """Laufend gepflegte Segmentliste der Levelmeter-Zonen.
+
+    Für jede Zone (orange: threshold_orange <= |x| < threshold_red,
+    rot: |x| >= threshold_red) werden zusammenhängende Läufe als absolute
+    Sample-Indizes [start, end) gespeichert. update() untersucht nur neu
+    geschriebene Samples; ein noch offener Lauf am Pufferende wird beim
+    nächsten Block fortgesetzt.
+
+    Die Laufspeicher beginnen klein (`initial_runs`) und verdoppeln sich
+    nur, wenn sonst Läufe herausfielen, die noch im Audiofenster liegen;
+    höchstens bis zum schlimmsten Fall (jedes zweite Sample ein Lauf).
+    """
+
+    def __init__(self, ring, threshold_orange, threshold_red, initial_runs=1024):
+        self.ring = ring
+        # Läufe einer Zone sind durch mindestens ein Sample getrennt
+        self.max_runs = ring.capacity // 2 + 2
+        self.initial_runs = min(initial_runs, self.max_runs)
+        self._reset()
+        self._dirty = True
+        self.thresholds = (threshold_orange, threshold_red)
+
+    def _reset(self):
+        # Neu anlegen statt leeren: gewachsene Laufspeicher schrumpfen wieder
+        self._starts = [RingBuffer(self.initial_runs, np.int64) for _ in range(2)]
+        self._ends = [RingBuffer(self.initial_runs, np.int64) for _ in range(2)]
+        self._open = [None, None]
+        self._seen = 0
+
+    def set_thresholds(self, threshold_orange, threshold_red):
+        """Schwellen in Rohwert-Einheiten setzen; Puffer wird neu segmentiert."""
+        if (threshold_orange, threshold_red) != self.thresholds:
+            self.thresholds = (threshold_orange, threshold_red)
+            self._dirty = True
+
+    def update(self):
+        end = self.ring.total_written
+        new = end - self._seen
+        if self._dirty or new > self.ring.capacity:
+            self._reset()
+            self._dirty = False
+            new = min(end, self.ring.capacity)
+        if new <= 0:
+            return
+        base = end - new
+        a = np.abs(self.ring.view(new))
+        orange, red = self.thresholds
+        is_red = a >= red
+        self._add_runs(ZONE_ORANGE, (a >= orange) & ~is_red, base)
+        self._add_runs(ZONE_RED, is_red, base)
+        self._seen = end
+
+    def _add_runs(self, zone, mask, base):
+        starts, ends = find_runs(mask)
+        starts += base
+        ends += base
+        open_start = self._open[zone]
+        if open_start is not None:
+            if len(starts) and starts[0] == base:
+                starts[0] = open_start
+            else:
+                starts = np.concatenate(([open_start], starts))
+                ends = np.concatenate(([base], ends))
+        if len(starts) and mask[-1]:
+            self._open[zone] = int(starts[-1])
+            starts, ends = starts[:-1], ends[:-1]
+        else:
+            self._open[zone] = None
+        self._reserve(zone, len(starts))
+        self._starts[zone].write(starts)
+        self._ends[zone].write(ends)
+
+    def _reserve(self, zone, n):
+        """Laufspeicher verdoppeln, wenn n neue Läufe noch sichtbare verdrängen würden."""
+        ends = self._ends[zone]
+        capacity = ends.capacity
+        count = min(ends.total_written, capacity)
+        drop = count + n - capacity
+        if drop <= 0 or capacity >= self.max_runs:
+            return
+        # Verdrängt würden nur Läufe, die vor dem Audiofenster enden
+        window_start = self.ring.total_written - self.ring.capacity
+        if drop <= count and ends.view(count)[drop - 1] <= window_start:
+            return
+        while capacity < count + n:
+            capacity *= 2
+        capacity = min(capacity, self.max_runs)
+        for buf in (self._starts[zone], ends):
+            buf.resize(capacity)
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._starts + self._ends)
+
+    def runs(self, zone, start):
+        """Alle Läufe einer Zone, die nach dem absoluten Index `start` enden."""
+        count = min(self._starts[zone].total_written, self._starts[zone].capacity)
+        ends = self._ends[zone].view(count)
+        first = np.searchsorted(ends, start, side="right")
+        starts = self._starts[zone].view(count)[first:]
+        ends = ends[first:]
+        if self._open[zone] is not None:
+            starts = np.append(starts, self._open[zone])
+            ends = np.append(ends, self._seen)
+        return starts, ends
+
+
+def run_points(starts, ends, window_start, y):
+    """Nur die Samples der Läufe aus y, getrennt durch NaN (für connect="finite")."""
+    s = np.clip(starts - window_start, 0, len(y))
+    e = np.clip(ends - window_start, 0, len(y))
+    lens = e - s + 1
+    offsets = np.cumsum(lens) - lens
+    pos = np.arange(lens.sum()) - np.repeat(offsets, lens) + np.repeat(s, lens)
+    gaps = offsets + lens - 1
+    x = pos.astype(np.float64)
+    y_out = y[np.minimum(pos, len(y) - 1)].astype(np.float64)
+    x[gaps] = np.nan
+    y_out[gaps] = np.nan
+    return x, y_out
+
+
+def run_columns(starts, ends, window_start, spp, width):
+    """Bool-Maske der Pixelspalten, die von mindestens einem Lauf berührt werden."""
+    c0 = np.clip((starts - window_start) // spp, 0, width - 1).astype(np.intp)
+    c1 = np.clip((ends - 1 - window_start) // spp, 0, width - 1).astype(np.intp)
+    marks = np.zeros(width + 1, dtype=np.int32)
+    np.add.at(marks, c0, 1)
+    np.add.at(marks, c1 + 1, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def threshold_strokes(columns, mins, maxs, spp, low, high=np.inf):
+    """Senkrechte Striche für den Bereich low <= |y| < high je markierter Spalte.
+
+    Liefert x/y-Paare für connect="pairs": oben von low bis min(max, high),
+    unten von -low bis max(min, -high).
+    """
+    idx = np.flatnonzero(columns)
+    top = maxs[idx]
+    bottom = mins[idx]
+    up = idx[top >= low]
+    down = idx[bottom <= -low]
+    x = np.repeat(np.concatenate((up, down)) * spp, 2)
+    y = np.empty(len(x), dtype=np.float64)
+    n_up = 2 * len(up)
+    y[0:n_up:2] = low
+    y[1:n_up:2] = np.minimum(maxs[up], high)
+    y[n_up::2] = -low
+    y[n_up + 1::2] = np.maximum(mins[down], -high)
+    return x, y
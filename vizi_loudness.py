@@ -0,0 +1,209 @@
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+
+ABSOLUTE_GATE = -70.0
+HIST_MIN = -70.0
+HIST_MAX = 10.0
+HIST_STEP = 0.1
+
+
+def k_weighting(sample_rate):
+    """K-Filter (BS.1770) als (b, a) 4. Ordnung für beliebige Abtastraten.
+
+    Hochton-Shelf (+4 dB ab ca. 1.7 kHz) und Hochpass (38 Hz) in Reihe;
+    bei 48 kHz ergeben sich die Koeffizienten aus der Norm.
+    """
+    # Parametrisierung nach B. De Man, "Evaluation of Implementations of
+    # the EBU R128 Loudness Measurement" (2018)
+    gain_db, q, fc = 3.99984385397, 0.7071752369554193, 1681.974450955533
+    k = np.tan(np.pi * fc / sample_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    shelf_b = np.array([vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k])
+    shelf_a = np.array([1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k])
+
+    q, fc = 0.5003270373238773, 38.13547087602444
+    k = np.tan(np.pi * fc / sample_rate)
+    high_b = np.array([1.0, -2.0, 1.0])
+    high_a = np.array([1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k])
+
+    b = np.polymul(shelf_b / shelf_a[0], high_b)
+    a = np.polymul(shelf_a / shelf_a[0], high_a / high_a[0])
+    return b, a
+
+
+class BlockFilter:
+    """IIR-Filter für Blöcke fester Länge, mit Zustand über Blockgrenzen.
+
+    Das Filter wird als Zustandsraummodell (transponierte Direktform II)
+    zerlegt: Antwort auf den Block bei Zustand 0 (Faltung mit den ersten
+    `length` Werten der Impulsantwort, per FFT), plus Ausschwingen des
+    alten Zustands, plus neuer Zustand als Matrixprodukt. Alles exakt und
+    vektorisiert, ohne Schleife über Samples.
+    """
+
+    def __init__(self, b, a, length):
+        b = np.asarray(b, dtype=np.float64) / a[0]
+        a = np.asarray(a, dtype=np.float64) / a[0]
+        order = len(a) - 1
+        self.length = length
+        self.order = order
+        A = np.zeros((order, order))
+        A[:, 0] = -a[1:]
+        A[:-1, 1:] = np.eye(order - 1)
+        B = b[1:] - a[1:] * b[0]
+
+        # Potenzen A^k für k = 0 .. length
+        powers = np.empty((length + 1, order, order))
+        powers[0] = np.eye(order)
+        for k in range(length):
+            powers[k + 1] = powers[k] @ A
+        h = np.empty(length)
+        h[0] = b[0]
+        h[1:] = powers[:length - 1, 0, :] @ B
+        self.nfft = 1 << int(np.ceil(np.log2(2 * length)))
+        self.H = np.fft.rfft(h, self.nfft)
+        # Zustand -> Ausgang: y[n] += (A^n)[0] @ s
+        self.free = powers[:length, 0, :]
+        # Eingang -> neuer Zustand: s' = A^L s + sum A^(L-1-k) B x[k]
+        self.drive = (powers[length - 1::-1] @ B).T
+        self.carry = powers[length]
+
+    def initial_state(self, channels):
+        return np.zeros((self.order, channels))
+
+    def process(self, x, state):
+        """Block x (channels, length) filtern; gibt (y, neuer Zustand) zurück."""
+        y = np.fft.irfft(np.fft.rfft(x, self.nfft) * self.H, self.nfft)[:, :self.length]
+        y += (self.free @ state).T
+        return y, self.carry @ state + self.drive @ x.T
+
+
+def _power_to_lufs(power):
+    with np.errstate(divide="ignore"):
+        return -0.691 + 10 * np.log10(power)
+
+
+class LoudnessMeter:
+    """Lautheit nach EBU R128 / ITU-R BS.1770: M, S, I und LRA.
+
+    Eingehende Blöcke werden in 100-ms-Teilblöcke gesammelt; jeder
+    Teilblock wird einmal K-gefiltert (Filterzustand läuft weiter) und auf
+    seine mittlere Energie reduziert. Momentary (400 ms) und Short-term
+    (3 s) sind Mittel über die letzten 4 bzw. 30 Teilblock-Energien.
+
+    Integrated und LRA brauchen alle Messblöcke einer Sitzung; statt sie zu
+    speichern, werden sie in Histogrammen mit 0.1 LU Auflösung gezählt
+    (Anzahl und Energiesumme je Klasse). Der Speicher bleibt dadurch auch
+    bei stundenlangen Sitzungen konstant.
+    """
+
+    def __init__(self, sample_rate, channels, weights=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.weights = np.ones(channels) if weights is None else np.asarray(weights, float)
+        self.sub_block = int(round(sample_rate * 0.1))
+        self.filter = BlockFilter(*k_weighting(sample_rate), self.sub_block)
+        self.edges = np.arange(HIST_MIN, HIST_MAX + HIST_STEP / 2, HIST_STEP)
+        self._pending = np.empty((channels, self.sub_block))
+        self.reset()
+
+    def reset(self):
+        self._state = self.filter.initial_state(self.channels)
+        self._fill = 0
+        self._energies = RingBuffer(30, np.float64)
+        bins = len(self.edges) - 1
+        # Messblöcke (400 ms, 75 % Überlappung) für Integrated
+        self._block_count = np.zeros(bins, dtype=np.int64)
+        self._block_energy = np.zeros(bins)
+        # Short-term-Werte (3 s, alle 100 ms) für LRA
+        self._short_count = np.zeros(bins, dtype=np.int64)
+        self._short_energy = np.zeros(bins)
+        self.sub_blocks = 0
+
+    def update(self, chunk):
+        """Block (n, channels) einarbeiten."""
+        x = chunk.T
+        n = x.shape[1]
+        pos = 0
+        while pos < n:
+            take = min(n - pos, self.sub_block - self._fill)
+            self._pending[:, self._fill:self._fill + take] = x[:, pos:pos + take]
+            self._fill += take
+            pos += take
+            if self._fill == self.sub_block:
+                self._process_sub_block()
+                self._fill = 0
+
+    def _process_sub_block(self):
+        y, self._state = self.filter.process(self._pending, self._state)
+        energy = self.weights @ np.einsum("ij,ij->i", y, y) / self.sub_block
+        self._energies.write(np.array((energy,)))
+        self.sub_blocks += 1
+        if self.sub_blocks >= 4:
+            self._count(self._block_count, self._block_energy, self._mean_energy(4))
+        if self.sub_blocks >= 30:
+            self._count(self._short_count, self._short_energy, self._mean_energy(30))
+
+    def _count(self, counts, energies, energy):
+        loudness = _power_to_lufs(energy)
+        if loudness < ABSOLUTE_GATE:
+            return
+        index = min(int((loudness - HIST_MIN) / HIST_STEP), len(counts) - 1)
+        counts[index] += 1
+        energies[index] += energy
+
+    def _mean_energy(self, count):
+        return self._energies.view(count).mean()
+
+    @property
+    def momentary(self):
+        if self.sub_blocks < 4:
+            return -np.inf
+        return float(_power_to_lufs(self._mean_energy(4)))
+
+    @property
+    def short_term(self):
+        if self.sub_blocks < 30:
+            return -np.inf
+        return float(_power_to_lufs(self._mean_energy(30)))
+
+    def _relative_gate(self, counts, energies, offset):
+        """Erste Histogrammklasse oberhalb der relativen Schwelle."""
+        total = counts.sum()
+        if total == 0:
+            return None
+        threshold = _power_to_lufs(energies.sum() / total) + offset
+        return max(0, int(np.ceil((threshold - HIST_MIN) / HIST_STEP)))
+
+    @property
+    def integrated(self):
+        first = self._relative_gate(self._block_count, self._block_energy, -10.0)
+        if first is None:
+            return -np.inf
+        count = self._block_count[first:].sum()
+        if count == 0:
+            return -np.inf
+        return float(_power_to_lufs(self._block_energy[first:].sum() / count))
+
+    @property
+    def loudness_range(self):
+        """LRA (EBU Tech 3342): 10. bis 95. Perzentil der Short-term-Werte."""
+        first = self._relative_gate(self._short_count, self._short_energy, -20.0)
+        if first is None:
+            return 0.0
+        counts = self._short_count[first:]
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        cumulative = np.cumsum(counts)
+        low = np.searchsorted(cumulative, 0.10 * total, side="right")
+        high = np.searchsorted(cumulative, 0.95 * total, side="left")
+        return float((high - low) * HIST_STEP)
+
+    @property
+    def nbytes(self):
+        arrays = (self._block_count, self._block_energy, self._short_count,
+                  self._short_energy, self._pending)
+        return sum(a.nbytes for a in arrays) + self._energies.nbytes
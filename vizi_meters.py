@@ -0,0 +1,148 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from vizi_ringbuffer import RingBuffer
+
+
+def to_db(x, floor=-120.0):
+    """Lineare Amplitude -> dBFS (1.0 = 0 dBFS)."""
+    return np.maximum(20 * np.log10(np.maximum(x, 1e-12)), floor)
+
+
+def true_peak_filter(oversample=4, taps_per_phase=12):
+    """Polyphasen-Interpolationsfilter (oversample, taps_per_phase).
+
+    Gefensterter Sinc mit Grenzfrequenz bei der ursprünglichen Nyquist-
+    Frequenz; jede Phase hat Gleichverstärkung 1. Die Koeffizienten sind
+    bereits gespiegelt, so dass ein Fenster (alt -> neu) direkt mit einer
+    Phase multipliziert werden kann.
+    """
+    length = oversample * taps_per_phase
+    t = (np.arange(length) - (length - 1) / 2) / oversample
+    h = np.sinc(t) * np.kaiser(length, 8.0)
+    phases = h.reshape(taps_per_phase, oversample).T
+    phases = phases / phases.sum(axis=1, keepdims=True)
+    return phases[:, ::-1].astype(np.float32)
+
+
+class LevelMeter:
+    """Laufende Peak-, RMS- und True-Peak-Messung je Kanal.
+
+    update() verarbeitet jeden eingehenden Block genau einmal: Peak und
+    True Peak als Maximum seit dem letzten take_peaks(), RMS als gleitende
+    Quadratsumme über `rms_window` Sekunden (neue Quadrate addieren,
+    herausfallende abziehen), True Peak über 4-fache Polyphasen-Über-
+    abtastung mit dem Filterzustand aus dem vorigen Block. Die Kosten
+    hängen nur von der Blocklänge ab, nicht von Pufferlänge oder Bildrate.
+
+    Peak-Hold hält das Maximum `hold_seconds` lang; der Clip-Zähler zählt
+    Überschreitungen der roten Schwelle, wobei Samples mit weniger als
+    `clip_gap` Sekunden Abstand (z.B. die Halbwellen eines übersteuerten
+    Tons) als ein Ereignis gelten, auch über Blockgrenzen hinweg.
+    Schwellen in Rohwert-Einheiten wie beim ZoneTracker.
+    """
+
+    def __init__(self, sample_rate, channels, threshold_orange, threshold_red,
+                 rms_window=0.3, hold_seconds=2.0, oversample=4, clip_gap=0.05):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.hold_samples = int(hold_seconds * sample_rate)
+        self.clip_gap = int(clip_gap * sample_rate)
+        self.phases = true_peak_filter(oversample)
+        self.set_rms_window(rms_window)
+        self.set_thresholds(threshold_orange, threshold_red)
+        self.reset()
+
+    def set_rms_window(self, seconds):
+        self.rms_window = seconds
+        window = max(1, int(seconds * self.sample_rate))
+        self._squares = RingBuffer(window, np.float64, self.channels)
+        self._square_sum = np.zeros(self.channels)
+        self._since_resum = 0
+
+    def set_thresholds(self, threshold_orange, threshold_red):
+        self.thresholds = (threshold_orange, threshold_red)
+
+    def reset(self):
+        """Hold, Clip-Zähler und Maxima zurücksetzen."""
+        zeros = np.zeros(self.channels)
+        self.peak = zeros.copy()
+        self.true_peak = zeros.copy()
+        self.true_peak_max = zeros.copy()
+        self.hold = zeros.copy()
+        self.hold_until = np.zeros(self.channels, dtype=np.int64)
+        self.clips = np.zeros(self.channels, dtype=np.int64)
+        self._last_over = np.full(self.channels, -self.clip_gap - 1, dtype=np.int64)
+        taps = self.phases.shape[1]
+        self._history = np.zeros((self.channels, taps - 1), dtype=np.float32)
+        self._ext = np.zeros((self.channels, 0), dtype=np.float32)
+        self.samples = 0
+
+    def update(self, chunk):
+        """Block (n, channels) einarbeiten."""
+        n = len(chunk)
+        if n == 0:
+            return
+        x = chunk.T
+        a = np.abs(x)
+        block_peak = a.max(axis=1)
+        np.maximum(self.peak, block_peak, out=self.peak)
+        self._update_rms(x, n)
+        self._update_true_peak(x, n)
+        self._update_hold(block_peak, n)
+        self._update_clips(a, block_peak)
+        self.samples += n
+
+    def _update_rms(self, x, n):
+        squares = np.square(x, dtype=np.float64)
+        window = self._squares.capacity
+        self._since_resum += n
+        if n >= window or self._since_resum >= 64 * window:
+            # Rundungsfehler der laufenden Summe gelegentlich verwerfen
+            self._squares.write(squares.T)
+            self._square_sum = self._squares.view().sum(axis=1)
+            self._since_resum = 0
+            return
+        leaving = self._squares.view()[:, :n].sum(axis=1)
+        self._squares.write(squares.T)
+        self._square_sum += squares.sum(axis=1) - leaving
+
+    def _update_true_peak(self, x, n):
+        keep = self._history.shape[1]
+        if self._ext.shape[1] < n + keep:
+            self._ext = np.empty((self.channels, n + keep), dtype=np.float32)
+        ext = self._ext[:, :n + keep]
+        ext[:, :keep] = self._history
+        ext[:, keep:] = x
+        windows = sliding_window_view(ext, keep + 1, axis=1)
+        # (channels, n, taps) @ (taps, oversample)
+        upsampled = np.abs(windows @ self.phases.T).max(axis=(1, 2))
+        self._history[...] = ext[:, n:]
+        block = np.maximum(upsampled, np.abs(x).max(axis=1))
+        np.maximum(self.true_peak, block, out=self.true_peak)
+        np.maximum(self.true_peak_max, block, out=self.true_peak_max)
+
+    def _update_hold(self, block_peak, n):
+        now = self.samples + n
+        renew = (block_peak >= self.hold) | (now > self.hold_until)
+        self.hold = np.where(renew, block_peak, self.hold)
+        self.hold_until = np.where(renew, now + self.hold_samples, self.hold_until)
+
+    def _update_clips(self, a, block_peak):
+        for c in np.flatnonzero(block_peak >= self.thresholds[1]):
+            idx = np.flatnonzero(a[c] >= self.thresholds[1]) + self.samples
+            gaps = np.diff(idx, prepend=self._last_over[c])
+            self.clips[c] += np.count_nonzero(gaps > self.clip_gap)
+            self._last_over[c] = idx[-1]
+
+    @property
+    def rms(self):
+        window = min(self._squares.capacity, max(self.samples, 1))
+        return np.sqrt(np.maximum(self._square_sum, 0) / window)
+
+    def take_peaks(self):
+        """(peak, true_peak) seit dem letzten Aufruf; setzt beide zurück."""
+        peak, true_peak = self.peak.copy(), self.true_peak.copy()
+        self.peak[...] = 0
+        self.true_peak[...] = 0
+        return peak, true_peak
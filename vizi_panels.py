@@ -0,0 +1,372 @@
+"""Zusatzansichten neben der Waveform (Qt-Widgets)."""
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import (
+    QCheckBox, QComboBox, QHBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton,
+    QVBoxLayout, QWidget
+)
+
+from vizi_image import ScrollingImageItem, make_lut
+from vizi_levels import ZONE_RED
+from vizi_meters import to_db
+from vizi_spectrum import SpectrumAnalyzer
+
+
+class SpectrumPanel(QWidget):
+    """Betragsspektrum und scrollendes Spektrogramm (Wasserfall).
+
+    `analyzer` ersetzt den eigenen SpectrumAnalyzer, z.B. durch
+    vizi_worker.RemoteSpectrum, wenn im DSP-Prozess gerechnet wird.
+    """
+
+    changed = pyqtSignal()
+
+    FFT_SIZES = (512, 1024, 2048, 4096, 8192)
+    HOP_DIVISORS = (2, 4, 8)
+
+    def __init__(self, ring, sample_rate, parent=None, analyzer=None):
+        super().__init__(parent)
+        self.analyzer = analyzer or SpectrumAnalyzer(ring, sample_rate)
+        self.lut = make_lut()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("FFT"))
+        self.fft_dropdown = QComboBox()
+        for size in self.FFT_SIZES:
+            self.fft_dropdown.addItem(str(size), size)
+        self.fft_dropdown.setCurrentIndex(self.FFT_SIZES.index(self.analyzer.fft_size))
+        controls.addWidget(self.fft_dropdown)
+
+        controls.addWidget(QLabel("Hop"))
+        self.hop_dropdown = QComboBox()
+        for divisor in self.HOP_DIVISORS:
+            self.hop_dropdown.addItem(f"1/{divisor}", divisor)
+        self.hop_dropdown.setCurrentIndex(1)
+        controls.addWidget(self.hop_dropdown)
+
+        self.log_checkbox = QCheckBox("Log-Frequenz")
+        controls.addWidget(self.log_checkbox)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.graphics = pg.GraphicsLayoutWidget()
+        self.spectrum_plot = self.graphics.addPlot(row=0, col=0)
+        self.spectrum_plot.hideAxis("left")
+        self.spectrum_plot.setMouseEnabled(False, False)
+        self.spectrum_curve = self.spectrum_plot.plot(pen="#ffff00")
+
+        self.spectrogram_plot = self.graphics.addPlot(row=1, col=0)
+        self.spectrogram_plot.hideAxis("bottom")
+        self.spectrogram_plot.hideAxis("left")
+        self.spectrogram_plot.setMouseEnabled(False, False)
+        self.spectrogram = ScrollingImageItem(self.analyzer.history, self.analyzer.rows)
+        self.spectrogram_plot.addItem(self.spectrogram)
+        layout.addWidget(self.graphics)
+        self.setLayout(layout)
+
+        self.fft_dropdown.currentIndexChanged.connect(self.on_config_changed)
+        self.hop_dropdown.currentIndexChanged.connect(self.on_config_changed)
+        self.log_checkbox.toggled.connect(self.on_config_changed)
+        self.on_config_changed()
+
+    def on_config_changed(self, *args):
+        fft_size = self.fft_dropdown.currentData()
+        hop = fft_size // self.hop_dropdown.currentData()
+        log_freq = self.log_checkbox.isChecked()
+        self.analyzer.configure(fft_size, hop, log_freq)
+
+        self.spectrogram.resize_image(self.analyzer.history, self.analyzer.rows)
+        self.spectrogram_plot.setRange(
+            xRange=(0, self.analyzer.history), yRange=(0, self.analyzer.rows), padding=0
+        )
+        self.spectrum_plot.setLogMode(x=log_freq)
+        self.spectrum_plot.setYRange(self.analyzer.db_floor, 0, padding=0)
+        self.spectrum_curve.setData(self.analyzer.freqs, self.analyzer.latest)
+        self.changed.emit()
+
+    def refresh(self):
+        """Neu eingetroffene Hops rechnen und anzeigen."""
+        rows = self.analyzer.update()
+        if rows is None:
+            return
+        self.spectrogram.write_columns(self.lut[self.analyzer.to_index(rows)])
+        self.spectrum_curve.setData(self.analyzer.freqs, self.analyzer.latest)
+
+
+class MeterBars(QWidget):
+    """Senkrechte Pegelbalken je Kanal: Peak (Zonenfarben), RMS, Peak-Hold."""
+
+    DB_MIN = -60.0
+    DB_MAX = 3.0
+
+    def __init__(self, channels, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.peak_db = np.full(channels, self.DB_MIN)
+        self.rms_db = np.full(channels, self.DB_MIN)
+        self.hold_db = np.full(channels, self.DB_MIN)
+        self.zone_db = (-6.0, -1.0)
+        self.setMinimumWidth(24 * channels)
+
+    def _y(self, db):
+        frac = (min(max(db, self.DB_MIN), self.DB_MAX) - self.DB_MIN) / (self.DB_MAX - self.DB_MIN)
+        return self.height() * (1 - frac)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(self.settings.bg_color))
+        channels = len(self.peak_db)
+        lane = self.width() / channels
+        orange_db, red_db = self.zone_db
+        segments = (
+            (self.DB_MIN, orange_db, "#009e00"),
+            (orange_db, red_db, self.settings.color_orange),
+            (red_db, self.DB_MAX, self.settings.color_red),
+        )
+        for c in range(channels):
+            x = c * lane + 2
+            w = lane - 4
+            for low, high, color in segments:
+                top = min(self.peak_db[c], high)
+                if top > low:
+                    painter.fillRect(
+                        QRectF(x, self._y(top), w, self._y(low) - self._y(top)), QColor(color)
+                    )
+            rms_y = self._y(self.rms_db[c])
+            painter.fillRect(
+                QRectF(x + w / 3, rms_y, w / 3, self.height() - rms_y), QColor("#ffffff")
+            )
+            painter.setPen(QColor(self.settings.wave_color))
+            hold_y = self._y(self.hold_db[c])
+            painter.drawLine(int(x), int(hold_y), int(x + w), int(hold_y))
+        painter.end()
+
+
+class MeterPanel(QWidget):
+    """Pegelanzeige (Peak, RMS, True Peak, Hold, Clips) zu einem LevelMeter."""
+
+    def __init__(self, meter, settings, parent=None):
+        super().__init__(parent)
+        self.meter = meter
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.bars = MeterBars(meter.channels, settings)
+        layout.addWidget(self.bars, 1)
+        self.values_label = QLabel()
+        self.values_label.setStyleSheet("font-family: monospace;")
+        self.values_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+        layout.addWidget(self.values_label)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.on_reset)
+        layout.addWidget(self.reset_button)
+        self.setLayout(layout)
+
+    def on_reset(self):
+        self.meter.reset()
+        self.refresh()
+
+    def refresh(self):
+        peak, true_peak = self.meter.take_peaks()
+        # Zonengrenzen folgen den Schwellen (Rohwerte) des Meters
+        self.bars.zone_db = tuple(float(to_db(t)) for t in self.meter.thresholds)
+        self.bars.peak_db = to_db(peak)
+        self.bars.rms_db = to_db(self.meter.rms)
+        self.bars.hold_db = to_db(self.meter.hold)
+        self.bars.update()
+        # Maxima seit dem letzten Reset; Peak/RMS zeigen die Balken
+        values = zip(to_db(self.meter.true_peak_max), self.meter.clips)
+        lines = [
+            f"K{c + 1} TP {tp:5.1f}  Clips {clips}" for c, (tp, clips) in enumerate(values)
+        ]
+        self.values_label.setText("\n".join(lines))
+
+
+class LoudnessPanel(QWidget):
+    """Lautheitswerte (EBU R128) eines LoudnessMeter als Textanzeige."""
+
+    def __init__(self, loudness, parent=None):
+        super().__init__(parent)
+        self.loudness = loudness
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.values_label = QLabel()
+        self.values_label.setStyleSheet("font-family: monospace; font-size: 14px;")
+        layout.addWidget(self.values_label)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.on_reset)
+        layout.addWidget(self.reset_button)
+        layout.addStretch(1)
+        self.setLayout(layout)
+        self.refresh()
+
+    @staticmethod
+    def _format(lufs):
+        return f"{lufs:6.1f}" if np.isfinite(lufs) else "   -.-"
+
+    def on_reset(self):
+        self.loudness.reset()
+        self.refresh()
+
+    def refresh(self):
+        meter = self.loudness
+        self.values_label.setText(
+            f"M   {self._format(meter.momentary)} LUFS\n"
+            f"S   {self._format(meter.short_term)} LUFS\n"
+            f"I   {self._format(meter.integrated)} LUFS\n"
+            f"LRA {meter.loudness_range:6.1f} LU"
+        )
+
+
+class CorrelationBar(QWidget):
+    """Waagerechter Balken -1 .. +1 von der Mitte aus (negativ in Rot)."""
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.value = 0.0
+        self.setMinimumHeight(14)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(self.settings.bg_color))
+        center = self.width() / 2
+        width = self.value * center
+        color = "#009e00" if self.value >= 0 else self.settings.color_red
+        painter.fillRect(
+            QRectF(min(center, center + width), 2, abs(width), self.height() - 4), QColor(color)
+        )
+        painter.setPen(QColor(self.settings.wave_color))
+        painter.drawLine(int(center), 0, int(center), self.height())
+        painter.end()
+
+
+class VectorscopePanel(QWidget):
+    """Goniometer als Dichtebild und Phasenkorrelation der Kanäle 1 und 2."""
+
+    def __init__(self, goniometer, correlation, settings, parent=None):
+        super().__init__(parent)
+        self.goniometer = goniometer
+        self.correlation = correlation
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.graphics = pg.GraphicsLayoutWidget()
+        plot = self.graphics.addPlot()
+        plot.hideAxis("bottom")
+        plot.hideAxis("left")
+        plot.setMouseEnabled(False, False)
+        plot.setAspectLocked(True)
+        size = goniometer.size
+        self.image = pg.ImageItem(axisOrder="row-major")
+        self.image.setLookupTable(pg.colormap.get("inferno").getLookupTable(nPts=256))
+        plot.addItem(self.image)
+        # Kanalrichtungen: nur links oben links, nur rechts oben rechts
+        for text, x in (("L", 0), ("R", size)):
+            label = pg.TextItem(text, color=settings.wave_color, anchor=(0.5, 0))
+            label.setPos(x, size)
+            plot.addItem(label)
+        plot.setRange(xRange=(0, size), yRange=(0, size), padding=0)
+        self.graphics.setMinimumWidth(160)
+        layout.addWidget(self.graphics, 1)
+
+        self.correlation_bar = CorrelationBar(settings)
+        layout.addWidget(self.correlation_bar)
+        self.values_label = QLabel()
+        self.values_label.setStyleSheet("font-family: monospace;")
+        layout.addWidget(self.values_label)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.on_reset)
+        layout.addWidget(self.reset_button)
+        self.setLayout(layout)
+        self.refresh()
+
+    def on_reset(self):
+        self.goniometer.reset()
+        self.correlation.reset()
+        self.refresh()
+
+    def refresh(self):
+        self.image.setImage(self.goniometer.image(), levels=(0, 255), autoLevels=False)
+        value = self.correlation.value
+        self.correlation_bar.value = value
+        self.correlation_bar.update()
+        self.values_label.setText(f"Korrelation {value:+.2f}")
+
+
+def format_position(seconds):
+    """Sitzungszeit als h:mm:ss.mmm."""
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    return f"{hours}:{minutes:02d}:{seconds:06.3f}"
+
+
+class EventPanel(QWidget):
+    """Die jüngsten Übersteuerungen aus einem OverloadIndex; Klick springt dorthin.
+
+    refresh() fügt nur die seit dem letzten Aufruf abgelegten Ereignisse
+    oben ein und kürzt die Liste auf MAX_ROWS Zeilen.
+    """
+
+    # Start und Ende (absolute Samples) des angeklickten Ereignisses
+    event_selected = pyqtSignal(object, object)
+    live_requested = pyqtSignal()
+
+    MAX_ROWS = 200
+
+    def __init__(self, index, sample_rate, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.sample_rate = sample_rate
+        self.shown_total = 0
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("font-family: monospace;")
+        layout.addWidget(self.summary_label)
+        self.list = QListWidget()
+        self.list.setStyleSheet("font-family: monospace;")
+        self.list.setMinimumWidth(260)
+        self.list.itemClicked.connect(self.on_item_clicked)
+        layout.addWidget(self.list, 1)
+        self.live_button = QPushButton("Live")
+        self.live_button.setToolTip("Verlauf wieder am aktuellen Ende anzeigen")
+        self.live_button.clicked.connect(self.live_requested)
+        layout.addWidget(self.live_button)
+        self.setLayout(layout)
+        self.refresh()
+
+    def on_item_clicked(self, item):
+        start, end = item.data(Qt.ItemDataRole.UserRole)
+        self.event_selected.emit(start, end)
+
+    def refresh(self):
+        index = self.index
+        if index.total < self.shown_total:
+            # Index wurde geleert
+            self.list.clear()
+            self.shown_total = 0
+        new = min(index.total - self.shown_total, self.MAX_ROWS)
+        self.shown_total = index.total
+        if new > 0:
+            for event in index.recent(new):
+                item = QListWidgetItem(
+                    f"{format_position(event['start'] / self.sample_rate)}  "
+                    f"K{event['channel'] + 1}  "
+                    f"{'rot   ' if event['zone'] == ZONE_RED else 'orange'}  "
+                    f"{float(to_db(event['peak'])):6.1f} dB  "
+                    f"{1e3 * (event['end'] - event['start']) / self.sample_rate:6.0f} ms"
+                )
+                item.setData(Qt.ItemDataRole.UserRole, (int(event["start"]), int(event["end"])))
+                self.list.insertItem(0, item)
+            while self.list.count() > self.MAX_ROWS:
+                self.list.takeItem(self.list.count() - 1)
+        orange, red = index.zone_counts
+        text = f"Ereignisse {index.total}  (rot {red}, orange {orange})"
+        if index.dropped:
+            text += f"\nÄlteste verworfen: {index.dropped}"
+        self.summary_label.setText(text)
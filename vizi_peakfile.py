@@ -0,0 +1,285 @@
+"""Offline-Ansicht langer Audiodateien.
+
+Die Samples werden per Memory-Map gelesen, nie komplett geladen. Für die
+Übersicht gibt es eine Peak-Datei neben der Audiodatei (`<datei>.vizipeaks`)
+mit Min/Max-Stufen; sie wird beim ersten Öffnen erzeugt und später
+wiederverwendet, solange Größe und Änderungszeit der Audiodatei passen.
+"""
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from vizi_sources import RAW_EXTENSIONS
+
+PEAK_MAGIC = b"VIZIPEAKS1\n"
+PEAK_SUFFIX = ".vizipeaks"
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _parse_wav(f):
+    """(format, channels, sample_rate, bits, data_offset, data_size) eines WAV."""
+    riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave != b"WAVE":
+        raise ValueError("Keine WAV-Datei")
+    fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV ohne data-Chunk")
+        chunk_id, size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            body = f.read(size + (size & 1))
+            audio_format, channels, sample_rate = struct.unpack("<HHI", body[:8])
+            bits = struct.unpack("<H", body[14:16])[0]
+            if audio_format == WAVE_FORMAT_EXTENSIBLE:
+                audio_format = struct.unpack("<H", body[24:26])[0]
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV ohne fmt-Chunk")
+            return fmt + (f.tell(), size)
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+class AudioFile:
+    """Audiodatei als Memory-Map, Frames der Form (frames, channels).
+
+    WAV (PCM 16/32 Bit, Float 32 Bit) liefert Abtastrate und Kanalzahl
+    selbst; Rohdateien (f32le, interleaved) brauchen beides als Argument.
+    """
+
+    def __init__(self, path, sample_rate=44100, channels=1):
+        self.path = path
+        if path.lower().endswith(RAW_EXTENSIONS):
+            dtype, offset = np.dtype("<f4"), 0
+            size = os.path.getsize(path)
+            self.scale = 1.0
+        else:
+            with open(path, "rb") as f:
+                audio_format, channels, sample_rate, bits, offset, size = _parse_wav(f)
+            if audio_format == WAVE_FORMAT_FLOAT and bits == 32:
+                dtype, self.scale = np.dtype("<f4"), 1.0
+            elif audio_format == WAVE_FORMAT_PCM and bits == 16:
+                dtype, self.scale = np.dtype("<i2"), 1 / 32768
+            elif audio_format == WAVE_FORMAT_PCM and bits == 32:
+                dtype, self.scale = np.dtype("<i4"), 1 / 2**31
+            else:
+                raise ValueError(f"WAV-Format {audio_format}/{bits} Bit nicht unterstützt")
+            # Bei abgebrochenen Aufnahmen stimmt die Größe im Header oft nicht
+            size = min(size, os.path.getsize(path) - offset)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = size // (dtype.itemsize * channels)
+        self.data = np.memmap(
+            path, dtype=dtype, mode="r", offset=offset, shape=(self.frames, channels)
+        )
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def read(self, start, n):
+        """Frames [start, start + n) als float32, planar (channels, n)."""
+        start = max(0, int(start))
+        block = self.data[start:start + int(n)].T
+        if self.scale == 1.0:
+            return np.ascontiguousarray(block, dtype=np.float32)
+        return block.astype(np.float32) * np.float32(self.scale)
+
+
+def peak_path(audio_path):
+    """Pfad der Peak-Datei; ohne Schreibrecht im Verzeichnis im Temp-Cache."""
+    directory = os.path.dirname(os.path.abspath(audio_path))
+    if os.access(directory, os.W_OK):
+        return audio_path + PEAK_SUFFIX
+    cache = os.path.join(tempfile.gettempdir(), "audivizi-peaks")
+    os.makedirs(cache, exist_ok=True)
+    name = os.path.abspath(audio_path).replace(os.sep, "_")
+    return os.path.join(cache, name + PEAK_SUFFIX)
+
+
+def _level_sizes(frames, base_block, factor, min_blocks):
+    sizes = []
+    size = base_block
+    while frames // size >= min_blocks:
+        sizes.append(size)
+        size *= factor
+    return sizes
+
+
+class PeakFile:
+    """Min/Max-Stufen einer Audiodatei, als Memory-Map aus der Peak-Datei.
+
+    Aufbau: PEAK_MAGIC, eine JSON-Kopfzeile (Quellgröße, mtime, Frames,
+    Kanäle, Blockgrößen, Offsets), danach je Stufe Minima und Maxima als
+    float32 der Form (channels, blocks).
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = header
+        self.block_sizes = header["block_sizes"]
+        channels = header["channels"]
+        self.mins = []
+        self.maxs = []
+        for size, (min_offset, max_offset) in zip(self.block_sizes, header["offsets"]):
+            blocks = -(-header["frames"] // size)
+            for target, offset in ((self.mins, min_offset), (self.maxs, max_offset)):
+                target.append(np.memmap(
+                    path, dtype="<f4", mode="r", offset=offset, shape=(channels, blocks)
+                ))
+
+    @staticmethod
+    def source_signature(audio):
+        stat = os.stat(audio.path)
+        return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+    @classmethod
+    def _read_header(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(PEAK_MAGIC)) != PEAK_MAGIC:
+                return None
+            return json.loads(f.readline())
+
+    @classmethod
+    def load(cls, audio, path=None):
+        """Vorhandene, zur Audiodatei passende Peak-Datei öffnen, sonst None."""
+        path = path or peak_path(audio.path)
+        try:
+            header = cls._read_header(path)
+        except (OSError, ValueError):
+            return None
+        if not header:
+            return None
+        expected = cls.source_signature(audio)
+        expected.update(frames=audio.frames, channels=audio.channels)
+        if any(header.get(key) != value for key, value in expected.items()):
+            return None
+        return cls(path, header)
+
+    @classmethod
+    def build(cls, audio, path=None, base_block=256, factor=16, min_blocks=64,
+              chunk_frames=1 << 20, progress=None, should_stop=None):
+        """Peak-Datei erzeugen (blockweise über die Memory-Map).
+
+        progress(fraction) wird nach jedem Abschnitt aufgerufen; liefert
+        should_stop() True, wird abgebrochen und None zurückgegeben. Die
+        Datei wird erst nach vollständigem Schreiben umbenannt.
+        """
+        path = path or peak_path(audio.path)
+        sizes = _level_sizes(audio.frames, base_block, factor, min_blocks)
+        channels = audio.channels
+        header = cls.source_signature(audio)
+        header.update(frames=audio.frames, channels=channels, block_sizes=sizes)
+
+        # Offsets hängen von der Kopfzeilenlänge ab; Platz dafür reservieren
+        offsets = []
+        probe = json.dumps(dict(header, offsets=[[2**62, 2**62]] * len(sizes)))
+        position = len(PEAK_MAGIC) + len(probe) + 1
+        position = -(-position // 64) * 64
+        for size in sizes:
+            nbytes = 4 * channels * -(-audio.frames // size)
+            offsets.append([position, position + nbytes])
+            position += 2 * nbytes
+        header["offsets"] = offsets
+        line = json.dumps(header).encode()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(PEAK_MAGIC + line + b"\n")
+            f.truncate(position)
+        try:
+            levels = []
+            for size, (min_offset, max_offset) in zip(sizes, offsets):
+                blocks = -(-audio.frames // size)
+                levels.append(tuple(
+                    np.memmap(tmp_path, dtype="<f4", mode="r+", offset=offset,
+                              shape=(channels, blocks))
+                    for offset in (min_offset, max_offset)
+                ))
+            if sizes:
+                chunk_frames = max(chunk_frames // sizes[0], 1) * sizes[0]
+                for start in range(0, audio.frames, chunk_frames):
+                    if should_stop is not None and should_stop():
+                        raise InterruptedError
+                    data = audio.read(start, chunk_frames)
+                    idx = np.arange(0, data.shape[1], sizes[0])
+                    first = start // sizes[0]
+                    levels[0][0][:, first:first + len(idx)] = np.minimum.reduceat(data, idx, axis=1)
+                    levels[0][1][:, first:first + len(idx)] = np.maximum.reduceat(data, idx, axis=1)
+                    if progress is not None:
+                        progress(min(1.0, (start + chunk_frames) / audio.frames))
+                for k in range(1, len(sizes)):
+                    idx = np.arange(0, levels[k - 1][0].shape[1], factor)
+                    levels[k][0][...] = np.minimum.reduceat(levels[k - 1][0], idx, axis=1)
+                    levels[k][1][...] = np.maximum.reduceat(levels[k - 1][1], idx, axis=1)
+            for mins, maxs in levels:
+                mins.flush()
+                maxs.flush()
+            del levels
+            os.replace(tmp_path, path)
+        except InterruptedError:
+            os.remove(tmp_path)
+            return None
+        return cls(path, header)
+
+    @property
+    def nbytes(self):
+        return sum(m.nbytes + x.nbytes for m, x in zip(self.mins, self.maxs))
+
+
+class FileView:
+    """Min/Max je Pixelspalte für einen beliebigen Ausschnitt einer Datei.
+
+    Je nach Zoom aus der passenden Peak-Stufe (höchstens `factor` Blöcke je
+    Spalte) oder, bei wenigen Samples je Spalte, direkt aus der Memory-Map.
+    Ohne Peak-Datei (noch in Arbeit) nur bis `raw_limit` Samples.
+    """
+
+    def __init__(self, audio, peaks=None, raw_limit=1 << 20):
+        self.audio = audio
+        self.peaks = peaks
+        self.raw_limit = raw_limit
+
+    @property
+    def channels(self):
+        return self.audio.channels
+
+    @property
+    def frames(self):
+        return self.audio.frames
+
+    def column_minmax(self, start, n, width):
+        """(mins, maxs, samples_per_column) oder None, wenn die Peaks fehlen."""
+        start = max(0, int(start))
+        n = max(1, min(int(n), self.frames - start))
+        width = max(1, int(width))
+        spp = n / width
+        sizes = self.peaks.block_sizes if self.peaks is not None else []
+        k = -1
+        while k + 1 < len(sizes) and sizes[k + 1] <= spp:
+            k += 1
+        if k < 0:
+            if n > self.raw_limit:
+                return None
+            data = self.audio.read(start, n)
+            idx = (np.arange(width) * spp).astype(np.intp)
+            return np.minimum.reduceat(data, idx, axis=1), np.maximum.reduceat(data, idx, axis=1), spp
+        size = sizes[k]
+        first = start // size
+        last = -(-(start + n) // size)
+        mins = self.peaks.mins[k][:, first:last]
+        maxs = self.peaks.maxs[k][:, first:last]
+        idx = ((start + np.arange(width) * spp) // size - first).astype(np.intp)
+        np.clip(idx, 0, mins.shape[1] - 1, out=idx)
+        return (
+            np.minimum.reduceat(mins, idx, axis=1),
+            np.maximum.reduceat(maxs, idx, axis=1),
+            spp,
+        )
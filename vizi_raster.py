@@ -0,0 +1,104 @@
+"""Waveform als scrollendes Rasterbild statt als PlotDataItem-Kurve."""
+import numpy as np
+from PyQt5.QtGui import QTransform
+
+from vizi_image import ScrollingImageItem, hex_to_argb
+
+
+class WaveformRaster(ScrollingImageItem):
+    """Min/Max je Pixelspalte, inkrementell in ein ScrollingImageItem gerastert.
+
+    Spalte i deckt die absoluten Samples [i*spp, (i+1)*spp) ab. Die
+    Spaltengrenzen hängen damit nicht vom Zeitpunkt des Zeichnens ab, und
+    render() berechnet und schreibt nur die seit dem letzten Aufruf fertig
+    gewordenen Spalten; das Bild scrollt über den Ringcursor des
+    ScrollingImageItem. Jede Spalte schließt das letzte Sample der vorigen
+    ein, damit die Welle ohne Lücken zusammenhängt.
+
+    Die Farbstufe jeder Pixelzeile je Spur (Welle, Orange, Rot nach |y|
+    relativ zur Mittellinie der Spur) wird je Layout einmal berechnet; wie
+    bei den Kurven liegt Rot über Orange über der Welle, auch wenn eine
+    übersteuerte Spur in die Nachbarspur ragt. Die Levelmeter-Farben sind
+    also ins Bild eingebrannt. Ändern sich Größe, Zoom, Verstärkung,
+    Farben oder Schwellen, wird das Bild einmal komplett neu aufgebaut.
+    """
+
+    def __init__(self):
+        super().__init__(1, 1)
+        self.layout = None
+        self.next_column = None
+        self.columns_drawn = 0
+
+    def _configure(self, layout):
+        spp, width, height, amplitude, offsets, y_range, colors, thresholds = layout
+        self.layout = layout
+        self.spp = spp
+        self.amplitude = amplitude
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.y0 = y_range[0]
+        self.dy = (y_range[1] - y_range[0]) / height
+        self.resize_image(width, height)
+        self.palette = np.array([hex_to_argb(color) for color in colors], dtype=np.uint32)
+        # Farbstufe (1 Welle, 2 Orange, 3 Rot) je Spur und Pixelzeile
+        y = self.y0 + (np.arange(height) + 0.5) * self.dy
+        level = np.abs(y[None, :] - self.offsets[:, None])
+        self.row_levels = np.ones(level.shape, dtype=np.uint8)
+        if thresholds is not None:
+            self.row_levels[level >= thresholds[0]] = 2
+            self.row_levels[level >= thresholds[1]] = 3
+        self.rows = np.arange(height)
+        self.background = self.palette[0]
+        self.clear(self.background)
+        self.next_column = None
+
+    def render(self, ring, spp, visible_samples, width, height, amplitude, offsets,
+               y_range, colors, thresholds=None):
+        """Neue Spalten aus dem planaren RingBuffer zeichnen; gibt ihre Anzahl zurück.
+
+        colors: (Hintergrund, Welle, Orange, Rot) als '#rrggbb'; thresholds:
+        (Orange, Rot) in Anzeige-Einheiten oder None für einfarbig.
+        Erwartet (width + 1) * spp < ring.capacity.
+        """
+        layout = (
+            spp, width, height, amplitude, tuple(offsets), tuple(y_range), tuple(colors),
+            None if thresholds is None else tuple(thresholds),
+        )
+        if layout != self.layout:
+            self._configure(layout)
+        total = ring.total_written
+        end = total // spp
+        if self.next_column is None:
+            self.next_column = end - width
+        missing = end - self.next_column
+        k = min(missing, width)
+        if missing > k:
+            # Mehr als eine Bildbreite verpasst: alles neu
+            self.clear(self.background)
+        if k > 0:
+            self.write_columns(self._rasterize(ring, end - k, k))
+            self.columns_drawn += k
+        self.next_column = end
+        # Rechter Bildrand = Ende der letzten fertigen Spalte; der Rest der
+        # laufenden Spalte verschiebt das Bild entsprechend nach links
+        right = visible_samples - (total - end * spp)
+        self.setTransform(QTransform(spp, 0, 0, self.dy, right - width * spp, self.y0))
+        return max(k, 0)
+
+    def _rasterize(self, ring, first, k):
+        """Spalten first .. first+k-1 als (k, height) uint32-Farben."""
+        spp = self.spp
+        n = ring.total_written - first * spp + 1
+        data = ring.view(n)[..., :k * spp + 1]
+        if ring.channels is None:
+            data = data[None]
+        columns = data[:, 1:].reshape(len(data), k, spp)
+        before = data[:, :-1:spp]
+        scale = self.amplitude / self.dy
+        base = (self.offsets[:, None] - self.y0) / self.dy
+        lo = np.floor(np.minimum(columns.min(axis=-1), before) * scale + base)
+        hi = np.floor(np.maximum(columns.max(axis=-1), before) * scale + base)
+        levels = np.zeros((k, len(self.rows)), dtype=np.uint8)
+        for lane_lo, lane_hi, row_levels in zip(lo, hi, self.row_levels):
+            covered = (self.rows >= lane_lo[:, None]) & (self.rows <= lane_hi[:, None])
+            np.maximum(levels, covered * row_levels, out=levels)
+        return self.palette[levels]
@@ -0,0 +1,254 @@
+"""Aufnahme des Capture-Streams auf Platte (WAV, FLAC oder f32le-Rohdaten).
+
+Der Capture-Thread übergibt Blöcke mit submit(); das kostet eine Kopie und
+ein put_nowait() in eine Queue, nie Plattenzugriff. Ein eigener
+Schreib-Thread sammelt die Blöcke und schreibt sie in großen Stücken.
+Die Queue ist nach Audiodauer begrenzt (`max_seconds`), nicht nach der
+Zahl der Blöcke, damit der Puffer bei kleinen Blöcken (Low-Latency)
+genauso lange reicht wie bei großen. Ist sie voll, wird der Block
+verworfen und gezählt; der Schreiber füllt die Lücke mit Stille, damit
+die Zeitachse der Datei stimmt.
+Schlägt das Schreiben fehl (Platte voll, Laufwerk entfernt), endet die
+Aufnahme: das Segment wird geschlossen, der Fehler steht in `error`.
+"""
+import os
+import queue
+import struct
+import subprocess
+import threading
+import time
+
+from vizi_sources import BYTES_PER_SAMPLE, ffmpeg_path
+
+FORMATS = ("wav", "flac", "raw")
+WAVE_FORMAT_FLOAT = 3
+# RIFF-Größen sind 32 Bit: mehr Daten passen nicht in ein WAV-Segment
+WAV_MAX_DATA_BYTES = 0xFFFFFFFF - 36
+
+
+def wav_header(sample_rate, channels, data_bytes):
+    """RIFF/WAVE-Kopf für float32-Samples."""
+    block_align = channels * BYTES_PER_SAMPLE
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_FLOAT, channels, sample_rate,
+        sample_rate * block_align, block_align, 8 * BYTES_PER_SAMPLE,
+        b"data", data_bytes,
+    )
+
+
+class _FileWriter:
+    """Ein Ausgabesegment; WAV-Größen werden beim Schließen eingetragen."""
+
+    def __init__(self, path, fmt, sample_rate, channels):
+        self.path = path
+        self.fmt = fmt
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.data_bytes = 0
+        self._process = None
+        if fmt == "flac":
+            self._process = subprocess.Popen([
+                ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:",
+                "-c:a", "flac", "-sample_fmt", "s32", path,
+            ], stdin=subprocess.PIPE)
+            self._file = self._process.stdin
+        else:
+            self._file = open(path, "wb")
+            if fmt == "wav":
+                self._file.write(wav_header(sample_rate, channels, 0))
+
+    def write(self, data):
+        self._file.write(data)
+        self.data_bytes += len(data)
+
+    def close(self):
+        if self._process is not None:
+            try:
+                self._file.close()
+            finally:
+                self._process.wait()
+            return
+        try:
+            if self.fmt == "wav":
+                self._file.seek(0)
+                self._file.write(wav_header(self.sample_rate, self.channels, self.data_bytes))
+        finally:
+            self._file.close()
+
+
+class Recorder:
+    """Nicht blockierende Aufnahme mit Schreib-Thread, Batching und Rotation.
+
+    Rotation nach `rotate_seconds` Audiodauer oder `rotate_bytes` je Datei;
+    die Segmente heißen <name>.wav, <name>_001.wav, ... WAV-Segmente werden
+    in jedem Fall vor 4 GiB gewechselt (WAV_MAX_DATA_BYTES).
+    """
+
+    def __init__(self, path, sample_rate, channels, fmt="wav", max_seconds=5.0,
+                 batch_bytes=1 << 20, rotate_seconds=None, rotate_bytes=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unbekanntes Aufnahmeformat: {fmt}")
+        self.base, _ = os.path.splitext(path)
+        self.fmt = fmt
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.batch_bytes = batch_bytes
+        self.frame_bytes = channels * BYTES_PER_SAMPLE
+        limits = []
+        if rotate_seconds:
+            limits.append(int(rotate_seconds * sample_rate) * self.frame_bytes)
+        if rotate_bytes:
+            limits.append(int(rotate_bytes))
+        if fmt == "wav":
+            limits.append(WAV_MAX_DATA_BYTES)
+        self.rotate_bytes = (
+            min(limits) // self.frame_bytes * self.frame_bytes if limits else None
+        )
+
+        self._queue = queue.Queue()
+        self.max_queue_bytes = max(1, int(max_seconds * sample_rate)) * self.frame_bytes
+        self._queued_bytes = 0
+        self._queued_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._gap = 0  # verworfene Bytes seit dem letzten angenommenen Block
+        self.stats = {
+            "blocks": 0, "dropped_blocks": 0, "dropped_frames": 0, "high_water_s": 0.0,
+            "bytes_written": 0, "writes": 0, "files": 0, "last_write_ms": 0.0,
+            "error": None,
+        }
+        self.error = None
+        self.paths = []
+        self._writer = None
+        self._thread = threading.Thread(target=self._run, name="vizi-recorder", daemon=True)
+        self._thread.start()
+
+    # --- Capture-Thread -----------------------------------------------------
+    def submit(self, block):
+        """Block (Frames, interleaved float32) übernehmen, ohne zu warten."""
+        if self._stopping.is_set():
+            return False
+        data = block.tobytes()
+        with self._queued_lock:
+            full = self._queued_bytes + len(data) > self.max_queue_bytes
+            if not full:
+                self._queued_bytes += len(data)
+                queued = self._queued_bytes
+        if full:
+            self._gap += len(data)
+            self.stats["dropped_blocks"] += 1
+            self.stats["dropped_frames"] += len(data) // self.frame_bytes
+            return False
+        self._queue.put_nowait((self._gap, data))
+        self._gap = 0
+        self.stats["blocks"] += 1
+        self.stats["high_water_s"] = max(self.stats["high_water_s"], self._seconds(queued))
+        return True
+
+    def backlog(self):
+        """Sekunden Audio, die auf den Schreib-Thread warten."""
+        return self._seconds(self._queued_bytes)
+
+    def _seconds(self, nbytes):
+        return nbytes / self.frame_bytes / self.sample_rate
+
+    # --- GUI-Thread ---------------------------------------------------------
+    def stop(self):
+        """Aufnahme beenden, ohne zu warten; der Schreib-Thread leert die Queue selbst."""
+        self._stopping.set()
+        self._queue.put_nowait(None)
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def current_path(self):
+        return self.paths[-1] if self.paths else None
+
+    # --- Schreib-Thread -----------------------------------------------------
+    def _segment_path(self, index):
+        suffix = f"_{index:03d}" if index else ""
+        return f"{self.base}{suffix}.{self.fmt}"
+
+    def _open_segment(self):
+        path = self._segment_path(len(self.paths))
+        self.paths.append(path)
+        self.stats["files"] += 1
+        return _FileWriter(path, self.fmt, self.sample_rate, self.channels)
+
+    def _run(self):
+        try:
+            self._write_loop()
+        except OSError as e:
+            self._fail(e)
+            # Wartende Blöcke freigeben, sie werden nicht mehr geschrieben
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+        self._close_segment()
+
+    def _fail(self, error):
+        if self.error is None:
+            self.error = f"{self.current_path}: {error}"
+            self.stats["error"] = self.error
+        self._stopping.set()
+
+    def _close_segment(self):
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        try:
+            writer.close()
+        except OSError as e:
+            self._fail(e)
+
+    def _write_loop(self):
+        self._writer = self._open_segment()
+        batch = bytearray()
+        finished = False
+        while not finished:
+            try:
+                item = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                if not self._stopping.is_set():
+                    continue
+                item = None
+            # Alles, was schon wartet, in einen Schreibvorgang packen
+            while item is not None:
+                gap, data = item
+                with self._queued_lock:
+                    self._queued_bytes -= len(data)
+                if gap:
+                    batch += bytes(gap)
+                batch += data
+                if len(batch) >= self.batch_bytes:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            finished = item is None
+            self._flush(batch)
+            batch.clear()
+
+    def _flush(self, batch):
+        view = memoryview(batch)
+        while len(view):
+            take = len(view)
+            if self.rotate_bytes:
+                if self._writer.data_bytes >= self.rotate_bytes:
+                    writer, self._writer = self._writer, None
+                    writer.close()
+                    self._writer = self._open_segment()
+                take = min(take, self.rotate_bytes - self._writer.data_bytes)
+            start = time.perf_counter()
+            self._writer.write(view[:take])
+            self.stats["last_write_ms"] = (time.perf_counter() - start) * 1e3
+            self.stats["writes"] += 1
+            self.stats["bytes_written"] += take
+            view = view[take:]
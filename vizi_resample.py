@@ -0,0 +1,59 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def decimation_filter(factor, taps_per_phase=16, passband=0.9):
+    """Tiefpass für die Dezimierung um `factor` (Länge factor * taps_per_phase).
+
+    Gefensterter Sinc mit Grenzfrequenz bei `passband` mal der neuen
+    Nyquist-Frequenz, Gleichverstärkung 1.
+    """
+    length = factor * taps_per_phase
+    cutoff = passband / factor  # relativ zur alten Nyquist-Frequenz
+    t = np.arange(length) - (length - 1) / 2
+    h = cutoff * np.sinc(cutoff * t) * np.kaiser(length, 8.0)
+    return (h / h.sum()).astype(np.float32)
+
+
+class Decimator:
+    """Streaming-Dezimierung um einen ganzzahligen Faktor, Kanäle in Spalten.
+
+    Berechnet wird nur jedes `factor`-te Ausgangssample (ein Fenster über
+    die letzten Eingangssamples mal Filterkern); das entspricht der
+    Polyphasen-Zerlegung und kostet taps_per_phase Multiplikationen je
+    Eingangssample. Filterhistorie und Phase laufen über Blockgrenzen,
+    das Ergebnis ist also unabhängig von der Blockaufteilung.
+    """
+
+    def __init__(self, factor, channels, taps_per_phase=16):
+        self.factor = factor
+        self.channels = channels
+        self.kernel = decimation_filter(factor, taps_per_phase)[::-1].copy()
+        self.reset()
+
+    def reset(self):
+        keep = len(self.kernel) - 1
+        self._history = np.zeros((keep, self.channels), dtype=np.float32)
+        self._ext = np.zeros((0, self.channels), dtype=np.float32)
+        self._phase = 0  # Index im nächsten Block, an dem ein Ausgang fällig ist
+
+    @property
+    def delay(self):
+        """Gruppenlaufzeit in Eingangssamples."""
+        return (len(self.kernel) - 1) / 2
+
+    def process(self, chunk):
+        """Block (n, channels) -> dezimierter Block (m, channels), float32."""
+        n = len(chunk)
+        keep = len(self._history)
+        if len(self._ext) < n + keep:
+            self._ext = np.empty((n + keep, self.channels), dtype=np.float32)
+        ext = self._ext[:n + keep]
+        ext[:keep] = self._history
+        ext[keep:] = chunk
+        # Fenster i endet bei chunk[i]: (n, channels, taps)
+        windows = sliding_window_view(ext, keep + 1, axis=0)[self._phase::self.factor]
+        out = windows @ self.kernel
+        self._history[...] = ext[n:]
+        self._phase = (self._phase - n) % self.factor
+        return out
@@ -0,0 +1,164 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Vorallokierter Ringpuffer für Audio-Samples.
+
+    Der Speicher ist doppelt so lang wie die Kapazität; jeder Block wird an
+    zwei Stellen geschrieben. Dadurch liegen die letzten n Samples immer
+    zusammenhängend im Speicher und können ohne Kopie gelesen werden.
+    Schreiben kostet O(Blockgröße), unabhängig von der Pufferlänge.
+
+    Mit `channels` wird planar gespeichert (ein Streifen je Kanal, Form
+    (channels, n)); write() erwartet dann Frames der Form (n, channels),
+    z.B. interleavte Daten per reshape(-1, channels), und entschachtelt sie
+    in einem Schritt.
+
+    Genau ein Schreiber; Leser in anderen Threads nutzen snapshot(), das
+    über einen Sequenzzähler (Seqlock) einen konsistenten Ausschnitt liefert.
+    """
+
+    def __init__(self, capacity, dtype=np.float32, channels=None):
+        self.capacity = int(capacity)
+        self.channels = channels
+        shape = (2 * self.capacity,) if channels is None else (channels, 2 * self.capacity)
+        self._data = np.zeros(shape, dtype=dtype)
+        self._pos = 0
+        self._seq = 0
+        # Anzahl aller jemals geschriebenen Samples (Schreib-Cursor)
+        self.total_written = 0
+
+    def write(self, chunk):
+        n = len(chunk)
+        if n == 0:
+            return
+        cap = self.capacity
+        if n >= cap:
+            chunk = chunk[-cap:]
+            skipped = n - cap
+            n = cap
+        else:
+            skipped = 0
+        if self.channels is not None:
+            chunk = chunk.T  # (n, channels) -> (channels, n), ohne Kopie
+
+        self._seq += 1  # ungerade: Schreibvorgang läuft
+        pos = self._pos
+        first = min(n, cap - pos)
+        self._data[..., pos:pos + first] = chunk[..., :first]
+        self._data[..., pos + cap:pos + cap + first] = chunk[..., :first]
+        rest = n - first
+        if rest:
+            self._data[..., :rest] = chunk[..., first:]
+            self._data[..., cap:cap + rest] = chunk[..., first:]
+        self._pos = (pos + n) % cap
+        self.total_written += n + skipped
+        self._seq += 1  # gerade: Puffer konsistent
+
+    def skip(self, n):
+        """Lücke von n Samples als Stille eintragen (z.B. nach Datenverlust)."""
+        if n <= 0:
+            return
+        fill = min(n, self.capacity)
+        shape = (fill,) if self.channels is None else (fill, self.channels)
+        self.write(np.zeros(shape, dtype=self.dtype))
+        self.total_written += n - fill
+
+    def view(self, n=None):
+        """Die letzten n Samples als Sicht ohne Kopie (nur im Schreiber-Thread sicher)."""
+        if n is None or n > self.capacity:
+            n = self.capacity
+        end = self._pos + self.capacity
+        return self._data[..., end - n:end]
+
+    def snapshot(self, n=None, out=None):
+        """Konsistente Kopie der letzten n Samples, auch während parallel geschrieben wird."""
+        while True:
+            seq = self._seq
+            if seq & 1:
+                continue
+            src = self.view(n)
+            if out is None:
+                result = src.copy()
+            else:
+                result = out[..., :src.shape[-1]]
+                result[...] = src
+            if self._seq == seq:
+                return result
+
+    def read_since(self, total):
+        """Konsistente Kopie aller Samples nach dem Schreib-Cursor `total`.
+
+        Gibt (Daten, neuer Cursor) zurück. Was der Schreiber inzwischen schon
+        überschrieben hat, fehlt am Anfang der Daten.
+        """
+        while True:
+            seq = self._seq
+            if seq & 1:
+                continue
+            end = self.total_written
+            result = self.view(max(0, min(end - total, self.capacity))).copy()
+            if self._seq == seq:
+                return result, end
+
+    def lane(self, channel):
+        """Einzelner Kanal als eindimensionaler Puffer zum Lesen."""
+        return RingLane(self, channel)
+
+    def resize(self, capacity):
+        """Kapazität ändern; die jüngsten Samples und der Schreib-Cursor bleiben."""
+        keep = self.view(min(self.total_written, self.capacity, capacity)).copy()
+        total = self.total_written
+        self._seq += 1
+        self.capacity = int(capacity)
+        shape = (2 * self.capacity,)
+        if self.channels is not None:
+            shape = (self.channels,) + shape
+        self._data = np.zeros(shape, dtype=self._data.dtype)
+        self._pos = 0
+        self.total_written = 0
+        self._seq += 1
+        self.write(keep if self.channels is None else keep.T)
+        self.total_written = total
+
+    def clear(self):
+        self._seq += 1
+        self._data[...] = 0
+        self._pos = 0
+        self.total_written = 0
+        self._seq += 1
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def __len__(self):
+        return self.capacity
+
+
+class RingLane:
+    """Ein Kanal eines planaren RingBuffer; teilt Schreib-Cursor und Speicher."""
+
+    def __init__(self, ring, channel):
+        self.ring = ring
+        self.channel = channel
+        self.capacity = ring.capacity
+        self.channels = None
+
+    @property
+    def total_written(self):
+        return self.ring.total_written
+
+    @property
+    def dtype(self):
+        return self.ring.dtype
+
+    def view(self, n=None):
+        return self.ring.view(n)[self.channel]
+
+    def snapshot(self, n=None):
+        return self.ring.snapshot(n)[self.channel]
@@ -0,0 +1,133 @@
+"""Ringpuffer und Zustandsblöcke in multiprocessing.shared_memory.
+
+Ein Prozess schreibt, beliebig viele lesen. Schreib-Cursor und
+Sequenzzähler liegen mit im Shared Memory, so dass der Seqlock aus
+RingBuffer.snapshot() auch über Prozessgrenzen funktioniert. Nur der
+Erzeuger (create) gibt den Speicher mit unlink() wieder frei.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+
+# Kopf eines SharedRing (int64): Sequenz, Position, geschriebene Samples,
+# Kapazität, Kanäle (0 = einkanalig ohne Kanalachse)
+_SEQ, _POS, _TOTAL, _CAPACITY, _CHANNELS = range(5)
+_HEADER_BYTES = 64
+
+
+class SharedRing(RingBuffer):
+    """RingBuffer (float32) im Shared Memory, siehe RingBuffer."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self._header = np.ndarray(5, dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self._header[_CAPACITY])
+        channels = int(self._header[_CHANNELS])
+        self.channels = channels or None
+        shape = (2 * self.capacity,) if not channels else (channels, 2 * self.capacity)
+        self._data = np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=_HEADER_BYTES)
+
+    @classmethod
+    def create(cls, capacity, channels=None):
+        count = 2 * int(capacity) * (channels or 1)
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + 4 * count)
+        header = np.ndarray(5, dtype=np.int64, buffer=shm.buf)
+        header[:] = (0, 0, 0, int(capacity), channels or 0)
+        ring = cls(shm, owner=True)
+        ring._data[...] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # Cursor und Sequenzzähler im Shared Memory statt als Attribute
+    @property
+    def _seq(self):
+        return int(self._header[_SEQ])
+
+    @_seq.setter
+    def _seq(self, value):
+        self._header[_SEQ] = value
+
+    @property
+    def _pos(self):
+        return int(self._header[_POS])
+
+    @_pos.setter
+    def _pos(self, value):
+        self._header[_POS] = value
+
+    @property
+    def total_written(self):
+        return int(self._header[_TOTAL])
+
+    @total_written.setter
+    def total_written(self, value):
+        self._header[_TOTAL] = value
+
+    def close(self):
+        # Sichten freigeben, sonst verweigert SharedMemory.close() den Dienst
+        self._header = self._data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedState:
+    """Benannte float64-Felder im Shared Memory, konsistent per Seqlock.
+
+    fields: Liste von (Name, Anzahl Werte). Schreiber und Leser müssen
+    dieselbe Liste verwenden.
+    """
+
+    def __init__(self, fields, name=None):
+        self.fields = list(fields)
+        size = 1 + sum(count for _, count in self.fields)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._values = np.ndarray(size, dtype=np.float64, buffer=self.shm.buf)
+        if self.owner:
+            self._values[:] = 0
+        self._slices = {}
+        start = 1
+        for field, count in self.fields:
+            self._slices[field] = slice(start, start + count)
+            start += count
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, **values):
+        """Felder setzen; Leser sehen entweder alle oder keine der Änderungen."""
+        self._values[0] += 1
+        for field, value in values.items():
+            self._values[self._slices[field]] = value
+        self._values[0] += 1
+
+    def read(self):
+        """Konsistente Kopie aller Felder als dict von Arrays."""
+        while True:
+            seq = self._values[0]
+            if int(seq) & 1:
+                continue
+            copy = self._values.copy()
+            if self._values[0] == seq:
+                return {field: copy[s] for field, s in self._slices.items()}
+
+    def close(self):
+        self._values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
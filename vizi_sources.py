@@ -0,0 +1,442 @@
+"""Capture-Quellen für AudiVizi.
+
+Jede Quelle liefert float32 (f32le, Kanäle interleaved) über readinto()
+- ffmpeg-Quellen auf Wunsch auch s16le mit halber Pipe-Bandbreite, siehe
+`sample_format` - und zählt mit, wie viele Frames sie tatsächlich geliefert hat
+(achieved_rate()).
+Quellen werden über einen Spec-String ausgewählt, z.B.
+
+    avfoundation::0        macOS-Gerät :0 über ffmpeg
+    pulse:default          PulseAudio über ffmpeg
+    alsa:hw:1,0            ALSA über ffmpeg
+    file:/pfad/take.wav    Datei (Echtzeit oder so schnell wie möglich)
+    stdin                  rohes f32le von der Standardeingabe
+    synth:sine             interner Testsignal-Generator (sine, noise, bursts)
+"""
+import collections
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ffmpeg_path = shutil.which("ffmpeg") or "/opt/homebrew/bin/ffmpeg"
+
+BYTES_PER_SAMPLE = 4
+# Sampleformate der Pipe und ihr numpy-Typ
+SAMPLE_FORMATS = {"f32le": np.dtype("<f4"), "s16le": np.dtype("<i2")}
+FFMPEG_FORMATS = ("avfoundation", "alsa", "pulse")
+RAW_EXTENSIONS = (".raw", ".f32", ".pcm")
+
+
+class CaptureSource:
+    """Basisklasse aller Quellen.
+
+    Unterklassen implementieren _open(), _readinto() und _close().
+    Mit realtime=True wird die Lieferung auf sample_rate gebremst.
+    """
+
+    label = "Quelle"
+    # Live-Quellen liefern im Takt eines Geräts und können Samples verlieren
+    live = False
+    sample_format = "f32le"
+
+    def __init__(self, sample_rate, realtime=False, channels=1):
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.channels = channels
+        self.bytes_read = 0
+        self.opened_at = None
+
+    def open(self):
+        self.bytes_read = 0
+        self.opened_at = time.monotonic()
+        self._open()
+
+    def readinto(self, view):
+        n = self._readinto(view)
+        if n:
+            self.bytes_read += n
+            if self.realtime:
+                self._pace()
+        return n
+
+    def close(self):
+        self._close()
+
+    def interrupt(self):
+        """Blockierendes readinto() aus einem anderen Thread beenden (falls möglich)."""
+
+    @property
+    def dtype(self):
+        return SAMPLE_FORMATS[self.sample_format]
+
+    @property
+    def bytes_per_frame(self):
+        return self.dtype.itemsize * self.channels
+
+    @property
+    def samples_read(self):
+        """Gelieferte Frames (ein Sample je Kanal)."""
+        return self.bytes_read // self.bytes_per_frame
+
+    def achieved_rate(self):
+        """Tatsächlich gelieferte Frames pro Sekunde seit open()."""
+        if self.opened_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.opened_at
+        return self.samples_read / elapsed if elapsed > 0 else 0.0
+
+    def _pace(self):
+        due = self.opened_at + self.samples_read / self.sample_rate
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _open(self):
+        pass
+
+    def _readinto(self, view):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class StderrLog:
+    """Liest stderr von ffmpeg in einem eigenen Thread leer.
+
+    Ohne Leser läuft die Pipe voll und ffmpeg (und damit die Aufnahme)
+    bleibt stehen. Normale Zeilen landen im Ringpuffer `lines`; Zeilen
+    der Form key=value (ffmpeg -progress) aktualisieren `progress`;
+    Fehlermeldungen werden gezählt, die letzte bleibt in `last_error`.
+    """
+
+    ERROR_PATTERN = re.compile(
+        r"error|failed|invalid|cannot|could not|no such|denied|overrun|underrun", re.I
+    )
+
+    def __init__(self, max_lines=200):
+        self.lines = collections.deque(maxlen=max_lines)
+        self.progress = {}
+        self.errors = 0
+        self.last_error = None
+        self._thread = None
+
+    def reset(self):
+        """Fehler und Fortschritt eines früheren Prozesses vergessen (Zeilen bleiben)."""
+        self.progress = {}
+        self.errors = 0
+        self.last_error = None
+
+    def attach(self, stream):
+        self._thread = threading.Thread(
+            target=self._drain, args=(stream,), name="vizi-ffmpeg-stderr", daemon=True
+        )
+        self._thread.start()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _drain(self, stream):
+        try:
+            for raw in iter(stream.readline, b""):
+                for line in raw.decode(errors="replace").replace("\r", "\n").splitlines():
+                    self.add(line.strip())
+        except (OSError, ValueError):
+            pass  # Pipe beim Beenden geschlossen
+
+    def add(self, line):
+        if not line:
+            return
+        key, sep, value = line.partition("=")
+        if sep and " " not in key:
+            self.progress[key] = value
+            return
+        self.lines.append(line)
+        if self.ERROR_PATTERN.search(line):
+            self.errors += 1
+            self.last_error = line
+
+    @property
+    def speed(self):
+        """Verarbeitungsgeschwindigkeit laut ffmpeg (1.0 = Echtzeit) oder None."""
+        try:
+            return float(self.progress.get("speed", "").rstrip("x"))
+        except ValueError:
+            return None
+
+
+class Backoff:
+    """Wartezeiten zwischen Neustarts: initial, doppelt so lang, ... bis maximum.
+
+    Lief die Quelle vor dem Abbruch mindestens `reset_after` Sekunden,
+    gilt sie als stabil und es wird wieder mit `initial` begonnen.
+    """
+
+    def __init__(self, initial=0.5, maximum=10.0, reset_after=30.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.reset_after = reset_after
+        self.delay = initial
+
+    def next_delay(self, uptime):
+        if uptime >= self.reset_after:
+            self.delay = self.initial
+        delay = self.delay
+        self.delay = min(self.delay * 2, self.maximum)
+        return delay
+
+
+class FfmpegSource(CaptureSource):
+    """Liest ein Eingabegerät (avfoundation, alsa, pulse) über eine ffmpeg-Pipe.
+
+    stderr wird von einem StderrLog geleert und ausgewertet; close() wartet
+    höchstens `close_timeout` Sekunden auf das Ende von ffmpeg und beendet
+    den Prozess sonst hart.
+
+    Mit low_latency=True verzichtet ffmpeg auf Probing und Eingangspuffer,
+    fordert bei PulseAudio kleine Fragmente an und schreibt jedes Paket
+    sofort in die Pipe.
+    """
+
+    live = True
+    close_timeout = 1.0
+    # Fragmentgröße (Frames) für PulseAudio im Low-Latency-Profil
+    fragment_frames = 256
+
+    def __init__(self, input_format, device, sample_rate, realtime=False, channels=1,
+                 low_latency=False, sample_format="f32le"):
+        super().__init__(sample_rate, realtime, channels)
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unbekanntes Sampleformat: {sample_format}")
+        self.input_format = input_format
+        self.device = device
+        self.low_latency = low_latency
+        self.sample_format = sample_format
+        self.label = f"{input_format}:{device}"
+        self.process = None
+        self.log = StderrLog()
+
+    def input_args(self):
+        args = []
+        if self.low_latency:
+            args += [
+                "-fflags", "nobuffer", "-flags", "low_delay",
+                "-probesize", "32", "-analyzeduration", "0",
+            ]
+            if self.input_format == "pulse":
+                args += ["-fragment_size", str(self.fragment_frames * self.bytes_per_frame)]
+        return args + ["-f", self.input_format, "-i", self.device]
+
+    def command(self):
+        return [
+            ffmpeg_path,
+            "-hide_banner", "-loglevel", "warning", "-nostats", "-progress", "pipe:2",
+            *self.input_args(),
+            "-ac", str(self.channels),
+            "-ar", str(self.sample_rate),
+            "-f", self.sample_format,
+            *(["-flush_packets", "1"] if self.low_latency else []),
+            "pipe:"
+        ]
+
+    def _open(self):
+        # Nach einem Neustart gelten nur noch die Meldungen des neuen Prozesses
+        self.log.reset()
+        self.process = subprocess.Popen(
+            self.command(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self.log.attach(self.process.stderr)
+
+    def _readinto(self, view):
+        return self.process.stdout.readinto(view)
+
+    def interrupt(self):
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def _close(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            process.terminate()
+        try:
+            process.wait(self.close_timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        self.log.join(self.close_timeout)
+        process.stdout.close()
+        process.stderr.close()
+
+
+class FileSource(FfmpegSource):
+    """Audiodatei; Rohdateien (f32le, interleaved) direkt, alles andere über ffmpeg."""
+
+    live = False
+
+    def __init__(self, path, sample_rate, realtime=True, channels=1, sample_format="f32le"):
+        if path.lower().endswith(RAW_EXTENSIONS):
+            sample_format = "f32le"  # Rohdateien werden unverändert gelesen
+        super().__init__(
+            "file", path, sample_rate, realtime, channels, sample_format=sample_format
+        )
+        self.path = path
+        self.label = os.path.basename(path)
+        self._file = None
+
+    def input_args(self):
+        return ["-i", self.path]
+
+    def _open(self):
+        if self.path.lower().endswith(RAW_EXTENSIONS):
+            self._file = open(self.path, "rb")
+        else:
+            super()._open()
+
+    def _readinto(self, view):
+        if self._file:
+            return self._file.readinto(view)
+        return super()._readinto(view)
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        super()._close()
+
+
+class StdinSource(CaptureSource):
+    """Rohes f32le (interleaved) von der Standardeingabe, z.B. `ffmpeg ... - | script-vizi-1.py`."""
+
+    label = "stdin"
+
+    def __init__(self, sample_rate, stream=None, realtime=False, channels=1):
+        super().__init__(sample_rate, realtime, channels)
+        self.stream = stream
+
+    def _open(self):
+        if self.stream is None:
+            self.stream = sys.stdin.buffer
+
+    def _readinto(self, view):
+        return self.stream.readinto(view)
+
+
+class SyntheticSource(CaptureSource):
+    """Testsignal-Generator ohne Mikrofon.
+
+    kind: "sine" (Dauerton), "noise" (weißes Rauschen) oder "bursts"
+    (kurze laute Sinus-Bursts über leisem Signal, für die Levelmeter-Zonen).
+    Bei mehreren Kanälen bekommt jeder Kanal eine eigene Frequenz und
+    versetzte Bursts.
+    """
+
+    KINDS = ("sine", "noise", "bursts")
+
+    def __init__(self, kind, sample_rate, frequency=1000.0, amplitude=0.5,
+                 realtime=True, seed=0, channels=1):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unbekanntes Testsignal: {kind}")
+        super().__init__(sample_rate, realtime, channels)
+        self.kind = kind
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.label = f"synth:{kind}"
+        self._rng = np.random.default_rng(seed)
+
+    def _readinto(self, view):
+        n = len(view) // self.bytes_per_frame
+        out = np.frombuffer(view, dtype=np.float32, count=n * self.channels)
+        out = out.reshape(n, self.channels)
+        idx = (self.samples_read + np.arange(n))[:, None]
+        lanes = np.arange(self.channels)
+        if self.kind == "noise":
+            self._rng.standard_normal(out.shape, dtype=np.float32, out=out)
+            out *= self.amplitude / 3
+        else:
+            frequency = self.frequency * (1 + 0.5 * lanes)
+            out[:] = np.sin(2 * np.pi * frequency / self.sample_rate * idx)
+            out *= self.amplitude
+            if self.kind == "bursts":
+                # 50 ms Burst (volle Aussteuerung) alle 500 ms, sonst leise
+                period = self.sample_rate // 2
+                shifted = idx + lanes * (period // max(self.channels, 1))
+                burst = (shifted % period) < self.sample_rate // 20
+                out *= np.where(burst, 1.9, 0.1).astype(np.float32)
+        return n * self.bytes_per_frame
+
+
+def make_source(spec, sample_rate, realtime=True, channels=1, low_latency=False,
+                sample_format="f32le"):
+    """Quelle aus einem Spec-String erzeugen (siehe Moduldokumentation).
+
+    sample_format gilt nur für ffmpeg-Quellen; alle anderen liefern f32le.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind in FFMPEG_FORMATS:
+        return FfmpegSource(
+            kind, arg, sample_rate, channels=channels, low_latency=low_latency,
+            sample_format=sample_format
+        )
+    if kind == "file":
+        return FileSource(arg, sample_rate, realtime, channels, sample_format)
+    if kind == "stdin":
+        return StdinSource(sample_rate, channels=channels)
+    if kind == "synth":
+        return SyntheticSource(
+            arg or "sine", sample_rate, realtime=realtime, channels=channels
+        )
+    raise ValueError(f"Unbekannte Quelle: {spec}")
+
+
+# ---------------------------------------------------------------------------
+# Geräte-Scan
+# ---------------------------------------------------------------------------
+def list_devices():
+    """Liste von (Anzeigename, Spec) aller gefundenen Eingabegeräte."""
+    if sys.platform == "darwin":
+        return _list_avfoundation()
+    if sys.platform.startswith("linux"):
+        return _list_ffmpeg_sources("pulse") + _list_ffmpeg_sources("alsa")
+    return []
+
+
+def synthetic_devices():
+    return [(f"Test - {kind}", f"synth:{kind}") for kind in SyntheticSource.KINDS]
+
+
+def _list_avfoundation():
+    result = subprocess.run(
+        [ffmpeg_path, "-f", "avfoundation", "-list_devices", "true", "-i", ""],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    audio_section = re.split(r'AVFoundation audio devices:', result.stderr)
+    if len(audio_section) < 2:
+        return []
+    matches = re.findall(r'\[(\d+)\]\s+(.*)', audio_section[1])
+    return [(f"{idx} - {name}", f"avfoundation::{idx}") for idx, name in matches]
+
+
+def _list_ffmpeg_sources(input_format):
+    devices = [(f"{input_format} - default", f"{input_format}:default")]
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-sources", input_format],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=5
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return devices
+    for name, description in re.findall(r'^\s*\*?\s*(\S+)\s+\[(.*)\]', result.stdout, re.M):
+        if name != "default":
+            devices.append((f"{input_format} - {description}", f"{input_format}:{name}"))
+    return devices
@@ -0,0 +1,89 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SpectrumAnalyzer:
+    """Gleitende, gefensterte rFFT über einem RingBuffer.
+
+    update() rechnet nur die Hops, die seit dem letzten Aufruf vollständig
+    eingetroffen sind, alle in einem vektorisierten rfft-Aufruf. Fenster,
+    Normierung und die Zuordnung FFT-Bins -> Anzeigezeilen (linear oder
+    logarithmisch) werden in configure() einmal vorberechnet.
+    """
+
+    def __init__(self, ring, sample_rate, fft_size=2048, hop=512, log_freq=False,
+                 history=300, db_floor=-100.0, log_rows=256, min_freq=20.0):
+        self.ring = ring
+        self.sample_rate = sample_rate
+        self.history = history
+        self.db_floor = db_floor
+        self.log_rows = log_rows
+        self.min_freq = min_freq
+        self.configure(fft_size, hop, log_freq)
+
+    def configure(self, fft_size, hop, log_freq):
+        self.fft_size = int(fft_size)
+        self.hop = int(hop)
+        self.log_freq = log_freq
+        self.window = np.hanning(self.fft_size).astype(np.float32)
+        # Amplitude 1.0 (Sinus) -> 0 dBFS
+        self.scale = 2.0 / self.window.sum()
+        freqs = np.fft.rfftfreq(self.fft_size, 1.0 / self.sample_rate)
+
+        if log_freq:
+            edges = np.geomspace(self.min_freq, self.sample_rate / 2, self.log_rows + 1)
+            starts = np.unique(np.searchsorted(freqs, edges[:-1]))
+            starts = starts[starts < len(freqs)]
+            self.bin_index = starts
+            self.freqs = freqs[starts]
+        else:
+            self.bin_index = None
+            self.freqs = freqs
+        self.latest = np.full(len(self.freqs), self.db_floor, dtype=np.float32)
+        # Ende (absolut) des nächsten zu rechnenden Frames, im Hop-Raster
+        self.next_end = max(self.ring.total_written, self.fft_size)
+        self.frames_computed = 0
+
+    @property
+    def rows(self):
+        """Anzahl der Anzeigezeilen (Frequenzbänder)."""
+        return len(self.freqs)
+
+    def update(self):
+        """Neue Spektren (k, rows) in dBFS, oder None wenn kein Hop fertig ist."""
+        end = self.ring.total_written
+        if end < self.next_end:
+            return None
+        count = (end - self.next_end) // self.hop + 1
+        first_end = self.next_end
+        # Nur so viele Frames, wie der Verlauf anzeigen kann bzw. der Puffer hält
+        oldest_end = max(
+            end - (self.history - 1) * self.hop,
+            end - self.ring.capacity + self.fft_size,
+        )
+        if first_end < oldest_end:
+            skip = -(-(oldest_end - first_end) // self.hop)
+            first_end += skip * self.hop
+            count -= skip
+        self.next_end = first_end + count * self.hop
+        if count <= 0:
+            return None
+
+        first_start = first_end - self.fft_size
+        span = self.fft_size + (count - 1) * self.hop
+        data = self.ring.view(end - first_start)[:span]
+        frames = sliding_window_view(data, self.fft_size)[::self.hop]
+        mag = np.abs(np.fft.rfft(frames * self.window, axis=-1)).astype(np.float32)
+        mag *= self.scale
+        if self.bin_index is not None:
+            mag = np.maximum.reduceat(mag, self.bin_index, axis=-1)
+        db = 20 * np.log10(np.maximum(mag, 1e-12))
+        np.maximum(db, self.db_floor, out=db)
+        self.latest = db[-1]
+        self.frames_computed += count
+        return db
+
+    def to_index(self, db, levels=256):
+        """dB-Werte auf Farbindizes 0..levels-1 abbilden (db_floor .. 0 dBFS)."""
+        scaled = (db - self.db_floor) * ((levels - 1) / -self.db_floor)
+        return np.clip(scaled, 0, levels - 1).astype(np.uint8)
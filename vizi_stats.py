@@ -0,0 +1,105 @@
+import json
+import time
+
+import numpy as np
+
+from vizi_ringbuffer import RingBuffer
+
+
+class PerfProbes:
+    """Leichte Zeitmessung je Pipeline-Stufe.
+
+    Jede Stufe hat einen eigenen RingBuffer mit den letzten `window`
+    Messungen (rollierendes Histogramm); pro Stufe darf nur ein Thread
+    schreiben. Typische Nutzung:
+
+        t = probes.start()
+        ...
+        probes.stop("read", t)
+    """
+
+    def __init__(self, window=1024, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._stages = {}
+        self._counts = {}
+        self.created_at = time.monotonic()
+
+    @staticmethod
+    def start():
+        return time.perf_counter()
+
+    def stop(self, stage, started):
+        if self.enabled:
+            self.add(stage, time.perf_counter() - started)
+
+    def add(self, stage, seconds):
+        buf = self._stages.get(stage)
+        if buf is None:
+            buf = self._stages[stage] = RingBuffer(self.window, np.float64)
+            self._counts[stage] = 0
+        buf.write(np.array((seconds,)))
+        self._counts[stage] += 1
+
+    def recent(self, stage):
+        """Kopie der letzten Messungen einer Stufe (Sekunden)."""
+        buf = self._stages.get(stage)
+        if buf is None:
+            return np.zeros(0)
+        return buf.snapshot(min(buf.total_written, buf.capacity))
+
+    def histogram(self, stage, bins=None):
+        """Log-skalierte Häufigkeiten der letzten Messungen (Grenzen in ms)."""
+        if bins is None:
+            bins = np.logspace(-3, 2, 16)
+        return np.histogram(self.recent(stage) * 1e3, bins=bins)
+
+    def summary(self):
+        result = {}
+        for stage in list(self._stages):
+            values = self.recent(stage) * 1e3
+            if len(values) == 0:
+                continue
+            p50, p90, p99 = np.percentile(values, (50, 90, 99))
+            result[stage] = {
+                "count": self._counts[stage],
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(p50),
+                "p90_ms": float(p90),
+                "p99_ms": float(p99),
+                "max_ms": float(values.max()),
+            }
+        return result
+
+    def dump(self, path, extra=None):
+        data = {"uptime_s": time.monotonic() - self.created_at, "stages": self.summary()}
+        for stage in list(self._stages):
+            counts, edges = self.histogram(stage)
+            data["stages"].setdefault(stage, {})["histogram"] = {
+                "edges_ms": edges.tolist(), "counts": counts.tolist(),
+            }
+        if extra:
+            data.update(extra)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+class RateMeter:
+    """Rate eines monoton steigenden Zählers über ein gleitendes Zeitfenster."""
+
+    def __init__(self, span=1.0):
+        self.span = span
+        self._last_time = None
+        self._last_value = 0
+        self.rate = 0.0
+
+    def update(self, value, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last_time is None:
+            self._last_time, self._last_value = now, value
+            return self.rate
+        elapsed = now - self._last_time
+        if elapsed >= self.span:
+            self.rate = (value - self._last_value) / elapsed
+            self._last_time, self._last_value = now, value
+        return self.rate
@@ -0,0 +1,160 @@
+"""Getriggerter Oszilloskop-Modus: Flankensuche und Sweep-Mittelung."""
+import collections
+
+import numpy as np
+
+SLOPES = ("rising", "falling")
+
+
+class TriggeredScope:
+    """Flankentrigger mit Hysterese und Holdoff über einem planaren RingBuffer.
+
+    update() durchsucht nur die seit dem letzten Aufruf geschriebenen
+    Samples des Trigger-Kanals, vektorisiert: Ein Sample unter
+    level - hysteresis (steigend) schärft den Trigger, das erste Sample
+    >= level danach löst aus. Dazu werden alle Schärf- und Auslöse-Samples
+    gesammelt; ausgelöst wird dort, wo ein Auslöse-Sample auf ein
+    Schärf-Sample folgt. Der letzte Zustand wird in den nächsten Block
+    übernommen. Der Holdoff (mindestens eine Sweeplänge) wird per
+    searchsorted über die Kandidaten angewendet, die Schleife läuft also
+    nur über tatsächlich angenommene Trigger.
+
+    Ein Sweep umfasst `length` Samples aller Kanäle, der Triggerpunkt
+    liegt bei `pre`. Fertige Sweeps (alle Samples eingetroffen) gehen in
+    einen vorab angelegten Akkumulator: bei averages = 1 der letzte Sweep,
+    sonst das gleitende Mittel über etwa `averages` Sweeps (jeder neue Sweep
+    mit Gewicht 1/min(n, averages)). Der Schwellendurchgang liegt meist
+    zwischen zwei Samples; `offset` ist dieser Bruchteil (zum Verschieben
+    beim Zeichnen). Vor der Mittelung wird jeder Sweep linear auf den
+    Durchgang interpoliert, sonst verschmiert das Mittel um bis zu ein
+    Sample.
+    """
+
+    def __init__(self, ring, channel=0, level=0.0, hysteresis=0.01, slope="rising",
+                 holdoff=0, averages=1):
+        self.ring = ring
+        self.lane = ring.lane(channel) if ring.channels is not None else ring
+        self.level = level
+        self.hysteresis = hysteresis
+        self.slope = slope
+        self.holdoff = holdoff
+        self.averages = averages
+        self.pending = collections.deque(maxlen=64)
+        self.length = self.pre = None
+        self.set_window(1024)
+
+    def configure(self, level=None, hysteresis=None, slope=None, holdoff=None, averages=None):
+        """Triggerparameter ändern; der Mittelwert beginnt neu."""
+        if slope is not None and slope not in SLOPES:
+            raise ValueError(f"Unbekannte Flanke: {slope}")
+        for name, value in (("level", level), ("hysteresis", hysteresis), ("slope", slope),
+                            ("holdoff", holdoff), ("averages", averages)):
+            if value is not None:
+                setattr(self, name, value)
+        self.reset()
+
+    def set_window(self, length, pre=None):
+        """Sweeplänge und Vorlauf (Standard: Triggerpunkt in der Mitte) in Samples."""
+        length = max(2, min(int(length), self.ring.capacity // 2))
+        pre = length // 2 if pre is None else int(pre)
+        if (length, pre) == (self.length, self.pre):
+            return
+        self.length = length
+        self.pre = pre
+        shape = (length,) if self.ring.channels is None else (self.ring.channels, length)
+        self._sum = np.zeros(shape, dtype=np.float32)
+        self._scratch = np.zeros(shape, dtype=np.float32)
+        self._aligned = np.zeros(shape, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        self.scanned = self.lane.total_written
+        self._fired = True  # erst nach dem Schärfen auslösen
+        self._next_allowed = 0
+        self.pending.clear()
+        self.count = 0
+        self.offset = 0.0
+        self.triggers = 0
+        self.sweeps = 0
+        self.dropped = 0
+
+    @property
+    def sweep(self):
+        """Letzter Sweep bzw. Mittelwert (channels, length), oder None."""
+        return self._sum if self.count else None
+
+    def update(self):
+        """Neue Samples durchsuchen und fertige Sweeps übernehmen; gibt deren Anzahl zurück."""
+        total = self.lane.total_written
+        self._search(total)
+        ready = []
+        while self.pending and self.pending[0][0] - self.pre + self.length <= total:
+            ready.append(self.pending.popleft())
+        if self.averages <= 1:
+            # Ohne Mittelung zählt nur der jüngste Sweep
+            ready = ready[-1:]
+        done = 0
+        for position, offset in ready:
+            # Ab einem Sample vor dem Sweep (für die Interpolation)
+            span = total - (position - self.pre) + 1
+            if span > self.ring.capacity:
+                self.dropped += 1
+                continue
+            self._accumulate(self.ring.view(span)[..., :self.length + 1], offset)
+            done += 1
+        return done
+
+    def _search(self, total):
+        n = min(total - self.scanned, self.lane.capacity - 1)
+        self.scanned = total
+        if n <= 0:
+            return
+        # Ein Sample mehr für die Interpolation des Triggerzeitpunkts
+        x = self.lane.view(n + 1)
+        level = self.level
+        if self.slope == "rising":
+            fire = x[1:] >= level
+            arm = x[1:] < level - self.hysteresis
+        else:
+            fire = x[1:] <= level
+            arm = x[1:] > level + self.hysteresis
+        events = np.flatnonzero(fire | arm)
+        if not len(events):
+            return
+        kind = fire[events]
+        previous = np.empty_like(kind)
+        previous[0] = self._fired
+        previous[1:] = kind[:-1]
+        self._fired = bool(kind[-1])
+        candidates = events[kind & ~previous]
+        if not len(candidates):
+            return
+        start = total - n
+        holdoff = max(self.holdoff, self.length)
+        i = np.searchsorted(candidates, self._next_allowed - start)
+        while i < len(candidates):
+            index = candidates[i]
+            # Bruchteil eines Samples, um den die Schwelle vor `index` lag
+            before, after = x[index], x[index + 1]
+            offset = (after - level) / (after - before) if after != before else 0.0
+            self.pending.append((start + index, float(offset)))
+            self.triggers += 1
+            self._next_allowed = start + index + holdoff
+            i = np.searchsorted(candidates, index + holdoff)
+
+    def _accumulate(self, segment, offset):
+        if self.averages <= 1:
+            self._sum[...] = segment[..., 1:]
+            self.count = 1
+            self.offset = offset
+        else:
+            aligned = self._aligned
+            np.multiply(segment[..., 1:], 1.0 - offset, out=aligned)
+            np.multiply(segment[..., :-1], offset, out=self._scratch)
+            aligned += self._scratch
+            self.count = min(self.count + 1, self.averages)
+            self.offset = 0.0
+            np.subtract(aligned, self._sum, out=self._scratch)
+            self._scratch *= 1.0 / self.count
+            self._sum += self._scratch
+        self.sweeps += 1
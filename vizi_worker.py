@@ -0,0 +1,429 @@
+"""Capture und DSP in einem eigenen Prozess (--dsp-process).
+
+Im Thread-Betrieb teilen sich Capture-Thread, Analyse und Zeichnen den
+GIL des GUI-Prozesses. Hier liest ein Worker-Prozess die Quelle, rechnet
+Umwandlung, Dezimierung, Meter, Lautheit und Spektrum und veröffentlicht
+die Ergebnisse in Shared Memory (vizi_shm):
+
+    display    Anzeigedaten (Anzeigerate, planar), SharedRing
+    peaks      Peak/True-Peak je Veröffentlichung, SharedRing
+    spectrum   Spektrogramm-Zeilen in dBFS, SharedRing
+    state      RMS, Hold, Lautheit, Status, ..., SharedState
+
+Das GUI liest nur noch fertige Arrays; Einstellungen gehen über eine
+multiprocessing.Queue an den Worker.
+"""
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+
+from vizi_loudness import LoudnessMeter
+from vizi_meters import LevelMeter
+from vizi_resample import Decimator
+from vizi_shm import SharedRing, SharedState
+from vizi_sources import Backoff, make_source
+from vizi_spectrum import SpectrumAnalyzer
+
+MAX_SPECTRUM_ROWS = 8192 // 2 + 1
+PEAK_SLOTS = 256
+# status: gelesene Frames, Neustarts, Zeitpunkt des letzten Öffnens, beendet
+ENDED_EOF, ENDED_OPEN_FAILED = 1, 2
+
+
+def _state_fields(channels):
+    return [
+        ("rms", channels), ("hold", channels), ("true_peak_max", channels),
+        ("clips", channels), ("loudness", 4), ("spectrum", 3), ("status", 4),
+        ("arrival", 1),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Worker-Prozess
+# ---------------------------------------------------------------------------
+def _worker_main(config, commands, stop):
+    channels = config["channels"]
+    shared = {
+        key: SharedRing.attach(config[key + "_ring"]) for key in ("display", "peaks", "spectrum")
+    }
+    state = SharedState(_state_fields(channels), config["state"])
+    try:
+        _DspLoop(config, shared, state, commands, stop).run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for ring in shared.values():
+            ring.close()
+        state.close()
+
+
+class _DspLoop:
+    def __init__(self, config, shared, state, commands, stop):
+        self.config = config
+        self.display = shared["display"]
+        self.peaks = shared["peaks"]
+        self.spectrum_rows = shared["spectrum"]
+        self.state = state
+        self.commands = commands
+        self.stop = stop
+        rate, channels = config["sample_rate"], config["channels"]
+        self.meter = LevelMeter(rate, channels, *config["thresholds"])
+        self.loudness = LoudnessMeter(rate, channels)
+        decimation = config["decimation"]
+        self.decimator = Decimator(decimation, channels) if decimation > 1 else None
+        self.analyzer = SpectrumAnalyzer(self.display.lane(0), rate / decimation)
+        self._configure_spectrum(*config["spectrum"])
+        self.restarts = 0
+        self.opened_at = 0.0
+
+    def _configure_spectrum(self, generation, fft_size, hop, log_freq):
+        self.analyzer.configure(fft_size, hop, log_freq)
+        self.spectrum = (generation, self.analyzer.rows, self.spectrum_rows.total_written)
+
+    def _handle_commands(self):
+        while True:
+            try:
+                command, *args = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if command == "thresholds":
+                self.meter.set_thresholds(*args)
+            elif command == "reset_meter":
+                self.meter.reset()
+            elif command == "reset_loudness":
+                self.loudness.reset()
+            elif command == "spectrum":
+                self._configure_spectrum(*args)
+
+    def _open(self, source):
+        try:
+            source.open()
+        except OSError as e:
+            print(f"DSP-Prozess: {source.label}: {e}")
+            return False
+        self.opened_at = time.monotonic()
+        return True
+
+    def _read_exact(self, source, view):
+        got = 0
+        while got < len(view):
+            n = source.readinto(view[got:])
+            if not n:
+                return False
+            got += n
+        return True
+
+    def run(self):
+        config = self.config
+        source = make_source(
+            config["spec"], config["sample_rate"], config["realtime"], config["channels"],
+            low_latency=config["low_latency"], sample_format=config["sample_format"],
+        )
+        if not self._open(source):
+            self._publish(time.monotonic(), source, ENDED_OPEN_FAILED)
+            return
+        shape = (config["block_size"], config["channels"])
+        raw = np.empty(shape, dtype=source.dtype)
+        raw_bytes = memoryview(raw).cast("B")
+        stage = np.empty(shape, dtype=np.float32)
+        scale = np.float32(1 / 32768)
+        backoff = Backoff()
+        last_publish = 0.0
+        ended = 0
+        while not self.stop.is_set():
+            self._handle_commands()
+            ok = self._read_exact(source, raw_bytes)
+            now = time.monotonic()
+            if not ok:
+                uptime = now - self.opened_at
+                source.close()
+                if self.stop.is_set():
+                    break
+                if not source.live:
+                    ended = ENDED_EOF
+                    break
+                self.stop.wait(backoff.next_delay(uptime))
+                if self.stop.is_set() or not self._open(source):
+                    ended = ENDED_OPEN_FAILED
+                    break
+                self.restarts += 1
+                # Ausfallzeit als Stille, damit die Zeitachse stimmt
+                lost = (self.opened_at - now) * config["sample_rate"] / config["decimation"]
+                self.display.skip(int(lost))
+                continue
+            if raw.dtype == np.float32:
+                chunk = raw
+            else:
+                np.multiply(raw, scale, out=stage)
+                chunk = stage
+            self.meter.update(chunk)
+            self.loudness.update(chunk)
+            self.display.write(
+                self.decimator.process(chunk) if self.decimator is not None else chunk
+            )
+            if now - last_publish >= config["emit_interval"]:
+                self._publish(now, source)
+                last_publish = now
+            else:
+                self.state.publish(arrival=now)
+        source.close()
+        self._publish(time.monotonic(), source, ended)
+
+    def _publish(self, now, source, ended=0):
+        peak, true_peak = self.meter.take_peaks()
+        self.peaks.write(np.concatenate((peak, true_peak))[None, :])
+        rows = self.analyzer.update()
+        if rows is not None:
+            padded = np.full((len(rows), MAX_SPECTRUM_ROWS), self.analyzer.db_floor, np.float32)
+            padded[:, :rows.shape[1]] = rows
+            self.spectrum_rows.write(padded)
+        loudness = self.loudness
+        self.state.publish(
+            rms=self.meter.rms, hold=self.meter.hold,
+            true_peak_max=self.meter.true_peak_max, clips=self.meter.clips,
+            loudness=(loudness.momentary, loudness.short_term, loudness.integrated,
+                      loudness.loudness_range),
+            spectrum=self.spectrum,
+            status=(source.samples_read, self.restarts, self.opened_at, ended),
+            arrival=now,
+        )
+
+
+# ---------------------------------------------------------------------------
+# GUI-Seite
+# ---------------------------------------------------------------------------
+class DspWorker:
+    """Shared Memory anlegen, Worker-Prozess starten/stoppen, Ergebnisse lesen.
+
+    Der Speicher lebt so lange wie das Objekt (bis close()); start() und
+    stop() starten bzw. beenden nur den Prozess. meter, loudness und
+    spectrum() liefern Stellvertreter mit der Schnittstelle von LevelMeter,
+    LoudnessMeter und SpectrumAnalyzer für die vorhandenen Panels.
+    """
+
+    def __init__(self, sample_rate, channels, display_capacity, decimation=1,
+                 sample_format="f32le", low_latency=False, block_size=1024,
+                 emit_interval=0.03, thresholds=(0.14, 0.18), spectrum_history=300):
+        self.config = {
+            "sample_rate": sample_rate, "channels": channels, "decimation": decimation,
+            "sample_format": sample_format, "low_latency": low_latency,
+            "block_size": block_size, "emit_interval": emit_interval,
+        }
+        self.display = SharedRing.create(display_capacity, channels)
+        self.peaks = SharedRing.create(PEAK_SLOTS, 2 * channels)
+        self.spectrum_rows = SharedRing.create(spectrum_history, MAX_SPECTRUM_ROWS)
+        self.state = SharedState(_state_fields(channels))
+        # spawn statt fork: der GUI-Prozess hat Qt- und Thread-Zustand
+        self._context = multiprocessing.get_context("spawn")
+        self.commands = self._context.Queue()
+        self.process = None
+        self._stop = None
+        self.meter = RemoteMeter(self, channels, thresholds)
+        self.loudness = RemoteLoudness(self)
+        self._spectrum = None
+
+    def spectrum(self, sample_rate):
+        if self._spectrum is None:
+            self._spectrum = RemoteSpectrum(self, sample_rate)
+        return self._spectrum
+
+    def send(self, *command):
+        self.commands.put(command)
+
+    def start(self, spec, realtime=True):
+        self.stop()
+        spectrum = self._spectrum
+        config = dict(
+            self.config, spec=spec, realtime=realtime, thresholds=self.meter.thresholds,
+            spectrum=spectrum.config if spectrum is not None else (0, 2048, 512, False),
+            display_ring=self.display.name, peaks_ring=self.peaks.name,
+            spectrum_ring=self.spectrum_rows.name, state=self.state.name,
+        )
+        # Der neue Prozess bekommt den aktuellen Stand über config; alte
+        # Befehle gehörten zum vorigen Prozess
+        while True:
+            try:
+                self.commands.get_nowait()
+            except queue.Empty:
+                break
+        self._stop = self._context.Event()
+        self.process = self._context.Process(
+            target=_worker_main, args=(config, self.commands, self._stop),
+            name="vizi-dsp", daemon=True,
+        )
+        self.process.start()
+
+    def stop(self, timeout=2.0):
+        """Prozess beenden; nach `timeout` Sekunden wird er hart beendet."""
+        if self.process is None:
+            return
+        self._stop.set()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        self.process = None
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive()
+
+    def status(self):
+        frames, restarts, opened_at, ended = self.state.read()["status"]
+        return {
+            "frames": int(frames), "restarts": int(restarts),
+            "uptime": time.monotonic() - opened_at if opened_at else 0.0,
+            "ended": int(ended),
+        }
+
+    def close(self):
+        self.stop()
+        for shared in (self.display, self.peaks, self.spectrum_rows, self.state):
+            shared.close()
+        self.commands.close()
+
+
+class RemoteMeter:
+    """Stellvertreter für LevelMeter (MeterPanel); gemessen wird im Worker."""
+
+    def __init__(self, worker, channels, thresholds):
+        self.worker = worker
+        self.channels = channels
+        self.thresholds = tuple(thresholds)
+        self._peaks_seen = 0
+
+    def set_thresholds(self, threshold_orange, threshold_red):
+        self.thresholds = (threshold_orange, threshold_red)
+        self.worker.send("thresholds", threshold_orange, threshold_red)
+
+    def reset(self):
+        self.worker.send("reset_meter")
+
+    def take_peaks(self):
+        data, self._peaks_seen = self.worker.peaks.read_since(self._peaks_seen)
+        if data.shape[-1] == 0:
+            zeros = np.zeros(self.channels)
+            return zeros, zeros
+        peaks = data.max(axis=1)
+        return peaks[:self.channels], peaks[self.channels:]
+
+    def _field(self, name):
+        return self.worker.state.read()[name]
+
+    @property
+    def rms(self):
+        return self._field("rms")
+
+    @property
+    def hold(self):
+        return self._field("hold")
+
+    @property
+    def true_peak_max(self):
+        return self._field("true_peak_max")
+
+    @property
+    def clips(self):
+        return self._field("clips").astype(np.int64)
+
+
+class RemoteLoudness:
+    """Stellvertreter für LoudnessMeter (LoudnessPanel)."""
+
+    def __init__(self, worker):
+        self.worker = worker
+
+    def reset(self):
+        self.worker.send("reset_loudness")
+
+    def _value(self, index):
+        return float(self.worker.state.read()["loudness"][index])
+
+    @property
+    def momentary(self):
+        return self._value(0)
+
+    @property
+    def short_term(self):
+        return self._value(1)
+
+    @property
+    def integrated(self):
+        return self._value(2)
+
+    @property
+    def loudness_range(self):
+        return self._value(3)
+
+
+class RemoteSpectrum:
+    """Stellvertreter für SpectrumAnalyzer (SpectrumPanel).
+
+    Frequenzachse und Zeilenzahl rechnet ein lokaler SpectrumAnalyzer (ohne
+    je update() aufzurufen); die Spektren kommen fertig aus dem Worker. Jede
+    Umkonfiguration bekommt eine Generationsnummer, Zeilen einer alten
+    Konfiguration werden verworfen.
+    """
+
+    def __init__(self, worker, sample_rate):
+        self.worker = worker
+        self._local = SpectrumAnalyzer(worker.display.lane(0), sample_rate)
+        self.generation = 0
+        self._seen = 0
+        self.latest = self._local.latest.copy()
+
+    @property
+    def config(self):
+        local = self._local
+        return (self.generation, local.fft_size, local.hop, local.log_freq)
+
+    def configure(self, fft_size, hop, log_freq):
+        self._local.configure(fft_size, hop, log_freq)
+        self.generation += 1
+        self.latest = self._local.latest.copy()
+        self.worker.send("spectrum", *self.config)
+
+    @property
+    def fft_size(self):
+        return self._local.fft_size
+
+    @property
+    def hop(self):
+        return self._local.hop
+
+    @property
+    def log_freq(self):
+        return self._local.log_freq
+
+    @property
+    def history(self):
+        return self._local.history
+
+    @property
+    def rows(self):
+        return self._local.rows
+
+    @property
+    def freqs(self):
+        return self._local.freqs
+
+    @property
+    def db_floor(self):
+        return self._local.db_floor
+
+    def to_index(self, db, levels=256):
+        return self._local.to_index(db, levels)
+
+    def update(self):
+        generation, rows, start = self.worker.state.read()["spectrum"]
+        if int(generation) != self.generation:
+            return None
+        self._seen = max(self._seen, int(start))
+        data, self._seen = self.worker.spectrum_rows.read_since(self._seen)
+        if data.shape[-1] == 0:
+            return None
+        db = data[:int(rows)].T
+        self.latest = db[-1]
+        return db